@@ -6,6 +6,22 @@ Created on 25 Sep 2015
 Functions that return strings of SQL that can be used in Babase.
 '''
 
+def sqlValue(value):
+    '''
+    value is a string, or None.
+    
+    Returns a string: value as it should be written in an SQL command. None and
+        'NULL' (the emptyAbbrev in constants) are written as a real NULL, without
+        quotation marks. Anything else is put in quotation marks, but not otherwise
+        changed, so any apostrophes in it should already be doubled (see
+        babaseWriteHelpers.sqlizeApostrophes).
+    '''
+    from constants import emptyAbbrev
+    
+    if value is None or value == emptyAbbrev:
+        return 'NULL'
+    return "'" + value + "'"
+
 def lookupGroupNum_SQL(threeLtrGrp):
     '''
     threeLtrGrp is a string, the 3-letter code used in the data to refer to a group's name.
@@ -50,29 +66,49 @@ def lookupCollection_System_SQL(descr):
                 (SELECT collection_system FROM babase.samples_collection_systems where descr='{0}')'''.format(descr)
     return collection_systemLookUp
 
-def insertSAMPLES_SQL(date, stime, observer, stype, grp, sname, mins, programid, setupid, collection_system):
+def createSampleLookups_SQL(groups, prgID, setupID, tabletID):
+    '''
+    groups is a list of strings: every 3-letter group code used by the samples
+        in this transaction.
+    prgID, setupID, and tabletID are strings, as in babaseWriteHelpers.newFocal.
+    
+    Returns a string: the SQL to create the temporary SAMPLE_LOOKUPS table,
+        which has one row for each of groups (Grp, the 3-letter code) with its
+        Gid and the Programid, Setupid, and Collection_System for prgID,
+        setupID, and tabletID. Each of those is only looked up once, here,
+        instead of in every sample's "insert" (see insertSAMPLES_SQL). The
+        table is dropped at the end of the transaction.
+    '''
+    groupList = ', '.join(["'{0}'".format(grp) for grp in groups])
+    createLine = '''
+        CREATE TEMPORARY TABLE sample_lookups ON COMMIT DROP AS
+            SELECT g.grp,
+                (SELECT gid FROM babase.groups WHERE three_letter_code=g.grp) AS gid,{1} AS programid,{2} AS setupid,{3} AS collection_system
+                FROM unnest(ARRAY[{0}]::text[]) AS g(grp);
+    '''.format(groupList, lookupProgramID_SQL(prgID), lookupSetupID_SQL(setupID), lookupCollection_System_SQL(tabletID))
+    return createLine
+
+def insertSAMPLES_SQL(date, stime, observer, stype, grp, sname, mins):
     '''
-    All parameters are strings, and they indicate values to be added to columns of the same name.
+    All parameters are strings, and they indicate values to be added to columns of the same name
+        (see sqlValue). grp is the 3-letter code, which must be one of the groups in the SAMPLE_LOOKUPS
+        table (see createSampleLookups_SQL).
     
     Returns a string: an SQL "insert" command to add a line to the SAMPLES table in Babase.
-        Note that the returned string does not include quotation marks for the following values:
-            1) grp (it's a number)
-            2) mins (it's an integer)
-            3) programid (this will contain a subquery)
-            4) setupid (this will contain a subquery)
-            5) collection_system (this will contain a subquery)
+        The grp number, programid, setupid, and collection_system are taken from
+        SAMPLE_LOOKUPS. mins (an integer) isn't in quotation marks.
     '''
     insLine = '''
         INSERT INTO babase.samples(date, stime, observer, stype, grp, sname, mins, programid, setupid, collection_system)
-            VALUES('{0}','{1}','{2}','{3}',{4},'{5}',{6},{7},{8}, {9});
-    '''.format(date, stime, observer, stype, grp, sname, mins, programid, setupid, collection_system)
-    print(insLine)
+            SELECT {0},{1},{2},{3},l.gid,{5},{6},l.programid,l.setupid,l.collection_system
+                FROM sample_lookups AS l WHERE l.grp='{4}';
+    '''.format(sqlValue(date), sqlValue(stime), sqlValue(observer), sqlValue(stype), grp, sqlValue(sname), mins)
     return insLine
 
 def insertPOINT_DATA_SQL(pntMin, activity, posture, ptime, foodcode=''):
     '''
-    All parameters are strings, and they indicate values to be added to columns of the same name.
-        One exception: pntMin refers to the POINT_DATA.Min column. "min" is reserved by Python.
+    All parameters are strings, and they indicate values to be added to columns of the same name
+        (see sqlValue). One exception: pntMin refers to the POINT_DATA.Min column. "min" is reserved by Python.
         
     If the point to be added does not have a foodcode, it should be omitted from the parameters.
     
@@ -85,68 +121,96 @@ def insertPOINT_DATA_SQL(pntMin, activity, posture, ptime, foodcode=''):
     if foodcode =='':
         insLine = '''
         INSERT INTO babase.point_data(sid, min, activity, posture, ptime)
-            VALUES((SELECT currval('samples_sid_seq'::regclass)), {0}, '{1}', '{2}', '{3}');
-        '''.format(pntMin, activity, posture, ptime)
+            VALUES((SELECT currval('samples_sid_seq'::regclass)), {0}, {1}, {2}, {3});
+        '''.format(pntMin, sqlValue(activity), sqlValue(posture), sqlValue(ptime))
     else:
         insLine = '''
         INSERT INTO babase.point_data(sid, min, activity, posture, ptime, foodcode)
-            VALUES((SELECT currval('samples_sid_seq'::regclass)), {0}, '{1}', '{2}', '{3}', '{4}');
-        '''.format(pntMin, activity, posture, ptime, foodcode)
+            VALUES((SELECT currval('samples_sid_seq'::regclass)), {0}, {1}, {2}, {3}, {4});
+        '''.format(pntMin, sqlValue(activity), sqlValue(posture), sqlValue(ptime), sqlValue(foodcode))
     
-    print(insLine)
     return insLine
 
 def insertFPOINTS_SQL(kidcontact, kidsuckle):
     '''
-    All parameters are strings, and they indicate values to be added to columns of the same name.
+    All parameters are strings, and they indicate values to be added to columns of the same name
+        (see sqlValue).
     
     Returns a string: an SQL "insert" command to add a line to the FPOINTS table in Babase.
     '''
     insLine = '''
         INSERT INTO babase.fpoints(pntid, kidcontact, kidsuckle)
-            VALUES((SELECT currval('point_data_pntid_seq'::regclass)), '{0}', '{1}');
-    '''.format(kidcontact, kidsuckle)
-    print(insLine)
+            VALUES((SELECT currval('point_data_pntid_seq'::regclass)), {0}, {1});
+    '''.format(sqlValue(kidcontact), sqlValue(kidsuckle))
     return insLine
 
-def insertNEIGHBORS_SQL(neighborID, ncode):
+# The start of each kind of "insert" command that can add more than one row
+# at a time (see insertRows_SQL), up to and including "VALUES". Only rows with
+# the same insertHead can go in the same command.
+insertHeads = {}
+insertHeads['neighbors'] = '''
+        INSERT INTO babase.neighbors(pntid, ncode, sname)
+            VALUES'''
+insertHeads['neighbors_unksname'] = '''
+        INSERT INTO babase.neighbors(pntid, ncode, unksname)
+            VALUES'''
+insertHeads['actor_actees'] = '''
+        INSERT INTO babase.actor_actees(sid, observer, date, start, stop, actor, act, actee, handwritten)
+            VALUES'''
+insertHeads['actor_actees_nofocal'] = '''
+        INSERT INTO babase.actor_actees(observer, date, actor, act, actee, handwritten)
+            VALUES'''
+insertHeads['allmiscs'] = '''
+        INSERT INTO babase.allmiscs(sid, atime, txt)
+            VALUES'''
+
+def insertRows_SQL(insertHead, valueRows):
+    '''
+    insertHead is one of the insertHeads, and valueRows is a list of strings: rows of
+        values for it, each in parentheses (e.g. from neighborsRow_SQL).
+    
+    Returns a string: an SQL "insert" command that adds all of valueRows at once.
     '''
-    Both parameters are strings, and they indicate values to be added to columns in the NEIGHBORS table:
+    insLine = insertHead + ',\n                '.join(valueRows) + ''';
+        '''
+    return insLine
+
+def neighborsRow_SQL(neighborID, ncode):
+    '''
+    Both parameters are strings, and they indicate values to be added to columns in the NEIGHBORS table
+        (see sqlValue):
         ncode gets added to the ncode column.
         neighborID gets added to either the sname column or the unksname column, but not both.
     
     If neighborID is one of the allowed "unknown" snames, it gets added to the unksname column.  Otherwise,
         it's presumed to be a real sname.
     
-    Returns a string: an SQL "insert" command to add a line to the NEIGHBORS table in Babase.
+    Returns two strings: the insertHead for the row, and the row of values (see insertRows_SQL).
     '''
     from constants import unknSnames
     
-    insLine = ''
-    
     if neighborID in unknSnames:
-        insLine = '''
-        INSERT INTO babase.neighbors(pntid, ncode, unksname)
-            VALUES((SELECT currval('point_data_pntid_seq'::regclass)), '{0}', '{1}');
-        '''.format(ncode, unknSnames[neighborID])
-    else:
-        insLine = '''
-        INSERT INTO babase.neighbors(pntid, ncode, sname)
-            VALUES((SELECT currval('point_data_pntid_seq'::regclass)), '{0}', '{1}');
-        '''.format(ncode, neighborID)
+        return insertHeads['neighbors_unksname'], "((SELECT currval('point_data_pntid_seq'::regclass)), {0}, {1})".format(sqlValue(ncode), sqlValue(unknSnames[neighborID]))
+    return insertHeads['neighbors'], "((SELECT currval('point_data_pntid_seq'::regclass)), {0}, {1})".format(sqlValue(ncode), sqlValue(neighborID))
+
+def insertNEIGHBORS_SQL(neighborID, ncode):
+    '''
+    The parameters are as in neighborsRow_SQL.
     
-    print(insLine)
-    return insLine
+    Returns a string: an SQL "insert" command to add a line to the NEIGHBORS table in Babase.
+    '''
+    insertHead, valueRow = neighborsRow_SQL(neighborID, ncode)
+    return insertRows_SQL(insertHead, [valueRow])
 
-def insertACTOR_ACTEES_SQL(inFocal, observer, date, start, actor, act, actee, handwritten='FALSE'):
+def actorActeesRow_SQL(inFocal, observer, date, start, actor, act, actee, handwritten='FALSE'):
     '''
     inFocal is a boolean indicating whether or not the behavior occurred during a focal sample.
-    All other parameters are strings, and they indicate values to be added to columns of the same name.
-        One exception: the "start" value here is used in the "Start" and "Stop" columns.
+    All other parameters are strings, and they indicate values to be added to columns of the same name
+        (see sqlValue). One exception: the "start" value here is used in the "Start" and "Stop" columns.
         
     Whether or not the behavior occurred during a focal sample affects which columns are inserted.
         Specifically, if during a focal, we insert data into the Sid, Start, and Stop columns of
-        ACTOR_ACTEES.
+        ACTOR_ACTEES. Rows that aren't during a focal don't depend on the current sample at all.
     
     NOTE: As of this writing (28 Sep 2015), any data to be stored in ACTOR_ACTEES and collected 
         in Prim8 but not during a focal sample will also NOT have its timepoint saved.  This
@@ -156,28 +220,26 @@ def insertACTOR_ACTEES_SQL(inFocal, observer, date, start, actor, act, actee, ha
                 they were observed, so we don't want timestamps to imply more confidence than we
                 actually have.
         
-    Returns a string: an SQL "insert" command to add a line to the ACTOR_ACTEES view in Babase.
+    Returns two strings: the insertHead for the row, and the row of values (see insertRows_SQL).
     '''
-    insLine = ''
-    
     if inFocal:
-        insLine = '''
-        INSERT INTO babase.actor_actees(sid, observer, date, start, stop, actor, act, actee, handwritten)
-            VALUES((SELECT currval('samples_sid_seq'::regclass)), '{0}', '{1}', '{2}', '{2}', '{3}', '{4}', '{5}', {6});
-        '''.format(observer, date, start, actor, act, actee, handwritten)
-    else:
-        insLine = '''
-        INSERT INTO babase.actor_actees(observer, date, actor, act, actee, handwritten)
-            VALUES('{0}', '{1}', '{2}', '{3}', '{4}', {5});
-        '''.format(observer, date, actor, act, actee, handwritten)
-    print(insLine)
-    return insLine
+        return insertHeads['actor_actees'], "((SELECT currval('samples_sid_seq'::regclass)), {0}, {1}, {2}, {2}, {3}, {4}, {5}, {6})".format(sqlValue(observer), sqlValue(date), sqlValue(start), sqlValue(actor), sqlValue(act), sqlValue(actee), handwritten)
+    return insertHeads['actor_actees_nofocal'], "({0}, {1}, {2}, {3}, {4}, {5})".format(sqlValue(observer), sqlValue(date), sqlValue(actor), sqlValue(act), sqlValue(actee), handwritten)
 
-def insertALLMISCS_SQL(atime, txtPrefix, txt):
+def insertACTOR_ACTEES_SQL(inFocal, observer, date, start, actor, act, actee, handwritten='FALSE'):
+    '''
+    The parameters are as in actorActeesRow_SQL.
+        
+    Returns a string: an SQL "insert" command to add a line to the ACTOR_ACTEES view in Babase.
+    '''
+    insertHead, valueRow = actorActeesRow_SQL(inFocal, observer, date, start, actor, act, actee, handwritten)
+    return insertRows_SQL(insertHead, [valueRow])
+
+def allmiscsRow_SQL(atime, txtPrefix, txt):
     '''
     atime and txt are strings, and they indicate values to be added to columns
-    of the same name.  txtPrefix is a special value added to txt and required by
-    Babase:
+    of the same name (see sqlValue).  txtPrefix is a special value added to txt
+    and required by Babase:
     
     An artifact of the previous technology, the ALLMISCS.txt column requires
     that every field begin with a one-character code that indicates what kind of
@@ -186,17 +248,22 @@ def insertALLMISCS_SQL(atime, txtPrefix, txt):
         GOOD: "O, Missed point because reasons"
         (In this example, the "O" stands for "other")
     
-    Returns a string: an SQL "insert" command to add a line to the ALLMISCS
-    table in Babase.
+    Returns two strings: the insertHead for the row, and the row of values (see
+    insertRows_SQL).
     '''
     fullText = txtPrefix + ',' + txt
     
-    insLine = '''
-        INSERT INTO babase.allmiscs(sid, atime, txt)
-            VALUES((SELECT currval('samples_sid_seq'::regclass)), '{0}', '{1}');
-    '''.format(atime, fullText)
-    print(insLine)
-    return insLine
+    return insertHeads['allmiscs'], "((SELECT currval('samples_sid_seq'::regclass)), {0}, {1})".format(sqlValue(atime), sqlValue(fullText))
+
+def insertALLMISCS_SQL(atime, txtPrefix, txt):
+    '''
+    The parameters are as in allmiscsRow_SQL.
+    
+    Returns a string: an SQL "insert" command to add a line to the ALLMISCS
+    table in Babase.
+    '''
+    insertHead, valueRow = allmiscsRow_SQL(atime, txtPrefix, txt)
+    return insertRows_SQL(insertHead, [valueRow])
 
 def selectThisLine(dataLine):
     '''
@@ -214,5 +281,117 @@ def selectThisLine(dataLine):
         SELECT '{0}' as line;
     '''.format(thisLine)
     
-    print(selLine)
     return selLine
+
+# Temporary tables that the COPY output (see babaseWriter.writeCopySQL) loads
+# into, and their columns, in order. skey and pkey are keys made up by the
+# writer, to link points to samples and neighbors to points; the real
+# Sid and Pntid values are assigned in the database (see insertFromStaging_SQL).
+stagingTables = {}
+stagingTables['stage_samples'] = ['skey integer', 'date date', 'stime time', 'observer text', 'stype text', 'grp text', 'sname text', 'mins integer']
+stagingTables['stage_points'] = ['pkey integer', 'skey integer', 'min integer', 'activity text', 'posture text', 'ptime time', 'foodcode text']
+stagingTables['stage_fpoints'] = ['pkey integer', 'kidcontact text', 'kidsuckle text']
+stagingTables['stage_neighbors'] = ['pkey integer', 'ncode text', 'sname text', 'unksname text']
+stagingTables['stage_actor_actees'] = ['skey integer', 'infocal boolean', 'observer text', 'date date', 'start time', 'actor text', 'act text', 'actee text', 'handwritten boolean']
+stagingTables['stage_allmiscs'] = ['skey integer', 'atime time', 'txt text']
+
+def createStagingTables_SQL():
+    '''
+    Returns a string: the SQL to create all the stagingTables. They're
+    temporary, and dropped at the end of the transaction.
+    '''
+    createLines = []
+    for (tableName, columns) in stagingTables.items():
+        createLines.append('''
+        CREATE TEMPORARY TABLE {0} ({1}) ON COMMIT DROP;'''.format(tableName, ', '.join(columns)))
+    return ''.join(createLines) + '\n'
+
+def copyValue(value):
+    '''
+    value is a string, an integer, or None.
+    
+    Returns a string: value as written in the text format used by COPY.
+    None and 'NULL' are both written as a real NULL, and backslashes, tabs,
+    and line breaks are escaped.
+    '''
+    from constants import emptyAbbrev
+    
+    if value is None or value == emptyAbbrev:
+        return '\\N'
+    value = str(value)
+    if '\\' in value or '\t' in value or '\n' in value or '\r' in value:
+        value = value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+    return value
+
+def copyStaging_SQL(tableName, rows):
+    '''
+    tableName is the name of one of the stagingTables, and rows is a list
+    of lists (or tuples) of values for it, one value for each of its
+    columns, in order.
+    
+    Returns a string: a "COPY ... FROM STDIN" command with rows as its data,
+    ended with a line holding only "\\." (as psql expects).
+    '''
+    columnNames = [column.split()[0] for column in stagingTables[tableName]]
+    copyLines = ['\nCOPY {0} ({1}) FROM STDIN;\n'.format(tableName, ', '.join(columnNames))]
+    for row in rows:
+        copyLines.append('\t'.join([copyValue(value) for value in row]) + '\n')
+    copyLines.append('\\.\n')
+    return ''.join(copyLines)
+
+def insertFromStaging_SQL():
+    '''
+    Returns a string: the SQL that adds everything in the stagingTables to
+    the real Babase tables (with the group numbers and IDs from the
+    SAMPLE_LOOKUPS table; see createSampleLookups_SQL), in the same order as the one-row-at-a-time
+    "insert" commands would. Each sample and point is first given its real
+    Sid or Pntid, from the same sequences that those inserts use.
+    
+    Ad-libs outside of focals are inserted without the Sid, Start, and Stop
+    columns, as in insertACTOR_ACTEES_SQL. Otherwise, values that the
+    inserts would leave out (e.g. a point's foodcode) are NULL.
+    '''
+    insLines = '''
+        CREATE TEMPORARY TABLE stage_sample_ids ON COMMIT DROP AS
+            SELECT skey, nextval('samples_sid_seq'::regclass) AS sid
+                FROM (SELECT skey FROM stage_samples ORDER BY skey) AS ordered;
+        CREATE TEMPORARY TABLE stage_point_ids ON COMMIT DROP AS
+            SELECT pkey, nextval('point_data_pntid_seq'::regclass) AS pntid
+                FROM (SELECT pkey FROM stage_points ORDER BY pkey) AS ordered;
+        
+        INSERT INTO babase.samples(sid, date, stime, observer, stype, grp, sname, mins, programid, setupid, collection_system)
+            SELECT ids.sid, s.date, s.stime, s.observer, s.stype,
+                l.gid, s.sname, s.mins, l.programid, l.setupid, l.collection_system
+                FROM stage_samples AS s JOIN stage_sample_ids AS ids USING (skey)
+                    LEFT JOIN sample_lookups AS l USING (grp)
+                ORDER BY s.skey;
+        
+        INSERT INTO babase.point_data(pntid, sid, min, activity, posture, ptime, foodcode)
+            SELECT ids.pntid, sids.sid, p.min, p.activity, p.posture, p.ptime, p.foodcode
+                FROM stage_points AS p JOIN stage_point_ids AS ids USING (pkey)
+                    LEFT JOIN stage_sample_ids AS sids USING (skey)
+                ORDER BY p.pkey;
+        
+        INSERT INTO babase.fpoints(pntid, kidcontact, kidsuckle)
+            SELECT ids.pntid, f.kidcontact, f.kidsuckle
+                FROM stage_fpoints AS f JOIN stage_point_ids AS ids USING (pkey)
+                ORDER BY f.pkey;
+        
+        INSERT INTO babase.neighbors(pntid, ncode, sname, unksname)
+            SELECT ids.pntid, n.ncode, n.sname, n.unksname
+                FROM stage_neighbors AS n LEFT JOIN stage_point_ids AS ids USING (pkey);
+        
+        INSERT INTO babase.actor_actees(sid, observer, date, start, stop, actor, act, actee, handwritten)
+            SELECT sids.sid, a.observer, a.date, a.start, a.start, a.actor, a.act, a.actee, a.handwritten
+                FROM stage_actor_actees AS a LEFT JOIN stage_sample_ids AS sids USING (skey)
+                WHERE a.infocal;
+        INSERT INTO babase.actor_actees(observer, date, actor, act, actee, handwritten)
+            SELECT a.observer, a.date, a.actor, a.act, a.actee, a.handwritten
+                FROM stage_actor_actees AS a
+                WHERE NOT a.infocal;
+        
+        INSERT INTO babase.allmiscs(sid, atime, txt)
+            SELECT sids.sid, m.atime, m.txt
+                FROM stage_allmiscs AS m LEFT JOIN stage_sample_ids AS sids USING (skey);
+    '''
+    return insLines
@@ -50,20 +50,22 @@ def countMins(dataLines):
             focal sampling.
              
     '''
-    from constants import focalAbbrev, pntAbbrev
+    from focalIndex import getFocalIndex
     
-    numMins = {}
-    lastFocal = 'NO FOCALS YET'
+    index = getFocalIndex(dataLines)
     
-    numMins[lastFocal] = 0
+    focalMins = [0] * len(index.focalRows) # Number of points in each focal, by focal number
+    noFocalMins = 0 # Points before any focal
+    for row in index.pointRows:
+        if index.focalOf[row] < 0:
+            noFocalMins += 1
+        else:
+            focalMins[index.focalOf[row]] += 1
     
-    for line in dataLines:
-        if isType(line, focalAbbrev):
-            joinedLine = '\t'.join(line)
-            numMins[joinedLine] = 0
-            lastFocal = joinedLine[:]
-        elif isType(line, pntAbbrev):
-            numMins[lastFocal] += 1
+    numMins = {}
+    numMins['NO FOCALS YET'] = noFocalMins
+    for (focalNum, row) in enumerate(index.focalRows):
+        numMins['\t'.join(dataLines[row])] = focalMins[focalNum] # If the same header occurs twice, the later one's count is kept
     
     return numMins
 
@@ -110,11 +112,13 @@ def collectTxtNotes(dataLines):
                 focalNotes['\t'.join(lastFocal)].append(line)
     
     # Now take care of the "orphans". Find the first focal on the same day as the note
+    firstFocals = {} # Date: the first focal on that date, joined
+    for line in theData:
+        if isType(line, focalAbbrev) and line[2] not in firstFocals:
+            firstFocals[line[2]] = '\t'.join(line)
     for note in orphanNotes:
-        for line in theData:
-            if isType(line, focalAbbrev) and sameDate(note, line):
-                focalNotes['\t'.join(line)].append(note)
-                break # Stop looping through all of the data. We only want the first focal.
+        if note[2] in firstFocals:
+            focalNotes[firstFocals[note[2]]].append(note)
     
     return focalNotes
 
@@ -197,12 +201,13 @@ def behavDuringFocal(lastFocal, thisBehav):
         
     Returns True if thisBehav is recorded before lastFocal ended.  False otherwise.
     '''
-    from errorCheckingHelpers import getDateTime, duringFocal
+    from errorCheckingHelpers import duringFocal
+    from timestampCodec import parseDateTime
     
     if len(lastFocal) == 0:
         return False
     
-    focalEnd = getDateTime(lastFocal, 2, 7)
+    focalEnd = parseDateTime(lastFocal[2], lastFocal[7])
     
     return duringFocal(thisBehav, focalEnd)
 
@@ -216,34 +221,73 @@ def transactionCommit(doCommit=True):
         return "COMMIT;"
     return "ROLLBACK;"
 
-def newFocal(dataLine, mins, prgID, setupID, tabletID):
+def getFocalValues(dataLine):
+    '''
+    dataLine is a list of strings representing a single line read from the Prim8 data file.
+        It should contain data about the beginning of a new focal sample (see newFocal).
+    
+    Returns six strings, the values for a new row in the SAMPLES table: date, stime, observer,
+        stype (translated to the Babase code), grp (the 3-letter code, not yet looked up), and sname.
+    '''
+    from constants import stypesBabase
+    
+    return dataLine[2], dataLine[3], dataLine[1], stypesBabase.get(dataLine[6], dataLine[6]), dataLine[4], dataLine[5]
+
+def getSampleGroups(dataLines):
+    '''
+    dataLines is a list of lists of strings, the lines of processed Prim8 data.
+    
+    Returns a list of strings: the 3-letter code of each group that has a
+        focal sample in dataLines, once each, in the order they first occur
+        (see babaseSQL.createSampleLookups_SQL).
+    '''
+    from constants import focalAbbrev
+    
+    groups = []
+    for line in dataLines:
+        if line[0] == focalAbbrev and line[4] not in groups:
+            groups.append(line[4])
+    return groups
+
+def newFocal(dataLine, mins):
     '''
     dataLine is a list of strings representing a single line read from the Prim8 data file.
         It should contain data about the beginning of a new focal sample.
         Its format is presumed to be:
         [data type, observer, date, begin time, group name, focal name, sample type, end time] (all strings) 
         (e.g. ["HDR", "SNS", "2015-09-22", "08:59:56", "ACA", "UJU", "JUV", "09:10:39"])
-    prgID, setupID, and tabletID are strings representing specifics about the tablet and app used for 
-        data collection.  Ideally, they're generated by the getProgramSetup function.
+    mins is an integer, the number of minutes in the sample (see countMins).
     
-    Parses data from the line needed to write the SQL "insert" command.
+    Parses data from the line needed to write the SQL "insert" command. The group number and
+        the program, setup, and tablet IDs come from the SAMPLE_LOOKUPS table, which must be
+        created earlier in the same transaction (see babaseSQL.createSampleLookups_SQL).
     
     Returns a string: the SQL statement.
     '''
-    from babaseSQL import insertSAMPLES_SQL, lookupGroupNum_SQL, lookupCollection_System_SQL, lookupProgramID_SQL, lookupSetupID_SQL
-    from constants import stypesBabase
+    from babaseSQL import insertSAMPLES_SQL
     
-    date = dataLine[2]
-    stime = dataLine[3]
-    observer = dataLine[1]
-    stype = stypesBabase.get(dataLine[6], dataLine[6])
-    grp = lookupGroupNum_SQL(dataLine[4])
-    sname = dataLine[5]
-    programid = lookupProgramID_SQL(prgID)
-    setupid = lookupSetupID_SQL(setupID)
-    collection_system = lookupCollection_System_SQL(tabletID)
-    
-    return insertSAMPLES_SQL(date, stime, observer, stype, grp, sname, mins, programid, setupid, collection_system)
+    date, stime, observer, stype, grp, sname = getFocalValues(dataLine)
+    
+    return insertSAMPLES_SQL(date, stime, observer, stype, grp, sname, mins)
+
+def getPointValues(dataLine):
+    '''
+    dataLine is a list of strings representing a single line read from the Prim8 data file.
+        It should contain data about a new point sample (see newPoint).
+    
+    Returns a five-object tuple, the values for a new row in the POINT_DATA table and maybe FPOINTS:
+        activity, posture, ptime, and foodcode (all strings; foodcode is empty if there isn't one), then
+        a (kidcontact, kidsuckle) tuple of strings if the "behavior" string is 4 characters long (an
+        adult female sample), or None if not.
+    '''
+    ptime = dataLine[3]
+    actCodes, foodcode = getPointActs(dataLine)
+    
+    kidCodes = None
+    if len(actCodes) == 4:
+        kidCodes = (actCodes[2], actCodes[3])
+    
+    return actCodes[0], actCodes[1], ptime, foodcode, kidCodes
 
 def newPoint(dataLine, pntMin):
     '''
@@ -261,18 +305,30 @@ def newPoint(dataLine, pntMin):
     '''
     from babaseSQL import insertPOINT_DATA_SQL, insertFPOINTS_SQL
     
-    ptime = dataLine[3]
-    actCodes, foodcode = getPointActs(dataLine)
-    activity = actCodes[0]
-    posture = actCodes[1]
+    activity, posture, ptime, foodcode, kidCodes = getPointValues(dataLine)
     
-    if len(actCodes) == 4:
-        kidcontact = actCodes[2]
-        kidsuckle = actCodes[3]
+    if kidCodes is not None:
+        kidcontact, kidsuckle = kidCodes
         return insertPOINT_DATA_SQL(pntMin, activity, posture, ptime, foodcode) + insertFPOINTS_SQL(kidcontact, kidsuckle)
     
     return insertPOINT_DATA_SQL(pntMin, activity, posture, ptime, foodcode)
 
+def getNeighborValues(dataLine, currFocal):
+    '''
+    dataLine and currFocal are as in newNeighbor.
+    
+    Returns two strings, the values for a new row in the NEIGHBORS table: the neighbor's ID (a real
+        sname or one of the unknSnames, see insertNEIGHBORS_SQL) and the Babase ncode.
+    '''
+    neighborID = dataLine[7]
+    
+    prim8NCode = dataLine[-1] # This is imperfect. If an ncode is omitted, then [-1] is the neighbor.
+                                # It will return an error during import to Babase, so we'll leave this alone for now.
+    sampleType = currFocal[6]
+    babaseNCode = getNCode(sampleType, prim8NCode) 
+    
+    return neighborID, babaseNCode
+
 def newNeighbor(dataLine, currFocal):
     '''
     dataLine is a list of strings representing a single line read from the Prim8 data file.
@@ -286,16 +342,22 @@ def newNeighbor(dataLine, currFocal):
     
     Returns a string: the SQL statement.
     '''
-    from babaseSQL import insertNEIGHBORS_SQL
-        
-    neighborID = dataLine[7]
+    from babaseSQL import insertRows_SQL
     
-    prim8NCode = dataLine[-1] # This is imperfect. If an ncode is omitted, then [-1] is the neighbor.
-                                # It will return an error during import to Babase, so we'll leave this alone for now.
-    sampleType = currFocal[6]
-    babaseNCode = getNCode(sampleType, prim8NCode) 
+    insertHead, valueRow = neighborRow(dataLine, currFocal)
+    
+    return insertRows_SQL(insertHead, [valueRow])
+
+def neighborRow(dataLine, currFocal):
+    '''
+    Like newNeighbor, but returns two strings: the insertHead and the row of values, for
+        adding to an "insert" command with other rows (see babaseSQL.insertRows_SQL).
+    '''
+    from babaseSQL import neighborsRow_SQL
     
-    return insertNEIGHBORS_SQL(neighborID, babaseNCode)
+    neighborID, babaseNCode = getNeighborValues(dataLine, currFocal)
+    
+    return neighborsRow_SQL(neighborID, babaseNCode)
 
 def newInteraction(dataLine, lastFocal):
     '''
@@ -311,12 +373,24 @@ def newInteraction(dataLine, lastFocal):
     
     Returns a string: the SQL statement.
     '''
-    from babaseSQL import insertACTOR_ACTEES_SQL
+    from babaseSQL import insertRows_SQL
+    
+    insertHead, valueRow = interactionRow(dataLine, lastFocal)
+    
+    return insertRows_SQL(insertHead, [valueRow])
+
+def interactionRow(dataLine, lastFocal):
+    '''
+    Like newInteraction, but returns two strings: the insertHead and the row of values, for
+        adding to an "insert" command with other rows (see babaseSQL.insertRows_SQL).
+        Interactions that weren't during a focal have the 'actor_actees_nofocal' insertHead.
+    '''
+    from babaseSQL import actorActeesRow_SQL
     from constants import saveAsNotes
     
     # Check if this interaction should be recorded as a note
     if checkIfBehavior(dataLine, saveAsNotes):
-        return newNoteFromOther(dataLine)
+        return noteRow(noteFromOther(dataLine))
     
     inFocal = behavDuringFocal(lastFocal, dataLine)
     observer = dataLine[1]
@@ -326,7 +400,23 @@ def newInteraction(dataLine, lastFocal):
     act = dataLine[6]
     actee = dataLine[7]
     
-    return insertACTOR_ACTEES_SQL(inFocal, observer, date, start, actor, act, actee)
+    return actorActeesRow_SQL(inFocal, observer, date, start, actor, act, actee)
+
+def getNoteValues(dataLine):
+    '''
+    dataLine is as in newNote.
+    
+    Returns three strings, the values for a new row in the ALLMISCS table: atime, the text prefix
+        (see newNote and insertALLMISCS_SQL), and the text of the note itself in upper case.
+    '''
+    from constants import bb_consort, allMiscsPrefixConsort, allMiscsPrefixOther
+    from errorCheckingHelpers import behaviorsInNote
+    
+    txtPrefix = allMiscsPrefixOther
+    if behaviorsInNote(dataLine, [bb_consort]):
+        txtPrefix = allMiscsPrefixConsort
+    
+    return dataLine[3], txtPrefix, dataLine[4].upper()
 
 def newNote(dataLine):
     '''
@@ -345,19 +435,22 @@ def newNote(dataLine):
 
     Returns a string: the SQL statement.
     '''
-    from babaseSQL import insertALLMISCS_SQL
-    from constants import bb_consort, allMiscsPrefixConsort, allMiscsPrefixOther
-    from errorCheckingHelpers import behaviorsInNote
+    from babaseSQL import insertRows_SQL
+    
+    insertHead, valueRow = noteRow(dataLine)
     
-    atime = dataLine[3]
+    return insertRows_SQL(insertHead, [valueRow])
 
-    txtPrefix = allMiscsPrefixOther
-    if behaviorsInNote(dataLine, [bb_consort]):
-        txtPrefix = allMiscsPrefixConsort
+def noteRow(dataLine):
+    '''
+    Like newNote, but returns two strings: the insertHead and the row of values, for
+        adding to an "insert" command with other rows (see babaseSQL.insertRows_SQL).
+    '''
+    from babaseSQL import allmiscsRow_SQL
     
-    txt = (sqlizeApostrophes(dataLine[4])).upper()
+    atime, txtPrefix, txt = getNoteValues(dataLine)
     
-    return insertALLMISCS_SQL(atime, txtPrefix, txt)    
+    return allmiscsRow_SQL(atime, txtPrefix, sqlizeApostrophes(txt))
 
 def noteFromOther(dataLine):
     '''
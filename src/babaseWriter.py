@@ -8,99 +8,407 @@ Functions involved with reading processed Prim8 data and writing SQL to add the
 '''
 
 from babaseWriteHelpers import *
-from babaseSQL import selectThisLine
+from babaseSQL import selectThisLine, createSampleLookups_SQL
 
-def writeAll(dataFilePath, sqlFilePath, commitTransaction = False):
+class SQLOutput(object):
     '''
-    dataFilePath and sqlFilePath are both strings.
+    A file that SQL is written to one statement at a time, as it's made, so
+    that the whole output never has to be kept in memory.
+    
+    Rows for the same kind of "insert" command (see babaseSQL.insertHeads) are
+    combined into one command, up to batchSize rows at a time. Each batch is
+    written as soon as anything else is, unless whatever's written can't
+    change what the batch's rows refer to with currval(), and the caller says
+    so (see write).
+    '''
+    
+    def __init__(self, sqlFilePath, logStatements = False, batchSize = 1):
+        '''
+        sqlFilePath is a string. If it ends with ".gz", the file is gzip-compressed.
+        If logStatements is True, each statement is also printed to the console.
+        batchSize is an integer, the most rows to add with one "insert" command.
+        '''
+        import gzip
+        
+        if sqlFilePath.endswith('.gz'):
+            self.sqlFile = gzip.open(sqlFilePath, 'wt')
+        else:
+            self.sqlFile = open(sqlFilePath, 'w')
+        self.logStatements = logStatements
+        self.batchSize = max(batchSize, 1)
+        self.batches = {} #insertHead: (list of rows, list of "select [line]" markers for them) not yet written
+        self.laterRows = {} #insertHead: list of (marker, row) tuples, for writeLaterRows
+    
+    def write(self, statement, keepHeads = ()):
+        '''
+        Writes the string statement to the file (and console, if logging), after
+        any rows waiting to be written. Rows with an insertHead in keepHeads can
+        keep waiting, so should only be given if statement won't change the
+        sample or point that those rows refer to.
+        '''
+        self.writeBatches(keepHeads)
+        self.writeStatement(statement)
+    
+    def writeStatement(self, statement):
+        self.sqlFile.write(statement)
+        if self.logStatements:
+            print(statement)
+    
+    def addRow(self, insertHead, valueRow, marker = ''):
+        '''
+        insertHead and valueRow are strings, as from babaseSQL.neighborsRow_SQL.
+        marker is a string, the "select [line]" for the data line that the row is
+        from (see babaseSQL.selectThisLine), if any. The markers are written
+        just before the command that adds their rows.
+        
+        Adds the row to the batch for insertHead, first writing that batch if
+        it's full.
+        '''
+        if len(self.batches.get(insertHead, ([], []))[0]) >= self.batchSize:
+            self.writeBatch(insertHead)
+        (rows, markers) = self.batches.setdefault(insertHead, ([], []))
+        rows.append(valueRow)
+        markers.append(marker)
+    
+    def writeBatch(self, insertHead):
+        '''
+        Writes the rows waiting for insertHead as one "insert" command.
+        '''
+        from babaseSQL import insertRows_SQL
+        
+        (rows, markers) = self.batches.pop(insertHead)
+        self.writeStatement(''.join(markers) + insertRows_SQL(insertHead, rows))
+    
+    def writeBatches(self, keepHeads = ()):
+        '''
+        Writes all the rows waiting to be written, except for those with an
+        insertHead in keepHeads.
+        '''
+        for insertHead in list(self.batches.keys()):
+            if insertHead not in keepHeads:
+                self.writeBatch(insertHead)
+    
+    def addLaterRow(self, insertHead, valueRow, marker = ''):
+        '''
+        Like addRow, but the row isn't written until writeLaterRows, when it's
+        batched with all the other later rows with the same insertHead. Only for
+        rows that don't depend on anything before them (i.e. no currval()).
+        '''
+        self.laterRows.setdefault(insertHead, []).append((marker, valueRow))
+    
+    def writeLaterRows(self):
+        '''
+        Writes all the rows from addLaterRow, in batches.
+        '''
+        self.writeBatches()
+        for (insertHead, rows) in self.laterRows.items():
+            for (marker, valueRow) in rows:
+                self.addRow(insertHead, valueRow, marker)
+        self.writeBatches()
+        self.laterRows = {}
+    
+    def close(self):
+        self.writeBatches()
+        self.sqlFile.close()
+
+def writeAll(dataFilePath, sqlFilePath, commitTransaction = False, useCopy = False, logStatements = False, batchSize = None):
+    '''
+    dataFilePath is a string, or a ProcessedDataset (see processedDataset) with the data already loaded.
+    sqlFilePath is a string. If it ends with ".gz", the SQL is gzip-compressed.
     commitTransaction is a boolean that indicates whether the output SQL should be committed.  
+    useCopy is a boolean that indicates whether to write the data as COPY blocks (see writeCopySQL)
+        instead of one "insert" per row.
+    logStatements is a boolean that indicates whether to also print the SQL to the console.
+    batchSize is an integer, the most rows to add with each "insert" command (see writeSQL).
     
-    1) Reads the data from the file at dataFilePath (should be a .txt file processed from a Prim8 data file)
-    2) Generates SQL to add the data to Babase
+    1) Reads the data from the file at dataFilePath (should be a .txt file processed from a Prim8 data file), unless already loaded
+    2) Generates SQL to add the data to Babase (see writeSQL)
     3) Writes the SQL to the file at sqlFilePath
     
+    Eventually, we'll probably change this function to send SQL to stdout, or at
+    least provide the option to do it that way.
+    
+    Doesn't return anything.
+    '''
+    from processedDataset import getDataset
+    
+    dataset = getDataset(dataFilePath)
+    
+    writeSQL(dataset, sqlFilePath, dataset.prgID, dataset.setupID, dataset.tabletID, commitTransaction, useCopy, logStatements, batchSize)
+
+def writeSQL(dataLines, sqlFilePath, prgID, setupID, tabletID, commitTransaction = False, useCopy = False, logStatements = False, batchSize = None):
+    '''
+    dataLines is a list of lists of strings (or a ProcessedDataset): the lines
+    of processed Prim8 data (without the "Parsed data from" header line), each
+    split into its fields. They may be read from a processed .txt file (as in
+    writeAll), or come straight from the dump (see dumpPipeline).
+    sqlFilePath, prgID, setupID, and tabletID are strings. The last three are
+    the program, setup, and tablet IDs from the header line (see getProgramSetup).
+    commitTransaction is a boolean that indicates whether the output SQL should be committed.  
+    If useCopy is True, the data are written as COPY blocks instead (see writeCopySQL).
+    If logStatements is True, the SQL is also printed to the console.
+    batchSize is an integer, the most rows to add with one "insert" command (by default,
+    sqlBatchSize in constants). 1 means every row gets its own.
+    
+    Generates SQL to add the data to Babase, and writes it to the file at sqlFilePath
+    (see SQLOutput), one statement at a time.
+    
+    Neighbors, ad-libs, and notes are added in batches (see SQLOutput), with the
+    "select [line]" for each line in the batch just before it. Each batch can only
+    have rows for the same sample (ad-libs and notes) or point (neighbors), so it's
+    written before the next one begins. Ad-libs that weren't during a focal don't
+    need the current sample at all, so they're all added at the end.
+    
     Free-form text notes may be recorded before any samples in a day, in which
     case they'll be associated with the next sample to occur that day. Because
     of this, text notes are gathered and matched to a focal before the main read
     through all of the data. If a note is recorded on a day with no focals, IT
     WILL BE IGNORED.
     
-    Eventually, we'll probably change this function to send SQL to stdout, or at
-    least provide the option to do it that way.
-    
     Doesn't return anything.
     '''
-    from constants import focalAbbrev, neighborAbbrev, noteAbbrev, adlibAbbrev, pntAbbrev, outOfSightValue
+    from babaseSQL import insertHeads
+    from constants import focalAbbrev, neighborAbbrev, noteAbbrev, adlibAbbrev, pntAbbrev, outOfSightValue, sqlBatchSize
     
-    dataFile = open(dataFilePath, 'r')
+    if useCopy:
+        return writeCopySQL(dataLines, sqlFilePath, prgID, setupID, tabletID, commitTransaction, logStatements)
     
     # Important values used throughout the for loop     
-    prgID, setupID, tabletID = getProgramSetup(dataFile.readline()) # Read first line from file 
-    dataLines = [line.strip().split('\t') for line in dataFile.readlines()] # Note that the header from the file has already been read, so it's omitted here.
-    dataFile.close()
     sampleMins = countMins(dataLines)
     allNotes = collectTxtNotes(dataLines) #Get notes and match them with focals.
     lastFocal = []
     pntNum = 0 #Keep track of the current "min" value for points
-    sqlOut = []
+    nghNum = 0
+    if batchSize is None:
+        batchSize = sqlBatchSize
+    sqlOut = SQLOutput(sqlFilePath, logStatements, batchSize)
+    sampleHeads = [insertHeads['actor_actees'], insertHeads['allmiscs']] #Rows that only refer to the current sample
+    allHeads = list(insertHeads.values())
         
     # Write SQL
-    sqlOut.append('BEGIN;\n') #Add text to start an SQL transaction
+    sqlOut.write('BEGIN;\n') #Add text to start an SQL transaction
+    sqlOut.write(createSampleLookups_SQL(getSampleGroups(dataLines), prgID, setupID, tabletID)) #Look up group numbers and IDs once, for all the samples
     
     for line in dataLines:
         if line[0] == noteAbbrev:
             continue # Because we've already dealt with all the notes
         
-        outLine = selectThisLine(line)
-        sqlOut.append(outLine)
+        marker = selectThisLine(line)
         if line[0] == focalAbbrev:
+            sqlOut.write(marker)
             lastFocal = line[:]
             pntNum = 0
             lineString = '\t'.join(line)
             numMins = sampleMins[lineString]
-            outLine = newFocal(line, numMins, prgID, setupID, tabletID)
-            sqlOut.append(outLine)
+            outLine = newFocal(line, numMins)
+            sqlOut.write(outLine)
             
             # Now write SQL for all notes associated with this sample
             #  This means that notes won't be added chronologically, but Babase doesn't care.
             sampleNotes = allNotes[lineString]
             if len(sampleNotes) > 0:
                 for note in sampleNotes:
-                    outLine = selectThisLine(note)
-                    sqlOut.append(outLine)
-                    outLine = newNote(note)
-                    sqlOut.append(outLine)
+                    insertHead, valueRow = noteRow(note)
+                    sqlOut.addRow(insertHead, valueRow, selectThisLine(note))
         
         elif line[0] == pntAbbrev:
+            sqlOut.write(marker, sampleHeads)
             pntNum += 1
             nghNum = 0
             if line[6] == outOfSightValue: # Then we don't want the point recorded at all
                 continue
             outLine = newPoint(line, pntNum)
-            sqlOut.append(outLine)
+            sqlOut.write(outLine, sampleHeads)
         
         elif line[0] == neighborAbbrev:
             nghNum += 1
             if neighborIsNull(line): # Then we don't want this false neighbor recorded
+                sqlOut.write(marker, allHeads)
                 continue
-            outLine = newNeighbor(line, lastFocal)
-            sqlOut.append(outLine)
+            insertHead, valueRow = neighborRow(line, lastFocal)
+            sqlOut.addRow(insertHead, valueRow, marker)
             
         elif line[0] == adlibAbbrev:
-            outLine = newInteraction(line, lastFocal)
-            sqlOut.append(outLine)
+            insertHead, valueRow = interactionRow(line, lastFocal)
+            if insertHead == insertHeads['actor_actees_nofocal']: # Doesn't need the current sample, so it can wait
+                sqlOut.addLaterRow(insertHead, valueRow, marker)
+            else:
+                sqlOut.addRow(insertHead, valueRow, marker)
+        
+        else:
+            sqlOut.write(marker)
     
-    # Correct instances of 'NULL' to just say NULL 
-    sqlOut = [line.replace("'NULL'", "NULL") for line in sqlOut]
+    sqlOut.writeLaterRows()
     
     # Wrap it all up
     transactionEnd = transactionCommit(commitTransaction) + "\n"
-    sqlOut.append(transactionEnd)
+    sqlOut.write(transactionEnd)
+    sqlOut.close()
+
+def writeCopySQL(dataLines, sqlFilePath, prgID, setupID, tabletID, commitTransaction = False, logStatements = False):
+    '''
+    Like writeSQL (see it for the parameters), but for loading a lot of data
+    at once. Instead of one "insert" per row, each of which has to find its
+    sample or point with currval(), all the rows are written as COPY blocks
+    into temporary "staging" tables (see babaseSQL.stagingTables), then
+    added to the real tables by a handful of INSERT ... SELECT commands (see
+    babaseSQL.insertFromStaging_SQL).
+    
+    Each sample and each point is numbered here (its "skey" or "pkey"), and
+    the points, neighbors, ad-libs, and notes refer to those numbers. Which
+    sample or point each row belongs to is worked out exactly as in
+    writeSQL, e.g. a neighbor belongs to the last point that was added
+    (out-of-sight points aren't). The same rows end up in Babase either way.
+    
+    Doesn't return anything.
+    '''
+    from babaseSQL import stagingTables, createStagingTables_SQL, createSampleLookups_SQL, copyStaging_SQL, insertFromStaging_SQL
+    from constants import focalAbbrev, neighborAbbrev, noteAbbrev, adlibAbbrev, pntAbbrev, outOfSightValue, saveAsNotes, unknSnames
     
-    # Open file, write data
-    sqlFile = open(sqlFilePath, 'w')
-    sqlFile.writelines(sqlOut)
+    sampleMins = countMins(dataLines)
+    allNotes = collectTxtNotes(dataLines) #Get notes and match them with focals.
+    lastFocal = []
+    sampleKey = None #skey of the last sample
+    pointKey = None #pkey of the last point added
+    pntNum = 0 #Keep track of the current "min" value for points
+    stageRows = {} #Staging table name: list of rows for it
+    for tableName in stagingTables:
+        stageRows[tableName] = []
+    
+    for line in dataLines:
+        if line[0] == focalAbbrev:
+            lastFocal = line[:]
+            pntNum = 0
+            lineString = '\t'.join(line)
+            sampleKey = len(stageRows['stage_samples']) + 1
+            date, stime, observer, stype, grp, sname = getFocalValues(line)
+            stageRows['stage_samples'].append([sampleKey, date, stime, observer, stype, grp, sname, sampleMins[lineString]])
+            for note in allNotes[lineString]:
+                atime, txtPrefix, txt = getNoteValues(note)
+                stageRows['stage_allmiscs'].append([sampleKey, atime, txtPrefix + ',' + txt])
+        
+        elif line[0] == pntAbbrev:
+            pntNum += 1
+            if line[6] == outOfSightValue: # Then we don't want the point recorded at all
+                continue
+            activity, posture, ptime, foodcode, kidCodes = getPointValues(line)
+            pointKey = len(stageRows['stage_points']) + 1
+            stageRows['stage_points'].append([pointKey, sampleKey, pntNum, activity, posture, ptime, foodcode or None])
+            if kidCodes is not None:
+                stageRows['stage_fpoints'].append([pointKey, kidCodes[0], kidCodes[1]])
+        
+        elif line[0] == neighborAbbrev:
+            if neighborIsNull(line): # Then we don't want this false neighbor recorded
+                continue
+            neighborID, ncode = getNeighborValues(line, lastFocal)
+            if neighborID in unknSnames:
+                stageRows['stage_neighbors'].append([pointKey, ncode, None, unknSnames[neighborID]])
+            else:
+                stageRows['stage_neighbors'].append([pointKey, ncode, neighborID, None])
+        
+        elif line[0] == adlibAbbrev:
+            if checkIfBehavior(line, saveAsNotes): # Recorded as a note instead
+                atime, txtPrefix, txt = getNoteValues(noteFromOther(line))
+                stageRows['stage_allmiscs'].append([sampleKey, atime, txtPrefix + ',' + txt])
+            elif behavDuringFocal(lastFocal, line):
+                stageRows['stage_actor_actees'].append([sampleKey, 'TRUE', line[1], line[2], line[3], line[5], line[6], line[7], 'FALSE'])
+            else:
+                stageRows['stage_actor_actees'].append([None, 'FALSE', line[1], line[2], None, line[5], line[6], line[7], 'FALSE'])
+    
+    sqlFile = SQLOutput(sqlFilePath, logStatements)
+    sqlFile.write('BEGIN;\n')
+    sqlFile.write(createStagingTables_SQL())
+    sqlFile.write(createSampleLookups_SQL(getSampleGroups(dataLines), prgID, setupID, tabletID))
+    for (tableName, rows) in stageRows.items():
+        if len(rows) > 0:
+            sqlFile.write(copyStaging_SQL(tableName, rows))
+    sqlFile.write(insertFromStaging_SQL())
+    sqlFile.write(transactionCommit(commitTransaction) + '\n')
     sqlFile.close()
+
+
+def shardFilePath(sqlFilePath, label):
+    '''
+    Returns a string: sqlFilePath with "_[label]" added to the end of the file
+    name, before the extension (e.g. "out.sql" becomes "out_2015-09-02.sql",
+    and "out.sql.gz" becomes "out_2015-09-02.sql.gz").
+    '''
+    from os import path
+    
+    gzipExt = ''
+    if sqlFilePath.endswith('.gz'):
+        sqlFilePath = sqlFilePath[:-3]
+        gzipExt = '.gz'
+    root, ext = path.splitext(sqlFilePath)
+    return root + '_' + label + ext + gzipExt
+
+def splitShards(dataLines, samplesPerShard = 0):
+    '''
+    Splits dataLines into "shards" that can each be written (see writeShards)
+    and added to Babase on their own: one for each sampling date, or, if
+    samplesPerShard is more than 0, one for each samplesPerShard focal samples.
+    
+    Every line goes in the same shard as the last focal before it (lines before
+    any focal go in the first shard), so each point, neighbor, and ad-lib still
+    belongs to the same sample. Text notes go in the shard with the focal they're
+    associated with (see collectTxtNotes); a note without one is left out, as
+    writeSQL would ignore it anyway.
+    
+    Returns a list of (label, lines) tuples, one for each shard, in the order
+    their first focals occur. label is the date or the shard number ('0001',
+    '0002', ...), and lines a list of lines from dataLines, in the same order.
+    '''
+    from constants import focalAbbrev, noteAbbrev
+    
+    shards = {} #Label: lines in that shard
+    focalShards = {} #Focal header (string): label of its shard
+    thisLabel = None #Shard of the last focal
+    numFocals = 0
+    for line in dataLines:
+        if line[0] == noteAbbrev:
+            continue
+        if line[0] == focalAbbrev:
+            if samplesPerShard > 0:
+                thisLabel = '%04d' % (numFocals // samplesPerShard + 1)
+            else:
+                thisLabel = line[2]
+            numFocals += 1
+            focalShards['\t'.join(line)] = thisLabel
+        shards.setdefault(thisLabel, []).append(line)
+    
+    # Lines before any focal go in the first shard
+    if None in shards:
+        firstLines = shards.pop(None)
+        if len(shards) == 0: # No focals at all
+            shards['0001' if samplesPerShard > 0 else firstLines[0][2]] = []
+        firstLabel = list(shards.keys())[0]
+        shards[firstLabel] = firstLines + shards[firstLabel]
+    
+    for (focal, notes) in collectTxtNotes(dataLines).items():
+        shards[focalShards[focal]].extend(notes)
+    
+    return list(shards.items())
+
+def writeShards(dataLines, sqlFilePath, prgID, setupID, tabletID, commitTransaction = False, samplesPerShard = 0, useCopy = False, logStatements = False, batchSize = None):
+    '''
+    Like writeSQL (see it for the parameters), but writes one file for each
+    sampling date or, if samplesPerShard is more than 0, for each
+    samplesPerShard focal samples (see splitShards). Each file is its own
+    transaction, and only refers to samples and points from the same file, so
+    the files can be added to Babase in any order, each in its own session
+    (e.g. several at once, with shardLoader). If one fails, it can be fixed and
+    loaded again by itself.
+    
+    The files are named after sqlFilePath (see shardFilePath).
+    
+    Returns a list of strings: the path of each file written.
+    '''
+    shardPaths = []
+    for (label, shardLines) in splitShards(dataLines, samplesPerShard):
+        shardPath = shardFilePath(sqlFilePath, label)
+        writeSQL(shardLines, shardPath, prgID, setupID, tabletID, commitTransaction, useCopy, logStatements, batchSize)
+        shardPaths.append(shardPath)
+    return shardPaths
     
 #if __name__ == '__main__':
 #    testInPath = "/Users/jg177/Desktop/Team's Data/SAMSUNG FOCAL DATA/Sept 2015 ALL DATA.txt"
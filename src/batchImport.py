@@ -0,0 +1,230 @@
+'''
+Created on 17 Oct 2026
+
+Processes many raw Prim8 data files ("dumps") at once, e.g. all the dumps
+from all the tablets at the end of a month. Each dump is processed exactly
+as in dumpFileImportGUI, but several are processed at the same time, each
+in its own process.
+
+The output file path and tablet ID for each dump are guessed from the dump's
+path, the same way dumpFileImportGUI guesses them. After all the dumps are
+processed, a tab-delimited "manifest" is written listing each dump, its
+output file, the number of lines written, and how long it took.
+
+Syntax (run from the src directory, like the rest of the program):
+
+python3 batchImport.py "path/to/dumps"
+OR
+python3 batchImport.py "path/to/dumps/*/*.csv" -w 4 -m manifest.txt
+'''
+from concurrent.futures import ProcessPoolExecutor
+from constants import prim8Name, prim8Version, prim8Setup
+from glob import glob
+from os import path
+import argparse
+
+# Name of the manifest file, if no other is given
+manifestFileName = 'import_manifest.txt'
+
+def guessSaveFilePath(inputFilePath):
+    '''
+    Using the path of the input file, guesses an appropriate path for the
+    output file.
+
+    Assumes that the input file's path will be of the format:
+        [...]/YYyymmdd III SX/[input file name]
+            YYyymmdd: Date for this file, all numbers
+            III: Observer's initials
+            SX: Two-letter-code (usually "S" and a letter) indicating the
+                tablet ID
+
+    Output file name will be yymmddSX.txt, in the same directory as the
+    input file.
+    (Observer's initials are ignored in the new file name)
+
+    Returns a string: the output file's path.
+    '''
+    saveDirPath = path.split(inputFilePath)[0]
+    saveDirName = path.split(saveDirPath)[1]
+
+    splitSaveDir = saveDirName.split()
+    saveFileName = splitSaveDir[0][2:] + splitSaveDir[2] + '.txt'
+
+    return path.join(saveDirPath, saveFileName)
+
+def guessTabletID(filePath):
+    '''
+    filePath is a string and a file path, presumably for the file that the
+    processed data are written to.  Its last 6 characters will likely be
+    '[2-character tablet ID].txt'.
+
+    Returns a string: the 2 characters representing the tablet ID.
+    '''
+    return filePath[-6:-4]
+
+def findDumpFiles(dumpLocation):
+    '''
+    dumpLocation is a string: either the path to a directory, or a "glob"
+    pattern (e.g. "./dumps/*/*.csv").
+
+    If dumpLocation is a directory, finds all the .csv files in it and in
+    all of its subdirectories. Otherwise, finds all the files that match the
+    pattern.
+
+    Returns a sorted list of file paths.
+    '''
+    if path.isdir(dumpLocation):
+        dumpLocation = path.join(dumpLocation, '**', '*.csv')
+
+    return sorted([filePath for filePath in glob(dumpLocation, recursive = True) if path.isfile(filePath)])
+
+def importOneDump(dumpPath, outputPath, appName, appVersion, setupVersion, tabletID, useCache = True):
+    '''
+    Processes the dump at dumpPath (using the dumpCache) and writes the result
+    to outputPath, just like the "Import" button in dumpFileImportGUI.
+    Anything printed along the way is discarded, because several of these
+    may be running at once. If useCache is False, the dumpCache isn't used
+    (see dumpCache.loadAllDicts).
+
+    This needs to be a module-level function, so it can be run in another
+    process.
+
+    Returns a list of strings: one row for the manifest (see
+    writeManifest).
+    '''
+    from io import StringIO
+    from contextlib import redirect_stdout
+    from readDumpFile import writeAll
+    from dumpCache import loadAllDicts
+    from time import perf_counter
+
+    startTime = perf_counter()
+    status = 'OK'
+    numLines = 0
+
+    try:
+        with redirect_stdout(StringIO()):
+            allData = loadAllDicts(dumpPath, maxBytes = -1 if useCache else 0)
+            if len(allData) == 0:
+                status = 'FAILED: problem reading the dump'
+            else:
+                writeAll(outputPath, appName, appVersion, setupVersion, tabletID, allData)
+        if status == 'OK':
+            outFile = open(outputPath, 'r')
+            numLines = sum(1 for line in outFile) - 1 # Don't count the header line
+            outFile.close()
+    except Exception as problem:
+        status = 'FAILED: ' + repr(problem)
+
+    elapsed = '%.2f' % (perf_counter() - startTime)
+    return [dumpPath, outputPath, tabletID, str(numLines), elapsed, status]
+
+def writeManifest(manifestPath, manifestRows):
+    '''
+    Writes the manifest of a batch import to the file at manifestPath.
+    manifestRows is a list of lists of strings, one for each dump:
+        [dump path, output path, tablet ID, number of lines written, seconds, status]
+    The file is tab-delimited, with a line of column names first.
+    '''
+    manifestFile = open(manifestPath, 'w')
+    manifestFile.write('\t'.join(['dump', 'output', 'tablet', 'lines', 'seconds', 'status']) + '\n')
+    for row in manifestRows:
+        manifestFile.write('\t'.join(row) + '\n')
+    manifestFile.close()
+
+def batchImport(dumpLocation, appName = prim8Name, appVersion = prim8Version, setupVersion = prim8Setup, maxWorkers = None, manifestPath = '', useCache = True):
+    '''
+    Processes all the dumps found at dumpLocation (a directory or a "glob"
+    pattern, see findDumpFiles). For each one, the output file path and
+    tablet ID are guessed from the dump's path (see guessSaveFilePath and
+    guessTabletID). Since that only uses the dump's directory, if more than one
+    dump is in the same directory, only the first (in sorted order) is
+    processed; the others are marked as failed in the manifest.
+
+    appName, appVersion, and setupVersion are strings, used for all the
+    dumps. See readDumpFile.writeAll.
+
+    maxWorkers is the number of dumps to process at the same time. If not
+    provided, it's the number of processors on this computer.
+
+    manifestPath is where to write the manifest. If not provided, the
+    manifest goes in dumpLocation (if it's a directory) or the current
+    directory, named by manifestFileName.
+
+    useCache is passed along to importOneDump.
+
+    Returns a list of lists of strings: the rows of the manifest.
+    '''
+    from time import perf_counter
+
+    if manifestPath == '':
+        manifestDir = dumpLocation if path.isdir(dumpLocation) else '.'
+        manifestPath = path.join(manifestDir, manifestFileName)
+
+    allDumps = findDumpFiles(dumpLocation)
+    print("Found", len(allDumps), "dump file(s) at", dumpLocation)
+
+    startTime = perf_counter()
+    manifestRows = []
+    pending = []
+
+    usedOutputs = {} # Output path: the dump that's being written to it
+    with ProcessPoolExecutor(max_workers = maxWorkers) as executor:
+        for dumpPath in allDumps:
+            try:
+                outputPath = guessSaveFilePath(dumpPath)
+            except IndexError:
+                manifestRows.append([dumpPath, '', '', '0', '0.00', 'FAILED: could not guess output file name'])
+                continue
+            if outputPath in usedOutputs: # Another dump in the same directory. Don't let them overwrite each other.
+                manifestRows.append([dumpPath, outputPath, '', '0', '0.00', 'FAILED: output path already used by ' + usedOutputs[outputPath]])
+                continue
+            usedOutputs[outputPath] = dumpPath
+            tabletID = guessTabletID(outputPath)
+            pending.append(executor.submit(importOneDump, dumpPath, outputPath, appName, appVersion, setupVersion, tabletID, useCache))
+
+        for job in pending:
+            row = job.result()
+            print(row[-1], '\t', path.basename(row[0]), '->', path.basename(row[1]), '(' + row[3], 'lines in', row[4], 'seconds)')
+            manifestRows.append(row)
+
+    manifestRows.sort()
+    writeManifest(manifestPath, manifestRows)
+    print("Finished", len(manifestRows), "dump file(s) in %.2f seconds." % (perf_counter() - startTime), "Manifest written to", manifestPath)
+
+    return manifestRows
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Process many Prim8 dump files at once."
+    )
+
+    parser.add_argument(
+        "dumps",
+        help="Directory containing the dumps (searched recursively for .csv files), or a glob pattern"
+    )
+
+    parser.add_argument(
+        "-w", "--workers",
+        help="Number of dumps to process at the same time (default: number of processors)",
+        type=int,
+        default=None
+    )
+
+    parser.add_argument(
+        "-m", "--manifest",
+        help="Path to the manifest file (default: " + manifestFileName + " in the dump directory)",
+        default=''
+    )
+
+    parser.add_argument("--no-cache", help="Don't use the dump cache", action='store_true')
+    parser.add_argument("--app", help="App used to collect data", default=prim8Name)
+    parser.add_argument("--app-version", help="App version number", default=prim8Version)
+    parser.add_argument("--setup", help="App setup name", default=prim8Setup)
+
+    args = parser.parse_args()
+
+    batchImport(args.dumps, args.app, args.app_version, args.setup, args.workers, args.manifest, not args.no_cache)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,681 @@
+'''
+Created on 17 Oct 2026
+
+Rough timing comparisons between older and newer ways of doing the same
+work, using the sample data in this repository (scaled up where that
+helps).  Run from the src directory, like the rest of the program:
+    python3 benchmarks.py              (runs everything)
+    python3 benchmarks.py instanceJoin (runs only the named benchmark(s))
+
+Nothing here is used by the rest of the program.
+'''
+import csv
+import io
+import sys
+from contextlib import redirect_stdout
+from os import path
+from tempfile import mkdtemp
+from time import perf_counter
+
+sampleDumpPath = './../import_test.csv'
+
+def timeIt(someFunction, repeats = 3):
+    '''
+    Calls someFunction (which takes no parameters) "repeats" times, with
+    anything it prints thrown away.
+
+    Returns the fastest time (in seconds) it took, and the value it returned.
+    '''
+    bestTime = None
+    for i in range(repeats):
+        with redirect_stdout(io.StringIO()):
+            startTime = perf_counter()
+            result = someFunction()
+            thisTime = perf_counter() - startTime
+        if bestTime is None or thisTime < bestTime:
+            bestTime = thisTime
+    return bestTime, result
+
+def writeResult(benchName, oldTime, newTime, detail = ''):
+    '''
+    Prints the old and new times, and the speedup.
+    '''
+    print(benchName + ' ' + detail)
+    print('\told:\t%.4f s' % oldTime)
+    print('\tnew:\t%.4f s' % newTime)
+    print('\tspeedup:\t%.1fx' % (oldTime / newTime))
+
+def scaleDump(dumpPath, scaledPath, factor):
+    '''
+    Writes a copy of the Prim8 dump at dumpPath to scaledPath, with the
+    behaviorinstances (and their modifiers) repeated "factor" times.  Each
+    repeat gets new IDs, so the result is a valid, bigger dump.
+
+    Returns scaledPath.
+    '''
+    from constants import p8behaviorinstances, p8modifiers
+
+    inFile = open(dumpPath, 'r', newline='')
+    allLines = list(csv.reader(inFile))
+    inFile.close()
+
+    # Find the biggest IDs, so the copies can start after them
+    maxIDs = {p8behaviorinstances: 0, p8modifiers: 0}
+    currentTable = ''
+    for line in allLines:
+        if len(line) == 1:
+            currentTable = line[0]
+        elif currentTable in maxIDs and line[0].isdigit():
+            maxIDs[currentTable] = max(maxIDs[currentTable], int(line[0]))
+    maxInstance = maxIDs[p8behaviorinstances]
+    maxModifier = maxIDs[p8modifiers]
+
+    outFile = open(scaledPath, 'w', newline='')
+    writer = csv.writer(outFile)
+    currentTable = ''
+    for line in allLines:
+        if len(line) == 1:
+            currentTable = line[0]
+        writer.writerow(line)
+        if not line[0].isdigit() or currentTable not in [p8behaviorinstances, p8modifiers]:
+            continue
+        for copyNum in range(1, factor):
+            newLine = line[:]
+            if currentTable == p8behaviorinstances:
+                newLine[0] = str(int(line[0]) + (copyNum * maxInstance))
+            else:
+                newLine[0] = str(int(line[0]) + (copyNum * maxModifier))
+                newLine[1] = str(int(line[1]) + (copyNum * maxInstance))
+            writer.writerow(newLine)
+    outFile.close()
+
+    return scaledPath
+
+def nestedLookupInstance(dayTime, eventKey, masterDict):
+    '''
+    The way writeInstance used to build each line: by walking the nested
+    dictionaries for every row.  Kept here only for comparison.
+    '''
+    from constants import p8behaviors, p8behaviorinstances, p8behaviortypes, p8individuals, p8modifiers, dictInstMods, neighborAbbrev, emptyAbbrev, proxBehavName
+    from readDumpFile import getObserver, getGroupAbbrev
+    from codeRegistry import getFoodCodes
+
+    outList = []
+    eventTypeID = masterDict[p8behaviors][(masterDict[p8behaviorinstances][eventKey][1])][7]
+    eventType = masterDict[p8behaviortypes][eventTypeID][1]
+    if eventType == proxBehavName:
+        eventType = neighborAbbrev
+    outList.append(eventType.upper())
+    outList.append(getObserver(masterDict, eventKey).upper())
+    outList.append(dayTime.date().isoformat())
+    outList.append(dayTime.time().isoformat())
+    currentGrpID = masterDict[p8individuals][(masterDict[p8behaviorinstances][eventKey][0])][4]
+    outList.append(getGroupAbbrev(masterDict, currentGrpID).upper())
+    outList.append(str(masterDict[p8individuals][(masterDict[p8behaviorinstances][eventKey][0])][1]).upper())
+    outList.append(str(masterDict[p8behaviors][(masterDict[p8behaviorinstances][eventKey][1])][1]).upper())
+    if masterDict[p8behaviorinstances][eventKey][2] == '':
+        acteeID = emptyAbbrev
+    else:
+        acteeID = str(masterDict[p8individuals][(masterDict[p8behaviorinstances][eventKey][2])][1])
+    outList.append(acteeID.upper())
+    if eventKey in masterDict[dictInstMods]:
+        modifier = masterDict[p8modifiers][masterDict[dictInstMods][eventKey]][1]
+        modifier = getFoodCodes().get(modifier.upper(), modifier)
+        outList.append(modifier.upper())
+    return '\t'.join(outList) + '\n'
+
+def instanceJoin(factor = 20):
+    '''
+    Compares writing every behavior instance by walking the nested
+    dictionaries for each row, against joining them all once
+    (addInstanceRecordsDict) and then only formatting each row.
+    '''
+    from constants import p8behaviorinstances, dictInstRecords
+    from readDumpFile import makeAllDicts, writeInstance, addInstanceRecordsDict
+    from datetime import datetime
+
+    scaledPath = scaleDump(sampleDumpPath, path.join(mkdtemp(), 'scaled.csv'), factor)
+    with redirect_stdout(io.StringIO()):
+        masterDict = makeAllDicts(scaledPath)
+    eventKeys = [k for k in masterDict[p8behaviorinstances].keys() if type(k) == int]
+    dayTime = datetime(2015, 8, 10, 7, 6, 46)
+
+    def oldWay():
+        return [nestedLookupInstance(dayTime, k, masterDict) for k in eventKeys]
+
+    def newWay():
+        masterDict.pop(dictInstRecords, None)
+        addInstanceRecordsDict(masterDict)
+        return [writeInstance(dayTime, k, masterDict)[0] for k in eventKeys]
+
+    oldTime, oldLines = timeIt(oldWay)
+    newTime, newLines = timeIt(newWay)
+    if oldLines != newLines:
+        print('WARNING: old and new output differ!')
+    writeResult('instanceJoin', oldTime, newTime, '(%d behavior instances)' % len(eventKeys))
+
+def dumpToSQL(factor = 20):
+    '''
+    Compares getting from a parsed dump to SQL by writing the processed .txt
+    file and reading it back in (readDumpFile.writeAll, then
+    babaseWriter.writeAll), against using the lines of processed data
+    straight from memory (dumpPipeline.getDataLines, then
+    babaseWriter.writeSQL).
+    '''
+    from constants import p8behaviorinstances
+    from readDumpFile import makeAllDicts, writeAll, makeHeaderLine
+    from babaseWriter import writeAll as writeAllSQL, writeSQL
+    from babaseWriteHelpers import getProgramSetup
+    from dumpPipeline import getDataLines
+
+    tempDir = mkdtemp()
+    scaledPath = scaleDump(sampleDumpPath, path.join(tempDir, 'scaled.csv'), factor)
+    with redirect_stdout(io.StringIO()):
+        masterDict = makeAllDicts(scaledPath)
+    textPath = path.join(tempDir, 'scaled.txt')
+    oldSQLPath = path.join(tempDir, 'old.sql')
+    newSQLPath = path.join(tempDir, 'new.sql')
+
+    def oldWay():
+        writeAll(textPath, 'AMBOPRIM8', '1.151128', 'DEC15', 'SB', masterDict)
+        writeAllSQL(textPath, oldSQLPath, True)
+
+    def newWay():
+        prgID, setupID, tabletName = getProgramSetup(makeHeaderLine('AMBOPRIM8', '1.151128', 'DEC15', 'SB'))
+        writeSQL(getDataLines(masterDict), newSQLPath, prgID, setupID, tabletName, True)
+
+    oldTime = timeIt(oldWay, 5)[0]
+    newTime = timeIt(newWay, 5)[0]
+    if open(oldSQLPath).read() != open(newSQLPath).read():
+        print('WARNING: old and new output differ!')
+    writeResult('dumpToSQL', oldTime, newTime, '(%d behavior instances)' % (len(masterDict[p8behaviorinstances]) - 1))
+
+def lazyTables(repeats = 20):
+    '''
+    Compares reading every table of a dump (makeAllDicts) against indexing
+    it and reading only the tables that writing the processed data actually
+    uses (dumpIndex.makeLazyDicts).  Uses the sample dump as it is, because
+    scaleDump would change how big the tables are compared to each other.
+    '''
+    from constants import p8TableList
+    from readDumpFile import makeAllDicts, writeAll
+    from dumpIndex import makeLazyDicts
+
+    tempDir = mkdtemp()
+    oldTextPath = path.join(tempDir, 'old.txt')
+    newTextPath = path.join(tempDir, 'new.txt')
+
+    # Find out which tables are used
+    with redirect_stdout(io.StringIO()):
+        lazyDict = makeLazyDicts(sampleDumpPath)
+        writeAll(newTextPath, 'AMBOPRIM8', '1.151128', 'DEC15', 'SB', lazyDict)
+        writeAll(oldTextPath, 'AMBOPRIM8', '1.151128', 'DEC15', 'SB', makeAllDicts(sampleDumpPath))
+    if open(oldTextPath).read() != open(newTextPath).read():
+        print('WARNING: old and new output differ!')
+    usedTables = [table for table in p8TableList if lazyDict.isRead(table)]
+
+    def oldWay():
+        return makeAllDicts(sampleDumpPath)
+
+    def newWay():
+        lazyDict = makeLazyDicts(sampleDumpPath)
+        for table in usedTables:
+            lazyDict[table]
+        return lazyDict
+
+    oldTime = timeIt(oldWay, repeats)[0]
+    newTime = timeIt(newWay, repeats)[0]
+    writeResult('lazyTables', oldTime, newTime, '(%d of %d tables used)' % (len(usedTables), len(p8TableList)))
+
+def isdigitTypeDumpRow(line):
+    '''
+    The way typeDumpRow used to convert each line: any item that looked like
+    a number became an integer, whatever column it was in.  Kept here only
+    for comparison.
+    '''
+    for x,item in enumerate(line):
+        if item.isdigit():
+            line[x] = int(item)
+    return line
+
+def typedColumns(factor = 20):
+    '''
+    Compares converting every line of a dump by checking every item
+    (isdigitTypeDumpRow), against converting only the number columns given
+    by each table's legend (readDumpFile.getIntColumns and typeDumpRow).
+    Only the conversion is timed, not reading the file.
+    '''
+    from readDumpFile import getIntColumns, typeDumpRow
+
+    scaledPath = scaleDump(sampleDumpPath, path.join(mkdtemp(), 'scaled.csv'), factor)
+    inFile = open(scaledPath, 'r', newline='')
+    allTables = [] ##(legend, list of lines)
+    for line in csv.reader(inFile):
+        if len(line) == 1:
+            allTables.append((None, []))
+        elif len(line) > 1 and allTables[-1][0] is None:
+            allTables[-1] = (line, [])
+        elif len(line) > 1:
+            allTables[-1][1].append(line)
+    inFile.close()
+    allTables = [(legend, lines) for (legend, lines) in allTables if legend is not None]
+
+    def oldWay():
+        return [isdigitTypeDumpRow(line[:]) for (legend, lines) in allTables for line in lines]
+
+    def newWay():
+        allRows = []
+        for (legend, lines) in allTables:
+            intColumns = getIntColumns(legend)
+            allRows.extend([typeDumpRow(line[:], intColumns) for line in lines])
+        return allRows
+
+    oldTime, oldRows = timeIt(oldWay)
+    newTime, newRows = timeIt(newWay)
+    numChanged = sum([1 for (oldRow, newRow) in zip(oldRows, newRows) if oldRow != newRow])
+    writeResult('typedColumns', oldTime, newTime, '(%d lines, %d with text that is no longer made a number)' % (len(newRows), numChanged))
+
+def yearOfTimestamps(linesPerDay = 1000):
+    '''
+    Compares converting the date and time of every line in a year of data to
+    a datetime with strptime (as getDateTime used to), against converting
+    them to seconds since 1970 with timestampCodec.rowEpochs.  Also compares
+    writing every date in the "ddMMMyy" Kenyan format, with strftime and with
+    timestampCodec.formatKenyaDate.
+
+    The "data" are only lines with a date at [2] and a time at [3], spread
+    through the day, linesPerDay for every day of 2015.
+    '''
+    from datetime import datetime, date, timedelta
+    import timestampCodec
+
+    allLines = []
+    for dayNum in range(365):
+        thisDate = (date(2015, 1, 1) + timedelta(days = dayNum)).isoformat()
+        for lineNum in range(linesPerDay):
+            daySeconds = 6 * 3600 + lineNum * 43200 // linesPerDay # Between 06:00 and 18:00
+            thisTime = '%02d:%02d:%02d' % (daySeconds // 3600, daySeconds // 60 % 60, daySeconds % 60)
+            allLines.append(['PNT', 'ABC', thisDate, thisTime])
+
+    def oldParse():
+        return [datetime.strptime(' '.join(line[2:4]), '%Y-%m-%d %H:%M:%S') for line in allLines]
+
+    def newParse():
+        timestampCodec.dateSeconds.clear() # Don't let one repeat use what an earlier one saved
+        timestampCodec.timeSeconds.clear()
+        return timestampCodec.rowEpochs(allLines)
+
+    oldTime, oldDates = timeIt(oldParse)
+    newTime, newEpochs = timeIt(newParse)
+    numDiffer = sum([1 for (oldDate, epoch) in zip(oldDates, newEpochs) if oldDate != timestampCodec.toDatetime(epoch)])
+    writeResult('yearOfTimestamps', oldTime, newTime, '(parsing %d lines, %d different)' % (len(allLines), numDiffer))
+
+    def oldFormat():
+        return [datetime.strftime(thisDate, '%d%b%y').upper() for thisDate in oldDates]
+
+    def newFormat():
+        timestampCodec.dayDates.clear()
+        return [timestampCodec.formatKenyaDate(epoch) for epoch in newEpochs]
+
+    oldTime, oldStrings = timeIt(oldFormat)
+    newTime, newStrings = timeIt(newFormat)
+    numDiffer = sum([1 for (oldString, newString) in zip(oldStrings, newStrings) if oldString != newString])
+    writeResult('yearOfTimestamps', oldTime, newTime, '(Kenyan dates for %d lines, %d different)' % (len(allLines), numDiffer))
+
+def pairwiseFocalOverlaps(dataLines):
+    '''
+    The way checkFocalOverlaps used to work: every focal header compared with
+    every other one, using findOverlaps.  Kept here only for comparison.
+    '''
+    from errorCheckingHelpers import findOverlaps
+
+    allFocals = [line for line in dataLines if line[0] == 'HDR']
+    overlapHdrs = []
+    for focal in allFocals:
+        for overlap in findOverlaps(focal, allFocals):
+            overlapHdrs.append((focal, overlap))
+    return overlapHdrs
+
+def focalOverlaps(sizes = (250, 500, 1000, 2000)):
+    '''
+    Compares pairwiseFocalOverlaps against checkFocalOverlaps, for more and
+    more focal headers, to show how each grows.  The headers are like a
+    month of data gathered from several tablets: 10-minute focals, one after
+    another through each day on each tablet, with the tablets' days
+    overlapping.
+    '''
+    from errorCheckingHelpers import checkFocalOverlaps
+    from timestampCodec import formatDate, formatTime
+
+    for numFocals in sizes:
+        dataLines = []
+        for focalNum in range(numFocals):
+            tablet = focalNum % 4
+            dayNum = (focalNum // 4) // 60
+            begin = dayNum * 86400 + 6 * 3600 + ((focalNum // 4) % 60) * 600 + tablet * 37 - (focalNum % 7)
+            dataLines.append(['HDR', 'OB' + str(tablet), formatDate(begin), formatTime(begin), 'GRP', 'SNM', 'JUV', formatTime(begin + 600)])
+
+        oldTime, oldPairs = timeIt(lambda: pairwiseFocalOverlaps(dataLines), 1)
+        newTime, newPairs = timeIt(lambda: checkFocalOverlaps(dataLines))
+        writeResult('focalOverlaps', oldTime, newTime, '(%d focals, %d overlaps, same result: %s)' % (numFocals, len(newPairs), oldPairs == newPairs))
+
+def separateChecks(dataLines):
+    '''
+    The checks in errorChecking.errorAlertSummary, done the way it used to do
+    them: each check is its own function (from errorCheckingHelpers), going
+    through all of dataLines on its own.  Kept here only for comparison.
+
+    Returns a list with each check's results.
+    '''
+    from constants import focalAbbrev, pntAbbrev, neighborAbbrev, noteAbbrev, adlibAbbrev, outOfSightValue, stypeJuv, p8_nghcodes
+    from constants import bb_mount, bb_ejaculation, bb_consort, bb_mount_long, bb_ejaculation_long, bb_consort_long, bb_consort_long2
+    from errorCheckingHelpers import checkDuplicateFocals, checkDuplicateGroups, checkFocalOverlaps, checkInvalidFocalTypes, theseWithoutThose
+    from errorCheckingHelpers import checkPointMatchesFocal, checkTooManyPoints, checkFocalInfantStatus, checkNeighborsPerPoint
+    from errorCheckingHelpers import checkUniqueNeighbors, checkNotesNoFocals, checkActorIsActee, checkActorActeeNotReal, checkNeighborNotReal
+    from errorCheckingHelpers import checkBehavsInNotes, checkSpecificBehavior, checkMountsConsortsDuringFocal, checkMountsConsortsInvolvedFocal
+    from demographyIndex import getInfantPeriods
+
+    MEC_list = [bb_mount, bb_ejaculation, bb_consort, bb_mount_long, bb_ejaculation_long, bb_consort_long, bb_consort_long2]
+    nonMatchingPoints = ['\t'.join(line) for line in checkPointMatchesFocal(dataLines)]
+    noNeighbors = theseWithoutThose(dataLines, pntAbbrev, [neighborAbbrev], beforeThem = [focalAbbrev])
+
+    allResults = []
+    allResults.append(checkDuplicateFocals(dataLines))
+    allResults.append(checkDuplicateGroups(dataLines))
+    allResults.append(checkFocalOverlaps(dataLines))
+    allResults.append(checkInvalidFocalTypes(dataLines))
+    allResults.append(theseWithoutThose(dataLines, focalAbbrev, [pntAbbrev, neighborAbbrev, noteAbbrev, adlibAbbrev]))
+    allResults.append(theseWithoutThose(dataLines, focalAbbrev, [pntAbbrev]))
+    allResults.append(nonMatchingPoints)
+    allResults.append(checkTooManyPoints(dataLines))
+    allResults.append(checkFocalInfantStatus(dataLines, getInfantPeriods()))
+    allResults.append(['\t'.join(line) for line in noNeighbors if line[6] != outOfSightValue and '\t'.join(line) not in nonMatchingPoints])
+    allResults.append(theseWithoutThose(dataLines, focalAbbrev, [pntAbbrev], [neighborAbbrev], [pntAbbrev]))
+    allResults.append([pair[0] for pair in checkNeighborsPerPoint(dataLines) if pair[1] > 3])
+    allResults.append(checkUniqueNeighbors(dataLines, [stypeJuv]))
+    allResults.append([line for line in dataLines if line[0] == neighborAbbrev and line[-1] not in p8_nghcodes])
+    allResults.append(checkNotesNoFocals(dataLines))
+    allResults.append(checkActorIsActee(dataLines))
+    allResults.append(checkActorActeeNotReal(dataLines))
+    allResults.append(checkNeighborNotReal(dataLines))
+    allResults.append(checkBehavsInNotes(dataLines, MEC_list))
+    allResults.append(checkSpecificBehavior(dataLines, MEC_list))
+    allResults.append(checkMountsConsortsDuringFocal(dataLines))
+    allResults.append(checkMountsConsortsInvolvedFocal(dataLines))
+    return allResults
+
+def alertChecks(factors = (1, 4, 16)):
+    '''
+    Compares the time to do all the checks in errorAlertSummary separately
+    (separateChecks) against doing them with errorRules, where they share one
+    FocalIndex and the other shared results, on the sample processed data
+    repeated more and more times.  The time for each
+    line of data is shown too, which should stay about the same as the data
+    grow.  (The new time also includes writing up the results.)
+    '''
+    from errorChecking import errorAlertSummary
+    from processedDataset import loadProcessedDataset
+
+    sampleLines = list(loadProcessedDataset('./../output_test.txt'))
+    for factor in factors:
+        dataLines = [line[:] for i in range(factor) for line in sampleLines]
+        oldTime = timeIt(lambda: separateChecks(dataLines))[0]
+        newTime = timeIt(lambda: errorAlertSummary(dataLines))[0]
+        writeResult('alertChecks', oldTime, newTime, '(%d lines, %.1f microseconds per line)' % (len(dataLines), newTime / len(dataLines) * 1e6))
+
+def unsharedCompareData(dataLines):
+    '''
+    The filtering in compareFocalLogs.importDataForCompares, done the way it
+    used to be: out-of-sight points, non-matching points, and samples without
+    points are all lists, searched line by line (and the out-of-sight points
+    are found again for every line).  Kept here only for comparison.
+
+    Returns the incomplete samples, and the total and in-sight point counts.
+    '''
+    from constants import focalAbbrev, pntAbbrev
+    from errorCheckingHelpers import checkPointMatchesFocal, pointsOutOfSight, theseWithoutThose, getPointsPerFocal
+
+    badData = [line[:] for line in dataLines if line not in pointsOutOfSight(dataLines)]
+    incompletes = [line[:] for line in theseWithoutThose(badData, focalAbbrev, [pntAbbrev])]
+    theFocals = [line for line in dataLines if line[0] == focalAbbrev and line in incompletes]
+
+    nonMatchingPoints = checkPointMatchesFocal(dataLines)
+    theData = [line for line in dataLines if line not in nonMatchingPoints]
+    pointsPerFocal = sorted(getPointsPerFocal(theData).items())
+    oosPoints = pointsOutOfSight(dataLines)
+    theData = [line for line in theData if line not in oosPoints]
+    pointsISPerFocal = sorted(getPointsPerFocal(theData).items())
+    return theFocals, pointsPerFocal, pointsISPerFocal
+
+def compareData(factors = (1, 2, 3)):
+    '''
+    Compares the time to gather the data for comparing with a focal log
+    (compareFocalLogs.importDataForCompares) the old way (unsharedCompareData)
+    against the new, with the results shared through sharedResults, on the
+    sample processed data repeated more and more times.  A new
+    ProcessedDataset is made for each try, so nothing is saved between them.
+    '''
+    from compareFocalLogs import importDataForCompares
+    from processedDataset import loadProcessedDataset, ProcessedDataset
+
+    sample = loadProcessedDataset('./../output_test.txt')
+    for factor in factors:
+        dataLines = [line[:] for i in range(factor) for line in sample]
+        oldTime = timeIt(lambda: unsharedCompareData(dataLines), repeats = 1)[0]
+        newTime = timeIt(lambda: importDataForCompares(ProcessedDataset(sample.header, dataLines, sample.filePath)))[0]
+        writeResult('compareData', oldTime, newTime, '(%d lines)' % len(dataLines))
+
+def linearInfantStatus(dataLines, momDict):
+    '''
+    The infant-status check (errorCheckingHelpers.checkFocalInfantStatus)
+    done the way it used to be: each point's date and time are parsed with
+    strptime, then all of the mom's kids are searched one by one.  momDict
+    is from errorCheckingHelpers.momsAndInfants.  Kept here only for
+    comparison.
+
+    Returns the points that disagree with momDict.
+    '''
+    from datetime import datetime
+    from constants import pntAbbrev, pntActNoInfant
+
+    wrongInfPnts = []
+    for pnt in dataLines:
+        if pnt[0] != pntAbbrev or len(pnt[6]) < 4:
+            continue
+        thisDate = datetime.strptime(pnt[2] + ' ' + pnt[3], '%Y-%m-%d %H:%M:%S')
+        demogSaysInfant = False
+        for (kidBirth, kidEnd) in momDict.get(pnt[5], []):
+            if thisDate >= kidBirth and thisDate <= kidEnd:
+                demogSaysInfant = True
+                break
+        if (pnt[6][2] != pntActNoInfant) != demogSaysInfant:
+            wrongInfPnts.append(pnt + [demogSaysInfant])
+    return wrongInfPnts
+
+def infantStatus(years = (1, 5, 20)):
+    '''
+    Compares the time to check points' infant status against demography data
+    the old way (linearInfantStatus) and with demographyIndex.  The sample
+    processed data are repeated once for each year, and every female in them
+    is given a new infant every year, so the moms file covers the same
+    years.
+    '''
+    from datetime import date
+    from constants import pntAbbrev
+    from demographyIndex import getInfantPeriods
+    from errorCheckingHelpers import checkFocalInfantStatus, momsAndInfants
+    from processedDataset import loadProcessedDataset
+
+    sample = list(loadProcessedDataset('./../output_test.txt'))
+    moms = sorted(set([line[5] for line in sample if line[0] == pntAbbrev]))
+    tempDir = mkdtemp()
+    for numYears in years:
+        dataLines = []
+        momLines = ['mom\tbioid\tkid_birth\tend_date']
+        for year in range(numYears):
+            for line in sample:
+                thisDate = date(int(line[2][:4]) - year, int(line[2][5:7]), int(line[2][8:]))
+                dataLines.append(line[:2] + [thisDate.isoformat()] + line[3:])
+            firstYear = int(sample[0][2][:4]) - year
+            for mom in moms:
+                momLines.append('\t'.join([mom, str(year), date(firstYear - 1, 9, 1).isoformat(), date(firstYear, 3, 1).isoformat()]))
+        momsPath = path.join(tempDir, 'moms%d.txt' % numYears)
+        momsFile = open(momsPath, 'w')
+        momsFile.write('\n'.join(momLines) + '\n')
+        momsFile.close()
+
+        oldTime = timeIt(lambda: linearInfantStatus(dataLines, momsAndInfants(momsPath)))[0]
+        newTime = timeIt(lambda: checkFocalInfantStatus(dataLines, getInfantPeriods(momsPath)))[0]
+        writeResult('infantStatus', oldTime, newTime, '(%d years, %d lines)' % (numYears, len(dataLines)))
+
+def loopBehaviorsInNote(dataLine, criteriaBehavs):
+    '''
+    errorCheckingHelpers.behaviorsInNote, done the way it used to be: every
+    word is made upper case, then each behavior is searched for in the list
+    of words.  Kept here only for comparison.
+    '''
+    theNote = [item.upper() for item in dataLine[-1].split()]
+    for behav in criteriaBehavs:
+        if behav.upper() in theNote:
+            return True
+    return False
+
+def noteScans(factors = (10, 100, 1000)):
+    '''
+    Compares the time to look for mounts, ejaculations, and consorts in
+    notes the old way (loopBehaviorsInNote, once for each of the three
+    checks that do it) against noteScanner, with the words in each note
+    shared by the three.  The sample processed data's notes are repeated
+    more and more times.
+    '''
+    from constants import noteAbbrev, bb_mount, bb_ejaculation, bb_consort, bb_mount_long, bb_ejaculation_long, bb_consort_long, bb_consort_long2
+    from noteScanner import NoteScanner
+    from processedDataset import loadProcessedDataset
+
+    MEC_list = [bb_mount, bb_ejaculation, bb_consort, bb_mount_long, bb_ejaculation_long, bb_consort_long, bb_consort_long2]
+    mountsEtc = [bb_consort, bb_mount, bb_ejaculation]
+    sampleNotes = [line for line in loadProcessedDataset('./../output_test.txt') if line[0] == noteAbbrev]
+
+    def oldScans(notes):
+        return [[note for note in notes if loopBehaviorsInNote(note, behavs)] for behavs in (MEC_list, mountsEtc, mountsEtc)]
+
+    def newScans(notes):
+        noteTokens = {}
+        scanners = [NoteScanner(behavs, noteTokens) for behavs in (MEC_list, mountsEtc, mountsEtc)]
+        return [[note for (row, note) in enumerate(notes) if scanner.hasMatch(row, note)] for scanner in scanners]
+
+    for factor in factors:
+        notes = [line[:] for i in range(factor) for line in sampleNotes]
+        oldTime = timeIt(lambda: oldScans(notes))[0]
+        newTime = timeIt(lambda: newScans(notes))[0]
+        writeResult('noteScans', oldTime, newTime, '(%d notes)' % len(notes))
+
+def countedDuplicateFocals(dataLines):
+    '''
+    errorCheckingHelpers.checkDuplicateFocals, done the way it used to be:
+    list.count for every focal.  Kept here only for comparison.
+
+    Returns the duplicate (date, name) pairs.
+    '''
+    from constants import focalAbbrev
+
+    dateNames = [(line[2], line[5]) for line in dataLines if line[0] == focalAbbrev]
+    return sorted(set([focal for focal in dateNames if dateNames.count(focal) > 1]))
+
+def duplicateFocals(days = (30, 90, 180)):
+    '''
+    Compares the time to find individuals sampled more than once in a day
+    the old way (countedDuplicateFocals) against
+    errorCheckingHelpers.checkDuplicateFocals.  The sample processed data's
+    focal headers are given new dates, so they cover more and more days
+    (e.g. a gathered quarter, or a year).
+    '''
+    from datetime import date, timedelta
+    from constants import focalAbbrev
+    from errorCheckingHelpers import checkDuplicateFocals
+    from processedDataset import loadProcessedDataset
+
+    sampleFocals = [line for line in loadProcessedDataset('./../output_test.txt') if line[0] == focalAbbrev]
+    for numDays in days:
+        dataLines = []
+        for day in range(numDays):
+            thisDate = (date(2015, 1, 1) + timedelta(days = day)).isoformat()
+            dataLines.extend([line[:2] + [thisDate] + line[3:] for line in sampleFocals])
+        oldTime = timeIt(lambda: countedDuplicateFocals(dataLines), repeats = 1)[0]
+        newTime = timeIt(lambda: checkDuplicateFocals(dataLines))[0]
+        writeResult('duplicateFocals', oldTime, newTime, '(%d days, %d focals)' % (numDays, len(dataLines)))
+
+def copyOutput(factor = 20):
+    '''
+    Compares writing SQL for a scaled-up dump as one "insert" per row
+    (babaseWriter.writeSQL) against writing it as COPY blocks into staging
+    tables (babaseWriter.writeCopySQL). Only the time to write the SQL is
+    measured here, not the time for the database to run it, but the size of
+    each file is reported too.
+    '''
+    from readDumpFile import makeAllDicts, makeHeaderLine
+    from babaseWriter import writeSQL, writeCopySQL
+    from babaseWriteHelpers import getProgramSetup
+    from dumpPipeline import getDataLines
+
+    tempDir = mkdtemp()
+    scaledPath = scaleDump(sampleDumpPath, path.join(tempDir, 'scaled.csv'), factor)
+    with redirect_stdout(io.StringIO()):
+        masterDict = makeAllDicts(scaledPath)
+    dataLines = getDataLines(masterDict)
+    prgID, setupID, tabletName = getProgramSetup(makeHeaderLine('AMBOPRIM8', '1.151128', 'DEC15', 'SB'))
+    insertPath = path.join(tempDir, 'insert.sql')
+    copyPath = path.join(tempDir, 'copy.sql')
+
+    with redirect_stdout(io.StringIO()):
+        oldTime = timeIt(lambda: writeSQL(dataLines, insertPath, prgID, setupID, tabletName, True), 5)[0]
+        newTime = timeIt(lambda: writeCopySQL(dataLines, copyPath, prgID, setupID, tabletName, True), 5)[0]
+    writeResult('copyOutput', oldTime, newTime, '(%d lines; %d KB of inserts, %d KB with COPY)' % (len(dataLines), path.getsize(insertPath) // 1024, path.getsize(copyPath) // 1024))
+
+def batchedInserts(factor = 20):
+    '''
+    Compares writing SQL for a scaled-up dump with every row in its own
+    "insert" command (batchSize 1) against combining neighbors, ad-libs, and
+    notes into multi-row commands (constants.sqlBatchSize). Only the time to
+    write the SQL is measured, but the number of commands in each file is
+    reported too, since that's what the database has to parse and plan.
+    '''
+    from readDumpFile import makeAllDicts, makeHeaderLine
+    from babaseWriter import writeSQL
+    from babaseWriteHelpers import getProgramSetup
+    from constants import sqlBatchSize
+    from dumpPipeline import getDataLines
+
+    tempDir = mkdtemp()
+    scaledPath = scaleDump(sampleDumpPath, path.join(tempDir, 'scaled.csv'), factor)
+    with redirect_stdout(io.StringIO()):
+        masterDict = makeAllDicts(scaledPath)
+    dataLines = getDataLines(masterDict)
+    prgID, setupID, tabletName = getProgramSetup(makeHeaderLine('AMBOPRIM8', '1.151128', 'DEC15', 'SB'))
+    singlePath = path.join(tempDir, 'single.sql')
+    batchedPath = path.join(tempDir, 'batched.sql')
+
+    oldTime = timeIt(lambda: writeSQL(dataLines, singlePath, prgID, setupID, tabletName, True, batchSize = 1), 5)[0]
+    newTime = timeIt(lambda: writeSQL(dataLines, batchedPath, prgID, setupID, tabletName, True, batchSize = sqlBatchSize), 5)[0]
+    singleInserts = open(singlePath).read().count('INSERT INTO')
+    batchedInserts = open(batchedPath).read().count('INSERT INTO')
+    writeResult('batchedInserts', oldTime, newTime, '(%d lines; %d inserts, %d batched)' % (len(dataLines), singleInserts, batchedInserts))
+
+allBenchmarks = {}
+allBenchmarks['instanceJoin'] = instanceJoin
+allBenchmarks['dumpToSQL'] = dumpToSQL
+allBenchmarks['lazyTables'] = lazyTables
+allBenchmarks['typedColumns'] = typedColumns
+allBenchmarks['yearOfTimestamps'] = yearOfTimestamps
+allBenchmarks['focalOverlaps'] = focalOverlaps
+allBenchmarks['alertChecks'] = alertChecks
+allBenchmarks['compareData'] = compareData
+allBenchmarks['infantStatus'] = infantStatus
+allBenchmarks['noteScans'] = noteScans
+allBenchmarks['duplicateFocals'] = duplicateFocals
+allBenchmarks['copyOutput'] = copyOutput
+allBenchmarks['batchedInserts'] = batchedInserts
+
+if __name__ == '__main__':
+    for benchName in (sys.argv[1:] or sorted(allBenchmarks.keys())):
+        allBenchmarks[benchName]()
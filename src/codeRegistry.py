@@ -0,0 +1,90 @@
+'''
+Created on 17 Oct 2026
+
+Registry of code-translation tables, e.g. the group and food codes used to
+convert names/values used in Prim8 into what we use in Babase.
+
+Each code file is read only once and kept in a dictionary, so translating a
+code is a single dictionary lookup no matter how many times it's done. A
+table is automatically re-read only when its file has been modified since
+it was last read, so a long-running GUI session still picks up any edits to
+the code files.
+'''
+from os import path, stat
+
+# Everything loaded so far. Keys are (absolute file path, loader function,
+# loader arguments) tuples, values are (file modification time, loaded data)
+# tuples.
+_loadedFiles = {}
+
+def loadWhenChanged(filePath, loader, *loaderArgs):
+    '''
+    filePath is a string, the path to a file. loader is a function whose first
+    parameter is a file path, and loaderArgs are any other parameters to pass
+    to it.
+
+    Returns the result of loader(filePath, *loaderArgs). The first time this
+    is called for a given file/loader/arguments, the loader is actually called
+    and its result is saved. After that, the saved result is returned, unless
+    the file's modification time has changed. In that case the file is loaded
+    again.
+    '''
+    fileKey = (path.abspath(filePath), loader, loaderArgs)
+    modTime = stat(filePath).st_mtime_ns
+
+    loaded = _loadedFiles.get(fileKey)
+    if loaded is None or loaded[0] != modTime:
+        loaded = (modTime, loader(filePath, *loaderArgs))
+        _loadedFiles[fileKey] = loaded
+
+    return loaded[1]
+
+def readCodeTable(codeFilePath, longIndex, shortIndex):
+    '''
+    Given the path (codeFilePath) for a tab-delimited txt file, makes a
+    dictionary to translate the file's "long" codes into "short" codes.
+        --The "long" code in codeFile is at the (longIndex)'th index in each line (assuming the line is split).
+        --The "short" code in codeFile is at the (shortIndex)'th index in each line (assuming the line is split).
+    Both codes are converted to upper case.  Lines too short to have both
+    codes are skipped.  If a long code occurs more than once, the first one
+    in the file is used.
+
+    Returns the dictionary: keys are long codes, values are short codes.
+    '''
+    codes = {}
+
+    codeFile = open(codeFilePath, 'r')
+    for code in codeFile:
+        cleanCode = code.strip().split("\t")
+        if len(cleanCode) <= max(longIndex, shortIndex):
+            continue
+        longCode = cleanCode[longIndex].upper()
+        if longCode not in codes:
+            codes[longCode] = cleanCode[shortIndex].upper()
+    codeFile.close()
+
+    return codes
+
+def getCodeTable(codeFilePath, longIndex, shortIndex):
+    '''
+    Returns the long-to-short dictionary for the code file at codeFilePath
+    (see readCodeTable). The file is only read again if it has changed since
+    the last time it was read.
+    '''
+    return loadWhenChanged(codeFilePath, readCodeTable, longIndex, shortIndex)
+
+def getGroupCodes():
+    '''
+    Returns a dictionary to convert group names as used in Prim8 (upper case)
+    to the abbreviations preferred by Babase.
+    '''
+    from constants import groupCodesFile
+    return getCodeTable(groupCodesFile, 3, 2)
+
+def getFoodCodes():
+    '''
+    Returns a dictionary to convert long food names (upper case) to their
+    Babase food codes.
+    '''
+    from constants import foodCodesFile
+    return getCodeTable(foodCodesFile, 1, 0)
@@ -70,7 +70,21 @@ def importDataForCompares(dataLines):
     
     Returns a list of lists of strings, each list of strings for each
     focal sample, and in the "After" format shown above.
+    
+    When dataLines is a ProcessedDataset, this is only worked out once, and
+    saved with the dataset (see sharedResults). A new copy is returned each
+    time, so it can be changed freely.
+    '''
+    from sharedResults import sharedResult
+    
+    return [line[:] for line in sharedResult(dataLines, 'dataForCompares', gatherDataForCompares)]
+
+def gatherDataForCompares(dataLines):
     '''
+    Does the work for importDataForCompares.
+    '''
+    from sharedResults import outOfSightRows
+    
     # List of all the header rows, i.e. the focal samples
     theFocals = [line[:] for line in dataLines if isType(line, focalAbbrev)]
     
@@ -78,16 +92,16 @@ def importDataForCompares(dataLines):
     # samples with no points, or only out-of-sight points.  If we
     # first remove all the out-of-sight points, then gathering samples
     # with no points will include all of these at once.
-    badData = dataLines[:]
-    badData = [line[:] for line in badData if line not in pointsOutOfSight(dataLines)]
+    oosRows = outOfSightRows(dataLines)
+    badData = [line[:] for (row, line) in enumerate(dataLines) if row not in oosRows]
     
-    # Make list of rows with no points (or only OOS points)
-    incompletes = [line[:] for line in theseWithoutThose(badData, focalAbbrev, [pntAbbrev])]
+    # Make set of rows with no points (or only OOS points)
+    incompletes = set([tuple(line) for line in theseWithoutThose(badData, focalAbbrev, [pntAbbrev])])
     
     # Add a "Y" or "N" to each row in theFocals to indicate how
     # "complete" the sample was
     for line in theFocals:
-        if line in incompletes:
+        if tuple(line) in incompletes:
             line.append("N")
         else:
         	line.append("Y")
@@ -184,6 +198,102 @@ def importLogFile(logFilePath):
     return logData
 
 
+def focalKey(line):
+    '''
+    line is a list of strings: one focal from importDataForCompares or one
+    row from importLogFile.  Both have the date, grp, observer, and sname at
+    [1] through [4].
+    
+    Returns a (Date, Grp, Observer, Sname) tuple of strings, used to match
+    real focals with logged ones.
+    '''
+    return tuple(line[1:5])
+
+
+def reconcileFocalLog(dataLines, logFilePath, limitLogDates = False):
+    '''
+    Compares the actual focal samples in dataLines with the ones in the
+    focal sample log, both ways at once.
+    
+    dataLines is a list of lists of strings: the data from a processed 
+    prim8 data file, stripped and split.  logFilePath is a string
+    containing the path to a focal sample log file.  The boolean
+    "limitLogDates" indicates if the dates from the log should be limited
+    to the date range within the data in dataLines, when looking for
+    logged samples that weren't done.
+    
+    Each input is only imported once.  Samples are matched by their
+    (Date, Grp, Observer, Sname) alone, so instead of searching through
+    (and removing from) lists, this just counts how many times each one
+    was logged or done.
+    
+    Returns two lists: the samples that happened but weren't logged (see
+    getFocalsNotLogged), then the samples logged as complete that weren't
+    done (see getLoggedNotDone).
+    '''
+    from collections import Counter
+    
+    realFocals = importDataForCompares(dataLines)
+    logFocals = importLogFile(logFilePath)
+    
+    # Sort realFocals so that the complete ones are on top
+    realFocals.sort(key = itemgetter(5), reverse = True)
+    
+    # How many times each focal was logged, to be used up as real
+    # focals are matched to them
+    loggedCounts = Counter([focalKey(line) for line in logFocals])
+    
+    notLogged = []
+    for line in realFocals:
+        thisFocal = focalKey(line)
+        if loggedCounts[thisFocal] > 0:
+            # Hooray, we found it. Remove this focal from the log
+            loggedCounts[thisFocal] -= 1
+        else:
+            # Focal not found in log. This needs to be returned.
+            notLogged.append(line)
+    
+    # Before returning the list of not-logged samples, sort them by
+    # observer, date, time. Then prune away extra/redundant data.
+    notLogged.sort(key = itemgetter(3, 1, 0))
+    notLogged = [(line[-3], line[-2], line[-1]) for line in notLogged]
+    
+    # Only logged focals that are complete are expected in the data.
+    # (A row that's too short to have a "completed" value, e.g. with no
+    # sname, can't have been logged as complete.)
+    logFocals = [line for line in logFocals if line[5:6] == ['Y']]
+    
+    # If limiting log dates, exclude those that are outside the
+    # desired range.
+    if limitLogDates:
+        # Get the first and last dates from the prim8 data
+        firstDate, lastDate = firstAndLastLines(dataLines)
+        # These items are date-time strings (yyyy-mm-dd hh:mm:ss), so
+        # drop the times before conversion to date objects
+        firstDate = yyyymmddToDate(firstDate[:10])
+        lastDate = yyyymmddToDate(lastDate[:10])
+        
+        logFocals = [line for line in logFocals if firstDate <= yyyymmddToDate(line[1]) <= lastDate]
+    
+    # How many times each focal was done, to be used up as logged
+    # focals are matched to them
+    realCounts = Counter([focalKey(line) for line in realFocals])
+    
+    notDone = []
+    for line in logFocals:
+        thisFocal = focalKey(line)
+        if realCounts[thisFocal] > 0:
+            # Found the logged focal in the real data. Now remove it
+            # from the data
+            realCounts[thisFocal] -= 1
+        else:
+            # Logged focal not in data. Add it to the list of data
+            # that will be returned
+            notDone.append('\t'.join(thisFocal))
+    
+    return notLogged, notDone
+
+
 def getFocalsNotLogged(dataLines, logFilePath):
     '''
     For each _actual_ focal sample in dataLines, checks to see if it
@@ -221,37 +331,7 @@ def getFocalsNotLogged(dataLines, logFilePath):
     always be returned and not the complete one, no matter which
     happened first.
    '''
-    realFocals = importDataForCompares(dataLines)
-    logFocals = importLogFile(logFilePath)
-    
-    # Sort realFocals so that the complete ones are on top
-    realFocals.sort(key = itemgetter(5), reverse = True)
-    
-    # Convert logFocals to list of strings and only keep the values
-    # that we'll use in this comparison (Date, Grp, Observer, Sname)
-    logFocals = ['\t'.join(line[1:5]) for line in logFocals]
-    
-    # Create the list that we'll eventually return
-    notLogged = []
-    
-    for line in realFocals:
-        thisFocal = '\t'.join(line[1:5]) #Date, Grp, Observer, Sname
-        try: # Find thisFocal in logFocals
-            logIdx = logFocals.index(thisFocal)
-            # Hooray, we found it. Remove this focal from the log
-            #print("Found the focal, now remove it from the log")
-            logFocals.pop(logIdx)
-        except ValueError:
-            # Focal not found in log. This needs to be returned.
-            #print("Focal not logged:", thisFocal, ",", line[-2], "point(s)", line[-1], "point(s) in sight")
-            notLogged.append(line)
-    
-    # Before returning the list of not-logged samples, sort them by
-    # observer, date, time. Then prune away extra/redundant data.
-    notLogged.sort(key = itemgetter(3, 1, 0))
-    notLogged = [(line[-3], line[-2], line[-1]) for line in notLogged]
-    
-    return notLogged
+    return reconcileFocalLog(dataLines, logFilePath)[0]
 
 
 def getLoggedNotDone(dataLines, logFilePath, limitLogDates = False):
@@ -274,50 +354,8 @@ def getLoggedNotDone(dataLines, logFilePath, limitLogDates = False):
     The boolean "limitLogDates" indicates if the dates from the log
     should be limited to the date range within the data in dataLines.
     
-    Admittedly, the way this function works is VERY similar to the
-    previous function.  Arguably, a more universal function could be
-    written and just invoked twice.
+    Both this and getFocalsNotLogged are done by reconcileFocalLog. To
+    get both lists, call it directly, so the data and log are only
+    compared once.
     '''
-    realFocals = importDataForCompares(dataLines)
-    logFocals = importLogFile(logFilePath)
-    
-    # Remove logged focals that aren't complete
-    logFocals = [line for line in logFocals if line[5] =='Y']
-    
-    # If limiting log dates, exclude those that are outside the
-    # desired range.
-    if limitLogDates:
-        # Get the first and last dates from the prim8 data
-        firstDate, lastDate = firstAndLastLines(dataLines)
-        # These items are date-time strings (yyyy-mm-dd hh:mm:ss), so
-        # drop the times before conversion to date objects
-        firstDate = yyyymmddToDate(firstDate[:10])
-        lastDate = yyyymmddToDate(lastDate[:10])
-        
-        newLogFocals = []
-        for line in logFocals:
-            thisDate = yyyymmddToDate(line[1])
-            if thisDate >= firstDate and thisDate <= lastDate:
-                newLogFocals.append(line)
-        logFocals = newLogFocals[:]
-    
-    # Convert realFocals to a list of strings, useful for comparison
-    realFocals = ['\t'.join(line[1:5]) for line in realFocals]
-    
-    # Create the list that we'll eventually return
-    notDone = []
-    
-    for line in logFocals:
-        thisFocal = '\t'.join(line[1:5]) # Date, Grp, Observer, Sname
-        try: # Find thisFocal in realFocals
-            realIdx = realFocals.index(thisFocal)
-            # Found the logged focal in the real data. Now remove it
-            # from the log
-            realFocals.pop(realIdx)
-        except ValueError:
-            # Logged focal not in data. Add it to the list of data
-            # that will be returned
-            #print("Logged focal not found in actual data:", thisFocal)
-            notDone.append(thisFocal)
-    
-    return notDone
+    return reconcileFocalLog(dataLines, logFilePath, limitLogDates)[1]
@@ -49,10 +49,16 @@ p8focalbehaviors = 'focalbehaviors'
 p8scanbehaviors = 'scanbehaviors'
 p8modifiers = 'modifiers'
 dictInstMods = 'instances_modifiers' #Not in prim8 data, but during import we create this extra table/dictionary and save it with the rest
+dictInstRecords = 'instance_records' #Also not in prim8 data. Created just before writing, with everything needed to write each behavior instance
 
 # Order in this list is NOT important.
 p8TableList = [p8adlib, p8sites, p8observers, p8groups, p8species, p8individuals, p8biologicalsamples, p8coordinatesystem, p8locations, p8workcalendars, p8behaviortypes, p8behaviors, p8focalfollows, p8scans, p8behaviorinstances, p8focalbehaviors, p8scanbehaviors, p8modifiers] 
 
+# Columns in Prim8 tables that hold whole numbers, and are converted to integers when read.
+#  Any column whose name ends with "id" (e.g. "adlib_id", "individualsid") is also a number.
+#  All other columns (e.g. "Time", names, descriptions) are kept as text, even if they look like numbers.
+p8IntColumns = ['Year', 'Month', 'Day', 'active', 'passive', 'duration', 'durationoffocal', 'durationofscan', 'hasrecipient', 'isstate', 'isalloccurrence', 'isscan', 'partoffollow', 'wascanceled', 'ischanged']
+
 # Tables whose lines represent observations that we want to retain
 observationTables = [p8adlib, p8behaviorinstances, p8focalfollows]
 
@@ -61,6 +67,21 @@ prim8Name = 'AMBOPRIM8'
 prim8Version = '1.151128'
 prim8Setup = 'DEC15' # Used to populate the "setupid" in babase. The name "setup" made more sense for Psion data. It makes less sense for Prim8.
 
+# Files of codes used to translate names/values used in Prim8 into those used in Babase
+# (Paths are relative to the directory the program is run from)
+groupCodesFile = './groupcodes.txt'
+foodCodesFile = './foodcodes.txt'
+
+# Demography data: each mom's kids, and when each was her infant (see demographyIndex)
+momsFile = './momsAndInfants.txt'
+
+# Most rows to add with one SQL "insert" command, where they can be combined (see babaseWriter.writeSQL)
+sqlBatchSize = 100
+
+# Where parsed Prim8 data files are cached, and the most space (in bytes) the cache may use
+dumpCacheDir = './dumpCache'
+dumpCacheMaxBytes = 500 * 1024 * 1024
+
 # Dictionary with abbreviations for all the tablets in use and their descriptions in Babase (SAMPLES_COLLECTION_SYSTEMS.Descr)
 collection_systems = {}
 collection_systems['SA'] = 'Samsung Tablet A'
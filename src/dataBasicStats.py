@@ -49,11 +49,8 @@ if __name__ == '__main__':
     observerIdx = 1
     dateIdx = 2
     
-    myFile = open(myFilePath, 'r')
-    myFile.readline() #Skip first line, assuming it's some header
-    myData = myFile.readlines()
-    myFile.close()
-    myData = [line.strip().split('\t') for line in myData]
+    from processedDataset import loadProcessedDataset
+    myData = loadProcessedDataset(myFilePath) #Skips first line, assuming it's some header
     #Remove interactions with "NULL" actor or actee
     myData = [line for line in myData if line[5] != 'NULL' and line[7] != 'NULL']
     
@@ -0,0 +1,109 @@
+'''
+Created on 17 Oct 2026
+
+An index of when each mom had an infant, from the demography data in the
+"moms" file (see constants.momsFile and errorCheckingHelpers.momsAndInfants
+for its format).
+
+Each mom's infant periods are kept as two sorted arrays of integers: the
+epoch seconds (see timestampCodec) when each period began and ended.
+Periods that overlap (e.g. twins) are merged, so the periods never overlap
+and the arrays are in the same order. Whether she had an infant at any
+time is then a single binary search (bisect), however many kids she has.
+
+The file is only read once, and is read again only if it has been changed
+since (see codeRegistry.loadWhenChanged).
+'''
+from array import array
+from bisect import bisect_right
+
+class InfantPeriods(object):
+    '''
+    The periods when each mom had an infant.
+    '''
+
+    def __init__(self, momKids):
+        '''
+        momKids is a dictionary whose keys are moms' names/IDs, and whose
+        values are lists of (kid birth, end) tuples, both integer epoch
+        seconds. A kid was her "infant" from the very start of its birth
+        through its end, inclusive.
+        '''
+        self.periods = {} ##Mom: (array of period starts, array of period ends)
+        for (mom, kids) in momKids.items():
+            starts = array('q')
+            ends = array('q')
+            for (kidBirth, kidEnd) in sorted(kids):
+                if kidEnd < kidBirth: ##Never an infant
+                    continue
+                if len(starts) > 0 and kidBirth <= ends[-1]: ##Overlaps the last period. Merge them.
+                    ends[-1] = max(ends[-1], kidEnd)
+                else:
+                    starts.append(kidBirth)
+                    ends.append(kidEnd)
+            self.periods[mom] = (starts, ends)
+
+    def __contains__(self, mom):
+        return mom in self.periods
+
+    def hadInfant(self, mom, epochSeconds):
+        '''
+        mom is a mom's name/ID (string) and epochSeconds an integer.
+
+        Returns True if the mom had an infant at epochSeconds, or False. Moms
+        who aren't in the demography data never had an infant.
+        '''
+        if mom not in self.periods:
+            return False
+        (starts, ends) = self.periods[mom]
+        period = bisect_right(starts, epochSeconds) - 1 ##The last period starting at or before epochSeconds
+        return period >= 0 and epochSeconds <= ends[period]
+
+    def hadInfants(self, momTimes):
+        '''
+        momTimes is a list of (mom, epochSeconds) tuples, as in hadInfant.
+
+        Returns a list of booleans: hadInfant for each of momTimes, in the
+        same order.
+        '''
+        periods = self.periods
+        noPeriods = (array('q'), array('q'))
+
+        answers = []
+        for (mom, epochSeconds) in momTimes:
+            (starts, ends) = periods.get(mom, noPeriods)
+            period = bisect_right(starts, epochSeconds) - 1
+            answers.append(period >= 0 and epochSeconds <= ends[period])
+        return answers
+
+def readMomsFile(momDataFilePath):
+    '''
+    Reads the moms file at momDataFilePath (formatted as described in
+    errorCheckingHelpers.momsAndInfants).
+
+    Returns an InfantPeriods.
+    '''
+    from timestampCodec import parseDate
+
+    momKids = {}
+
+    momFile = open(momDataFilePath, 'r')
+    momFile.readline() # Skip the column descriptions
+    for line in momFile:
+        thisLine = line.strip().split('\t')
+        thisKid = (parseDate(thisLine[2]), parseDate(thisLine[3]))
+        momKids.setdefault(thisLine[0], []).append(thisKid)
+    momFile.close()
+
+    return InfantPeriods(momKids)
+
+def getInfantPeriods(momDataFilePath = ''):
+    '''
+    Returns the InfantPeriods from the moms file at momDataFilePath (by
+    default, constants.momsFile). The file is only read again if it has
+    changed since the last time.
+    '''
+    from codeRegistry import loadWhenChanged
+    from constants import momsFile
+
+    return loadWhenChanged(momDataFilePath or momsFile, readMomsFile)
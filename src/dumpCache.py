@@ -0,0 +1,226 @@
+'''
+Created on 17 Oct 2026
+
+An on-disk cache of parsed Prim8 data files ("dumps").
+
+Parsing a dump (readDumpFile.makeAllDicts) is the slowest part of reading
+it.  Once a table of a dump has been parsed, the resulting dictionary is
+saved in the cache, in a fast binary format (pickle), along with the dump's
+index (see dumpIndex).  The next time the same dump is needed, e.g. when
+it's converted again after fixing a code table, the saved dictionaries are
+loaded instead of parsing the file again.  Each table is saved and loaded on
+its own, only when it's used, so tables nobody uses are never parsed or
+loaded at all.
+
+Entries in the cache are named by a hash of the dump file's contents and the
+version of the parser, so a dump that has been edited, or a newer parser,
+will never use an out-of-date entry.  When the cache grows bigger than its
+size limit, the least-recently-used entries are deleted.
+'''
+from hashlib import sha256
+from os import path, listdir, makedirs, remove, replace, utime
+import pickle
+
+from dumpIndex import LazyDumpDict
+
+cacheFileExtension = '.pickle'
+indexEntryName = 'index' ##Name of the cache entry for a dump's index; the others are named after tables
+tempFileExtension = '.tmp'
+
+# Temporary files older than this (in seconds) are left over from a write
+# that never finished, e.g. because the process was killed.
+staleTempSeconds = 60 * 60
+
+def dumpCacheKey(filePath):
+    '''
+    Reads the bytes of the file at filePath and returns a string: a hash of
+    the file's contents together with the parser version
+    (readDumpFile.dumpParserVersion).
+    '''
+    from readDumpFile import dumpParserVersion
+
+    fileHash = sha256(('parser version ' + str(dumpParserVersion) + '\n').encode())
+
+    dumpFile = open(filePath, 'rb')
+    for chunk in iter(lambda: dumpFile.read(1024 * 1024), b''):
+        fileHash.update(chunk)
+    dumpFile.close()
+
+    return fileHash.hexdigest()
+
+def readCacheEntry(cachePath):
+    '''
+    Loads and returns the data (e.g. a table's dictionary) saved at
+    cachePath. Also updates the file's modification time, to show that it
+    was recently used.
+
+    Returns None if the entry doesn't exist or can't be read.
+    '''
+    try:
+        cacheFile = open(cachePath, 'rb')
+        entryData = pickle.load(cacheFile)
+        cacheFile.close()
+        utime(cachePath)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    return entryData
+
+def writeCacheEntry(cachePath, entryData):
+    '''
+    Saves entryData (anything that can be pickled) to the file at cachePath.
+    The data are written to a temporary file first, which then replaces any
+    file at cachePath, so nothing ever sees a half-written entry. If writing
+    fails, the temporary file is deleted.
+    '''
+    from tempfile import mkstemp
+    from os import fdopen
+
+    tempHandle, tempPath = mkstemp(dir = path.dirname(cachePath), suffix = tempFileExtension)
+    try:
+        tempFile = fdopen(tempHandle, 'wb')
+        try:
+            pickle.dump(entryData, tempFile, protocol = 5)
+        finally:
+            tempFile.close()
+        replace(tempPath, cachePath)
+    finally:
+        if path.exists(tempPath):
+            remove(tempPath)
+
+def evictOldEntries(cacheDir, maxBytes):
+    '''
+    If the total size of all the entries in the directory cacheDir is bigger
+    than maxBytes (an integer), deletes the least-recently-used entries until
+    it isn't.
+
+    Temporary files left over from writes that never finished (older than
+    staleTempSeconds) are always deleted. Newer ones, which may still be
+    being written, count towards the total size but aren't deleted.
+
+    Returns a list of the file paths that were deleted.
+    '''
+    from os import stat
+    from time import time
+
+    allEntries = []
+    deleted = []
+    totalBytes = 0
+    for fileName in listdir(cacheDir):
+        isTemp = fileName.endswith(tempFileExtension)
+        if not (isTemp or fileName.endswith(cacheFileExtension)):
+            continue
+        entryPath = path.join(cacheDir, fileName)
+        try:
+            entryStat = stat(entryPath)
+            if isTemp and time() - entryStat.st_mtime > staleTempSeconds:
+                remove(entryPath)
+                deleted.append(entryPath)
+                continue
+        except OSError: # Probably deleted by someone else just now
+            continue
+        totalBytes += entryStat.st_size
+        if not isTemp:
+            allEntries.append((entryStat.st_mtime, entryStat.st_size, entryPath))
+
+    for (modTime, size, entryPath) in sorted(allEntries):
+        if totalBytes <= maxBytes:
+            break
+        try:
+            remove(entryPath)
+        except OSError:
+            pass
+        totalBytes -= size
+        deleted.append(entryPath)
+
+    return deleted
+
+class CachedDumpDict(LazyDumpDict):
+    '''
+    A LazyDumpDict (see dumpIndex) that keeps each table it reads in the
+    cache, and reads a table from the cache instead of the dump if it's
+    already there.
+    '''
+    def __init__(self, filePath, allSections, cacheDir, dumpKey, maxBytes):
+        '''
+        filePath and allSections are as for LazyDumpDict. cacheDir is the
+        directory the cache is in, dumpKey is the dump's key (from
+        dumpCacheKey), and maxBytes is the biggest the cache is allowed to
+        get.
+        '''
+        LazyDumpDict.__init__(self, filePath, allSections)
+        self.cacheDir = cacheDir
+        self.dumpKey = dumpKey
+        self.maxBytes = maxBytes
+
+    def readTable(self, key):
+        cachePath = cacheEntryPath(self.cacheDir, self.dumpKey, key)
+        tableDict = readCacheEntry(cachePath)
+        if tableDict is not None:
+            print('Loaded', key, 'dictionary from the cache.')
+            return tableDict
+
+        tableDict = LazyDumpDict.readTable(self, key)
+        makedirs(self.cacheDir, exist_ok = True)
+        writeCacheEntry(cachePath, tableDict)
+        evictOldEntries(self.cacheDir, self.maxBytes)
+        return tableDict
+
+def cacheEntryPath(cacheDir, dumpKey, entryName):
+    '''
+    Returns a string: the path of the cache entry called entryName (a table
+    name, or indexEntryName) for the dump whose key (from dumpCacheKey) is
+    dumpKey.
+    '''
+    return path.join(cacheDir, dumpKey + '_' + entryName + cacheFileExtension)
+
+def loadAllDicts(filePath, cacheDir = '', maxBytes = -1):
+    '''
+    Like readDumpFile.makeAllDicts, but uses the cache, and only reads the
+    tables that are actually used.
+
+    Given a file path, returns a dictionary of dictionaries for the dump at
+    filePath, with the same keys as makeAllDicts would make. It's a
+    CachedDumpDict, so each table is only read the first time it's used:
+    from the cache if this dump (with this parser version) has been read
+    before, or from the dump itself if not. The dump's index (see
+    dumpIndex.indexDump) is cached the same way. Newly read tables are added
+    to the cache, then the least-recently-used entries are removed if the
+    cache is over its size limit.
+
+    cacheDir is the directory to keep the cache in, and maxBytes is the
+    biggest the cache is allowed to get (an integer). If not provided, they
+    are dumpCacheDir and dumpCacheMaxBytes from constants.
+
+    A maxBytes of 0 turns the cache off. The tables that are used are still
+    the only ones read (see dumpIndex.makeLazyDicts).
+
+    Returns an empty dictionary if there was a problem in the file. Dumps
+    with problems are never cached.
+    '''
+    from constants import dumpCacheDir, dumpCacheMaxBytes
+    from dumpIndex import indexDump, makeLazyDicts
+
+    cacheDir = cacheDir or dumpCacheDir
+    if maxBytes < 0:
+        maxBytes = dumpCacheMaxBytes
+    if maxBytes == 0: # No cache
+        return makeLazyDicts(filePath)
+
+    dumpKey = dumpCacheKey(filePath)
+    indexPath = cacheEntryPath(cacheDir, dumpKey, indexEntryName)
+
+    allSections = readCacheEntry(indexPath)
+    if allSections is not None:
+        print("Loaded the index of", path.basename(filePath), "from the cache")
+    else:
+        try:
+            allSections = indexDump(filePath)
+        except ValueError as problem:
+            print(problem)
+            return {} ##Empty dictionary, to essentially halt any processes that may come after
+        makedirs(cacheDir, exist_ok = True)
+        writeCacheEntry(indexPath, allSections)
+        evictOldEntries(cacheDir, maxBytes)
+
+    return CachedDumpDict(filePath, allSections, cacheDir, dumpKey, maxBytes)
@@ -9,7 +9,9 @@ GUI to use for processing of data exported from Prim8
 from tkinter import *
 from tkinter.filedialog import askopenfilename, asksaveasfilename
 from constants import prim8Name, prim8Version, prim8Setup
-from readDumpFile import makeAllDicts, writeAll
+from readDumpFile import writeAll
+from dumpCache import loadAllDicts
+from batchImport import guessSaveFilePath, guessTabletID
 from os import path
 
 class dumpFileImportGUI(Frame):
@@ -101,15 +103,10 @@ class dumpFileImportGUI(Frame):
         Output file name will be yymmddSX.txt, in the same directory as the
         input file.
         (Observer's initials are ignored in the new file name)
-        '''
-        inputFilePath = str(openFileTV.get())
-        saveDirPath = path.split(inputFilePath)[0]
-        saveDirName = path.split(saveDirPath)[1]
         
-        splitSaveDir = saveDirName.split()
-        saveFileName = splitSaveDir[0][2:] + splitSaveDir[2] + '.txt'
-        print("Save file predicted to be named", saveFileName)
-        saveFilePath = path.join(saveDirPath, saveFileName)
+        The guess itself is made by batchImport.guessSaveFilePath.
+        '''
+        saveFilePath = guessSaveFilePath(str(openFileTV.get()))
         print("Save path predicted to be", saveFilePath)
         
         saveFileTV.set(saveFilePath)
@@ -120,7 +117,7 @@ class dumpFileImportGUI(Frame):
             Its last 6 characters will likely be '[2-character tablet ID].txt'.
         Given filePath, inserts the 2 characters representing the tablet ID into textVariable.
         '''
-        tabletID = filePath[-6:-4]
+        tabletID = guessTabletID(filePath)
         print("Tablet ID predicted to be", tabletID )
         textVariable.set(tabletID)
     
@@ -194,7 +191,7 @@ class dumpFileImportGUI(Frame):
         if not self.integrityCheck(value1, value2, value3, value4, value5, value6):
             print("Problem with data! No work done.")
         else:
-            allData = makeAllDicts(value1)
+            allData = loadAllDicts(value1)
             print(writeAll(value2, value3, value4, value5, value6, allData))
             # Empty fields to ensure the same file and tablet ID aren't accidentally used twice
             input1.set("")
@@ -0,0 +1,313 @@
+'''
+Created on 17 Oct 2026
+
+A quick index of where each table ("section") is in a raw Prim8 data file
+("dump"), and a dictionary of dictionaries that only reads a table from the
+dump the first time it's needed.
+
+readDumpFile.makeAllDicts reads every table in the dump, including several
+(e.g. biologicalsamples, locations, workcalendars) that the processed data
+never use. indexDump instead skims through the file once, without splitting
+any lines into fields, and notes where each table starts and ends and how
+many rows it has. LazyDumpDict uses that index to read only the tables that
+are actually used. (dumpCache.loadAllDicts uses it too, so every tool that
+loads a dump that way reads only what it needs.)
+
+The index is also used to describe a dump (table names and row counts)
+without reading all of its data. Syntax (run from the src directory, like
+the rest of the program):
+
+python3 dumpIndex.py "path/to/dump.csv"
+'''
+from collections import namedtuple
+from collections.abc import MutableMapping
+import csv
+import io
+import locale
+import re
+
+# Where one table is in a dump:
+#    table: the table's name
+#    start: byte offset of the table's first line (its column "legend"), just after the table name
+#    end: byte offset just after the table's last line
+#    rows: number of rows of data in the table, not counting the legend
+SectionInfo = namedtuple('SectionInfo', ['table', 'start', 'end', 'rows'])
+
+quotePattern = re.compile(b'"')
+firstLinePattern = re.compile(b'([^,\n]*)(?=\n|$)') ##The first line, if it has no commas
+noCommaPattern = re.compile(b'\n([^,\n]*)(?=\n|$)') ##A line break, then a whole line with no commas
+notRead = object() ##Stands in for a table in a LazyDumpDict that hasn't been read yet
+countChunkBytes = 1024 * 1024 ##How much of the dump to copy at a time, when counting lines
+
+def splitRecord(record):
+    '''
+    record is a bytes object: one whole line ("record") from a dump, which
+    may include line breaks inside quoted fields.
+
+    Returns a list of strings, the fields in the record, just as csv.reader
+    would read them. Records without any quotes are split without using
+    csv.reader at all.
+    '''
+    if b'"' not in record:
+        stripped = record.rstrip(b'\r\n')
+        if stripped == b'':
+            return []
+        return stripped.decode(locale.getpreferredencoding(False)).split(',')
+    text = record.decode(locale.getpreferredencoding(False))
+    return next(csv.reader(io.StringIO(text, newline=''), delimiter=',', quotechar='"'), [])
+
+def indexDump(filePath):
+    '''
+    Given a file path, finds where each table is in the dump at filePath,
+    without splitting the data lines into fields. The file is memory-mapped
+    rather than read, so (like readDumpFile.iterDumpRecords) it's never all
+    held in memory at once, however large it is.
+
+    Lines with only one item indicate the beginning of a new table, just as
+    in readDumpFile.iterDumpRecords. Table names never have commas, so only
+    lines without any commas need to be looked at. Because a quoted field
+    may have a comma or a line break in it, lines that are inside quotes are
+    ignored, and line breaks inside quotes aren't counted as new rows.
+
+    Returns a list of SectionInfo tuples, in the order they occur in the
+    file. A table may, in principle, occur more than once.
+
+    Raises a ValueError if a table name isn't recognized, or if data occur
+    before any table has begun (with the same messages as iterDumpRecords).
+    '''
+    from constants import p8TableList
+    from bisect import bisect_left
+    from itertools import chain
+    from os import fstat
+    import mmap
+
+    tableNames = set(p8TableList)
+
+    theFile = open(filePath, 'rb')
+    if fstat(theFile.fileno()).st_size == 0: ##Nothing to map
+        theFile.close()
+        return []
+    data = mmap.mmap(theFile.fileno(), 0, access = mmap.ACCESS_READ)
+    try:
+        def countBreaks(start, end):
+            '''
+            Returns the number of line breaks in data[start:end], counted a
+            chunk at a time so the whole range is never copied at once.
+            '''
+            numBreaks = 0
+            for chunkStart in range(start, end, countChunkBytes):
+                numBreaks += data[chunkStart:min(chunkStart + countChunkBytes, end)].count(b'\n')
+            return numBreaks
+
+        quotePositions = [match.start() for match in quotePattern.finditer(data)]
+        def inQuotes(position):
+            return bisect_left(quotePositions, position) % 2 == 1
+
+        # Line breaks inside quotes, which don't end a row
+        quotedBreaks = []
+        for i in range(0, len(quotePositions) - 1, 2):
+            nextBreak = data.find(b'\n', quotePositions[i], quotePositions[i + 1])
+            while nextBreak >= 0:
+                quotedBreaks.append(nextBreak)
+                nextBreak = data.find(b'\n', nextBreak + 1, quotePositions[i + 1])
+
+        blankLines = [] ##Where each blank line starts
+        tableLines = [] ##(where the table name's line starts, where it ends, table name)
+        for match in chain([firstLinePattern.match(data)], noCommaPattern.finditer(data)):
+            if match is None: ##The first line has a comma
+                continue
+            (lineStart, lineEnd) = match.span(1)
+            if inQuotes(lineStart) or inQuotes(lineEnd): ##Part of a record with a line break in quotes
+                continue
+            line = splitRecord(match.group(1))
+            if len(line) == 0:
+                blankLines.append(lineStart)
+            elif len(line) == 1: ##Then the line should indicate the beginning of a new table.
+                if line[0] not in tableNames: ##Then there's a problem in the file
+                    raise ValueError("Problem at line " + str(countBreaks(0, lineStart) + 1) + ": " + line[0] + " is not a recognized table name")
+                tableLines.append((lineStart, lineEnd, line[0]))
+
+        def countRows(start, end):
+            '''
+            Returns the number of rows (not counting blank lines) that begin
+            in data[start:end]. start has to be the beginning of a line.
+            '''
+            if start >= end:
+                return 0
+            numLines = countBreaks(start, end - 1) + 1
+            numBlank = bisect_left(blankLines, end) - bisect_left(blankLines, start)
+            numQuoted = bisect_left(quotedBreaks, end - 1) - bisect_left(quotedBreaks, start - 1)
+            return numLines - numBlank - numQuoted
+
+        firstTable = tableLines[0][0] if len(tableLines) > 0 else len(data)
+        if countRows(0, firstTable) > 0:
+            firstData = 0 ##Find the first line that isn't blank
+            while firstData in blankLines:
+                firstData = data.find(b'\n', firstData) + 1
+            raise ValueError("Problem at line " + str(countBreaks(0, firstData) + 1) + ": data found before any table name")
+
+        allSections = []
+        for (i, (tableLineStart, tableLineEnd, tableName)) in enumerate(tableLines):
+            if i + 1 < len(tableLines):
+                sectionEnd = tableLines[i + 1][0]
+            else:
+                sectionEnd = len(data)
+            sectionStart = min(tableLineEnd + 1, sectionEnd) ##Just after the line break at the end of the table name
+            allSections.append(SectionInfo(tableName, sectionStart, sectionEnd, max(countRows(sectionStart, sectionEnd) - 1, 0)))
+    finally:
+        data.close()
+        theFile.close()
+
+    return allSections
+
+def readSection(filePath, section):
+    '''
+    Reads one table from the dump at filePath. section is a SectionInfo for
+    the table, from indexDump.
+
+    Returns a dictionary, just like the one makeAllDicts makes for the table:
+    keys are the first column of each line (including the legend), values
+    are lists of the rest of the line (see readDumpFile.iterDumpRecords).
+    '''
+    from readDumpFile import getIntColumns, typeDumpRow
+
+    theFile = open(filePath, 'rb')
+    theFile.seek(section.start)
+    text = theFile.read(section.end - section.start).decode(locale.getpreferredencoding(False))
+    theFile.close()
+
+    tableDict = {}
+    intColumns = None ##None until the legend is read
+    for line in csv.reader(io.StringIO(text, newline=''), delimiter=',', quotechar='"'):
+        if len(line) == 0: ##Blank line, nothing to add
+            continue
+        if intColumns is None:
+            intColumns = getIntColumns(line)
+        else:
+            line = typeDumpRow(line, intColumns)
+        tableDict[line[0]] = line[1:]
+    return tableDict
+
+class LazyDumpDict(MutableMapping):
+    '''
+    A dictionary of dictionaries with the same keys as the one from
+    makeAllDicts (every table in p8TableList, plus dictInstMods), but each
+    table is only read from the dump the first time its value is used. The
+    dictInstMods dictionary is likewise only made the first time it's used.
+
+    Looking at the keys (len(), "in", keys(), iterating) never reads
+    anything; values(), items(), etc. read every table, just as makeAllDicts
+    would have.
+    '''
+    def __init__(self, filePath, allSections):
+        '''
+        filePath is the path to the dump, and allSections is its index (a
+        list of SectionInfo tuples, from indexDump).
+        '''
+        from constants import p8TableList, dictInstMods
+
+        self.filePath = filePath
+        self.allSections = allSections
+        self.tables = dict.fromkeys(p8TableList + [dictInstMods], notRead)
+
+    def readTable(self, key):
+        '''
+        Returns the dictionary for the table named key, read from the dump
+        (an empty dictionary if the dump doesn't have that table).
+        '''
+        print('Begin', key, 'dictionary.')
+        tableDict = {}
+        for section in self.allSections:
+            if section.table == key:
+                tableDict.update(readSection(self.filePath, section))
+        return tableDict
+
+    def __getitem__(self, key):
+        from constants import dictInstMods
+        from readDumpFile import addInstancesModifiersDict
+
+        value = self.tables[key]
+        if value is notRead:
+            if key == dictInstMods:
+                addInstancesModifiersDict(self)
+            else:
+                self.tables[key] = self.readTable(key)
+            value = self.tables[key]
+        return value
+
+    def __setitem__(self, key, value):
+        self.tables[key] = value
+
+    def __delitem__(self, key):
+        del self.tables[key]
+
+    def __iter__(self):
+        return iter(self.tables)
+
+    def __len__(self):
+        return len(self.tables)
+
+    def __contains__(self, key):
+        return key in self.tables
+
+    def isRead(self, key):
+        '''
+        Returns True if the table named key has already been read (or
+        added), False if not.
+        '''
+        return self.tables.get(key, notRead) is not notRead
+
+    def loadAll(self):
+        '''
+        Reads all the tables that haven't been read yet (and makes the
+        dictInstMods dictionary), so this has everything makeAllDicts would
+        have made.
+
+        Returns itself.
+        '''
+        for table in list(self.tables):
+            self[table]
+        return self
+
+def makeLazyDicts(filePath):
+    '''
+    Given a file path, indexes the dump at filePath (see indexDump) and
+    returns a LazyDumpDict for it. Use it in place of makeAllDicts when only
+    some tables are needed.
+
+    Returns an empty dictionary if there was a problem in the file.
+    '''
+    try:
+        allSections = indexDump(filePath)
+    except ValueError as problem:
+        print(problem)
+        return {} ##Empty dictionary, to essentially halt any processes that may come after
+    return LazyDumpDict(filePath, allSections)
+
+def inspectDump(filePath):
+    '''
+    Describes the dump at filePath: each table in it, how many rows of data
+    it has, and how much of the file it takes up. Only indexes the dump;
+    none of the data are actually read.
+
+    Returns a string, ideally to print to the console.
+    '''
+    from os import path
+
+    allSections = indexDump(filePath)
+
+    outLines = [path.basename(filePath) + ':']
+    outLines.append('\t'.join(['table', 'rows', 'bytes']))
+    for section in allSections:
+        outLines.append('\t'.join([section.table, str(section.rows), str(section.end - section.start)]))
+    outLines.append('\t'.join(['TOTAL', str(sum([section.rows for section in allSections])), str(path.getsize(filePath))]))
+
+    return '\n'.join(outLines)
+
+if __name__ == '__main__':
+    import sys
+    for dumpPath in sys.argv[1:]:
+        try:
+            print(inspectDump(dumpPath))
+        except ValueError as problem:
+            print(dumpPath + ':', problem)
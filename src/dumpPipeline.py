@@ -0,0 +1,131 @@
+'''
+Created on 17 Oct 2026
+
+Takes a raw Prim8 data file ("dump") straight to SQL for Babase, without
+writing the processed .txt file and then reading it back in.
+
+The usual route is dumpFileImportGUI (dump -> processed .txt), then
+babaseWriterGUI (processed .txt -> SQL). Here, the lines of processed data
+are made in memory (readDumpFile.iterEventFields), kept in a
+ProcessedDataset, and given directly to the SQL writer
+(babaseWriter.writeSQL) and, optionally, the error checks
+(errorChecking.errorCheckData). The processed .txt file can still be written
+too, as a side output.
+
+Syntax (run from the src directory, like the rest of the program):
+
+python3 dumpPipeline.py "path/to/dump.csv" SB out.sql -t out.txt -s out_summary.txt
+OR, for one SQL file per sampling date (out_2015-09-02.sql, ...; see shardLoader):
+python3 dumpPipeline.py "path/to/dump.csv" SB out.sql --shard-days
+'''
+from constants import prim8Name, prim8Version, prim8Setup
+import argparse
+
+def getDataLines(masterDict, textFilePath = '', headerLine = ''):
+    '''
+    masterDict is the big dictionary of dictionaries that stores all the data
+    from a dump.
+
+    Makes all the lines of processed data from masterDict (see
+    readDumpFile.iterEventFields), split into their fields exactly as if
+    they had been written to a file and read back in (see
+    readDumpFile.asReadFromFile).
+
+    If textFilePath is provided, the lines are also written there, with
+    headerLine first, just like readDumpFile.writeAll.
+
+    Returns a list of lists of strings.
+    '''
+    from readDumpFile import iterEventFields, asReadFromFile
+
+    if textFilePath == '':
+        return [asReadFromFile(outList) for outList in iterEventFields(masterDict)]
+
+    dataLines = []
+    textFile = open(textFilePath, 'w')
+    textFile.write(headerLine + '\n')
+    for outList in iterEventFields(masterDict):
+        textFile.write('\t'.join(outList) + '\n')
+        dataLines.append(asReadFromFile(outList))
+    textFile.close()
+
+    return dataLines
+
+def importDump(dumpPath, tabletID, sqlFilePath, appName = prim8Name, appVersion = prim8Version, setupVersion = prim8Setup, commitTransaction = False, textFilePath = '', summaryFilePath = '', focalLogPath = '', limitLogDates = False, useCopy = False, logStatements = False, batchSize = None, shard = False, samplesPerShard = 0, useCache = True):
+    '''
+    Reads the dump at dumpPath (using the dumpCache) and writes SQL to add its
+    data to Babase to the file at sqlFilePath.
+
+    tabletID, appName, appVersion, and setupVersion are strings, as in
+    readDumpFile.writeAll. commitTransaction, useCopy, and logStatements are
+    booleans, and batchSize an integer, as in babaseWriter.writeAll.
+
+    If shard is True, the SQL is split into one file for each sampling date
+    or, if samplesPerShard is more than 0, for each samplesPerShard samples,
+    named after sqlFilePath (see babaseWriter.writeShards).
+
+    Only the tables that are needed are read, whether or not the dumpCache
+    is used. If useCache is False, it isn't (see dumpCache.loadAllDicts).
+
+    Optional side outputs:
+        textFilePath: where to write the processed .txt file, if wanted.
+        summaryFilePath: where to write the error check summary, if wanted
+            (see errorChecking.errorCheckData). focalLogPath and
+            limitLogDates are passed along to the error checks.
+
+    Returns a message, ideally to print to the console, that the process is
+    complete.
+    '''
+    from dumpCache import loadAllDicts
+    from readDumpFile import makeHeaderLine
+    from processedDataset import ProcessedDataset
+    from babaseWriter import writeSQL, writeShards
+    from errorChecking import errorCheckData
+
+    masterDict = loadAllDicts(dumpPath, maxBytes = -1 if useCache else 0)
+    if len(masterDict) == 0:
+        return 'Unable to read ' + dumpPath
+
+    headerLine = makeHeaderLine(appName, appVersion, setupVersion, tabletID)
+    dataset = ProcessedDataset(headerLine, getDataLines(masterDict, textFilePath, headerLine), textFilePath or dumpPath)
+
+    if shard:
+        shardPaths = writeShards(dataset, sqlFilePath, dataset.prgID, dataset.setupID, dataset.tabletID, commitTransaction, samplesPerShard, useCopy, logStatements, batchSize)
+        print("Wrote SQL to", len(shardPaths), "file(s):", ', '.join(shardPaths))
+    else:
+        print("Writing SQL to", sqlFilePath)
+        writeSQL(dataset, sqlFilePath, dataset.prgID, dataset.setupID, dataset.tabletID, commitTransaction, useCopy, logStatements, batchSize)
+
+    if summaryFilePath != '':
+        errorCheckData(dataset, dataset.filePath, summaryFilePath, focalLogPath, limitLogDates)
+
+    return 'Finished writing all data!'
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write SQL for Babase directly from a Prim8 dump file."
+    )
+
+    parser.add_argument("dump", help="Path to the Prim8 dump (.csv)")
+    parser.add_argument("tablet", help="Two-character ID of the tablet used to collect the data")
+    parser.add_argument("sql", help="Path to the SQL file to write")
+    parser.add_argument("-t", "--text", help="Also write the processed .txt file here", default='')
+    parser.add_argument("-s", "--summary", help="Also check for errors, and write the summary here", default='')
+    parser.add_argument("-l", "--focal-log", help="Focal sample log to use in the error checks", default='')
+    parser.add_argument("--commit", help="Commit the SQL transaction instead of rolling it back", action='store_true')
+    parser.add_argument("--copy", help="Write the data as COPY blocks for bulk loading, instead of one insert per row", action='store_true')
+    parser.add_argument("--log-sql", help="Also print the SQL to the console as it's written", action='store_true')
+    parser.add_argument("--batch-size", help="Most rows to add with each SQL insert, where they can be combined", type=int, default=None)
+    parser.add_argument("--shard-days", help="Write one SQL file (and transaction) for each sampling date, named after sql", action='store_true')
+    parser.add_argument("--shard-samples", help="Write one SQL file (and transaction) for each this many samples, named after sql", type=int, default=0)
+    parser.add_argument("--no-cache", help="Don't use the dump cache", action='store_true')
+    parser.add_argument("--app", help="App used to collect data", default=prim8Name)
+    parser.add_argument("--app-version", help="App version number", default=prim8Version)
+    parser.add_argument("--setup", help="App setup name", default=prim8Setup)
+
+    args = parser.parse_args()
+
+    print(importDump(args.dump, args.tablet, args.sql, args.app, args.app_version, args.setup, args.commit, args.text, args.summary, args.focal_log, False, args.copy, args.log_sql, args.batch_size, args.shard_days or args.shard_samples > 0, args.shard_samples, not args.no_cache))
+
+if __name__ == '__main__':
+    main()
@@ -4,7 +4,9 @@ Created on 28 Oct 2015
 @author: Jake Gordon, <jacob.b.gordon@gmail.com>
 '''
 from compareFocalLogs import *
+from demographyIndex import getInfantPeriods
 from errorCheckingHelpers import *
+from errorRules import *
 from constants import textBoundary
 from os import path
 
@@ -113,6 +115,9 @@ def errorAlertSummary(dataLines, focalLogPath = "", limitLogDates = False, showS
     date at [2], and a hh:mm:ss time at [3]. A code indicating the sample's
     "type" should be at [0].
     
+    Each check is an errorRules rule, and they're all done by
+    errorRules.runRules.
+    
     Returns a single string that will include several line breaks.
     '''
     # Make sure log stuff is logical
@@ -126,166 +131,94 @@ def errorAlertSummary(dataLines, focalLogPath = "", limitLogDates = False, showS
     commentLine = '------Alerts and Errors:\n'
     alertLines.append(commentLine)
     
-    # Check for individuals sampled >1x/day
-    alertData = ['\t'.join(line) for line in checkDuplicateFocals(dataLines)]
-    commentLine = writeAlert('Duplicate (date, sname) pairs', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-
-    # Check for >1 group sampled in one day
-    alertData = ['\t'.join(line) for line in checkDuplicateGroups(dataLines)]
-    commentLine = writeAlert('>1 group sampled in a day', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for overlapping focals
-    alertData = []
-    allOverlaps = checkFocalOverlaps(dataLines)
-    for (focal1, focal2) in allOverlaps:
-        outFocal1 = ' '.join([focal1[2], focal1[3], focal1[5]]) # Date, time, ID
-        outFocal2 = ' '.join([focal2[2], focal2[3], focal2[5]])
-        alertData.append(', '.join([outFocal1, outFocal2]))
-    commentLine = writeAlert('Overlapping focals', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for focals w/ invalid focal type
-    alertData = ['\t'.join(line) for line in checkInvalidFocalTypes(dataLines)]
-    commentLine = writeAlert('Focal samples with invalid focal type', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for focal samples with no data
-    alertData = ['\t'.join(line) for line in theseWithoutThose(dataLines, focalAbbrev, [pntAbbrev, neighborAbbrev, noteAbbrev, adlibAbbrev])]
-    commentLine = writeAlert('Focal samples with no data', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for focal samples with no points
-    alertData = ['\t'.join(line) for line in theseWithoutThose(dataLines, focalAbbrev, [pntAbbrev])]
-    commentLine = writeAlert('Focal samples without points', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for points that don't match the current focal
-    # Set aside the list of these points, because they will be referred-to again later
-    nonMatchingPoints = ['\t'.join(line) for line in checkPointMatchesFocal(dataLines)]
-    alertData = nonMatchingPoints[:]
-    commentLine = writeAlert("Points that don't match (or have) a current focal", alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for focal samples with >10 points
-    alertData = [(focal + '; ' + str(count) + ' points') for (focal, count) in checkTooManyPoints(dataLines)]
-    commentLine = writeAlert('Focal samples with > 10 points', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
     # Points implying focal has an infant when she doesn't, and vice versa
-    # First, get a dictionary of moms and their kids
-    moms = momsAndInfants("./momsAndInfants.txt")
-    alertData = checkFocalInfantStatus(dataLines, moms)
-    alertData = ['\t'.join(line) for line in alertData]
-    commentLine = writeAlert('ADF points where infant presence/absence disagrees with demog data', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for in-sight points with no neighbors
-    alertData = theseWithoutThose(dataLines, pntAbbrev, [neighborAbbrev], beforeThem = [focalAbbrev])
-    alertData = ['\t'.join(line) for line in alertData if line[6] != outOfSightValue] #Exclude out-of-sight points
-    alertData = [line for line in alertData if line not in nonMatchingPoints] #Exclude non-matching points
-    commentLine = writeAlert('In-sight points w/o neighbors', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for neighbors without a preceding point. This occurs in two
-    # different ways: Neighbor lines occur just after a focal starts and before
-    # any points, or a point is followed by >3 neighbors
-    
-    # First, neighbors after focals
-    alertData = theseWithoutThose(dataLines, focalAbbrev, [pntAbbrev], [neighborAbbrev], [pntAbbrev])
-    alertData = ['\t'.join(line) for line in alertData]
-    commentLine = writeAlert(('Header-then-neighbor, with no ' + pntAbbrev), alertData, showSpecifics) +'\n'
-    alertLines.append(commentLine)
-    
-    # Second, points with >3 neighbors
-    alertData = [pair[0] for pair in checkNeighborsPerPoint(dataLines) if pair[1] > 3]
-    commentLine = writeAlert('Points with >3 neighbors', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for non-unique neighbors in juvenile samples
-    alertData = checkUniqueNeighbors(dataLines, [stypeJuv])
-    numForAlert = len([line for line in alertData if len(line) > 0 and isType(line, pntAbbrev)])
-    alertData = ['\t'.join(line) for line in alertData]
-    commentLine = writeAlert('Non-unique neighbors in juvenile samples', alertData, showSpecifics, numForAlert) + '\n'
-    alertLines.append(commentLine)
-        
-    # Check for neighbors without appropriate neighbor codes
-    alertData = ['\t'.join(line) for line in dataLines if isType(line, neighborAbbrev) and line[-1] not in p8_nghcodes]
-    commentLine = writeAlert('Neighbors w/o neighbor codes', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for notes on days without any focals
-    alertData = ['\t'.join(line) for line in checkNotesNoFocals(dataLines)]
-    commentLine = writeAlert('Notes on days without any focals', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for data where actor is actee, or focal is neighbor
-    alertData = ['\t'.join(line) for line in checkActorIsActee(dataLines)]
-    commentLine = writeAlert('Actor is actee, or focal is neighbor', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for data where actor or actee is a non-sname placeholder
-    alertData = ['\t'.join(line) for line in checkActorActeeNotReal(dataLines)]
-    commentLine = writeAlert('Actor or actee is a non-sname placeholder', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for lines where neighbor is a non-sname placeholder (different placeholders from ad-libs)
-    alertData = ['\t'.join(line) for line in checkNeighborNotReal(dataLines)]
-    commentLine = writeAlert('Neighbor is a non-sname placeholder', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
+    # need the periods when moms had infants
+    moms = getInfantPeriods()
     
-    # Check for focals done that aren't in the log (if provided)
-    if focalLogPath != "":
-        # Then a log was provided. Do this check.
-        alertData = getFocalsNotLogged(dataLines, focalLogPath)
-        alertData = [line[0]+"\t"+line[2]+" point(s) in sight, out of "+line[1] for line in alertData]
-        commentLine = writeAlert("Focal samples that aren't in the log", alertData, showSpecifics) + '\n'
-        alertLines.append(commentLine)
+    # Mounts, ejaculations, and consorts
+    MEC_list = [bb_mount, bb_ejaculation, bb_consort, bb_mount_long, bb_ejaculation_long, bb_consort_long, bb_consort_long2]
     
-    # Check for logged (as complete) focals that aren't in the data
+    # All the checks, in the order they're reported. See errorRules and
+    # errorCheckingHelpers for details on each.
+    rules = []
+    rules.append(DuplicateFocalsRule())
+    rules.append(DuplicateGroupsRule())
+    rules.append(FocalOverlapsRule())
+    rules.append(LinesRule('Focal samples with invalid focal type', checkInvalidFocalTypes))
+    rules.append(LinesRule('Focal samples with no data', theseWithoutThose, focalAbbrev, [pntAbbrev, neighborAbbrev, noteAbbrev, adlibAbbrev]))
+    rules.append(LinesRule('Focal samples without points', theseWithoutThose, focalAbbrev, [pntAbbrev]))
+    rules.append(LinesRule("Points that don't match (or have) a current focal", checkPointMatchesFocal))
+    rules.append(TooManyPointsRule())
+    rules.append(LinesRule('ADF points where infant presence/absence disagrees with demog data', checkFocalInfantStatus, moms))
+    rules.append(PointsWithoutNeighborsRule())
+    # Neighbors without a preceding point occur in two different ways:
+    # Neighbor lines occur just after a focal starts and before any points,
+    # or a point is followed by >3 neighbors
+    rules.append(LinesRule('Header-then-neighbor, with no ' + pntAbbrev, theseWithoutThose, focalAbbrev, [pntAbbrev], [neighborAbbrev], [pntAbbrev]))
+    rules.append(TooManyNeighborsRule())
+    rules.append(UniqueNeighborsRule('Non-unique neighbors in juvenile samples', [stypeJuv]))
+    rules.append(LinesRule('Neighbors w/o neighbor codes', checkNeighborCodes))
+    rules.append(LinesRule('Notes on days without any focals', checkNotesNoFocals))
+    rules.append(LinesRule('Actor is actee, or focal is neighbor', checkActorIsActee))
+    rules.append(LinesRule('Actor or actee is a non-sname placeholder', checkActorActeeNotReal))
+    rules.append(LinesRule('Neighbor is a non-sname placeholder', checkNeighborNotReal))
     if focalLogPath != "":
-        # Then a log was provided. Do this check.
-        alertData = getLoggedNotDone(dataLines, focalLogPath, limitLogDates)
-        commentLine = writeAlert("Logged samples that aren't in the data", alertData, showSpecifics) + '\n'
+        # Then a log was provided. Do these checks.
+        notLoggedRule = FocalsNotLoggedRule(focalLogPath, limitLogDates)
+        rules.append(notLoggedRule)
+        rules.append(LoggedNotDoneRule(notLoggedRule))
+    rules.append(LinesRule('Notes that appear to contain mounts, ejaculations, or consorts', checkBehavsInNotes, MEC_list))
+    rules.append(LinesRule('Mounts, ejaculations, or consorts recorded as regular, legit behaviors', checkSpecificBehavior, MEC_list))
+    rules.append(LinesRule('Mounts, ejaculations, or consorts recorded outside of a focal sample', checkMountsConsortsDuringFocal))
+    rules.append(LinesRule('Mounts, ejaculations, or consorts not involving the focal individual', checkMountsConsortsInvolvedFocal))
+    
+    runRules(dataLines, rules)
+    
+    for rule in rules:
+        commentLine = rule.render(showSpecifics) + '\n'
         alertLines.append(commentLine)
     
-    # Check for notes that appear to contain mounts, ejaculations, or consorts
-    MEC_list = [bb_mount, bb_ejaculation, bb_consort, bb_mount_long, bb_ejaculation_long, bb_consort_long, bb_consort_long2]
-    alertData = ['\t'.join(line) for line in checkBehavsInNotes(dataLines, MEC_list)]
-    commentLine = writeAlert('Notes that appear to contain mounts, ejaculations, or consorts', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for lines with mounts, ejaculations, or consorts recorded as regular, legit behaviors
-    alertData = ['\t'.join(line) for line in checkSpecificBehavior(dataLines, MEC_list)]
-    commentLine = writeAlert('Mounts, ejaculations, or consorts recorded as regular, legit behaviors', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for lines with mounts, ejaculations, or consorts recorded outside of a focal sample
-    alertData = ['\t'.join(line) for line in checkMountsConsortsDuringFocal(dataLines)]
-    commentLine = writeAlert('Mounts, ejaculations, or consorts recorded outside of a focal sample', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
-    # Check for lines with mounts, ejaculations, or consorts not involving the focal individual
-    alertData = ['\t'.join(line) for line in checkMountsConsortsInvolvedFocal(dataLines)]
-    commentLine = writeAlert('Mounts, ejaculations, or consorts not involving the focal individual', alertData, showSpecifics) + '\n'
-    alertLines.append(commentLine)
-    
     return '\n'.join(alertLines)
 
 def errorCheck (inFilePath, outFilePath, focalLogPath = "", limitLogDates = False):
     '''
-    Checks the data in the file at inFilePath for possible errors.
+    Checks the data in the file at inFilePath for possible errors. inFilePath
+    may also be a ProcessedDataset (see processedDataset) with the data
+    already loaded.
     Also does some counting of basic statistics about the data, e.g. (how many focals, how many adlibs, etc.)
+    Errors, alerts, and statistics will be written to the file at outFilePath (see errorCheckData).
+    focalLogPath is the (optional) path to a focal sample log, which will allow a few additional kinds of checks to occur.
+    limitLogDates is a boolean, used to indicate whether comparisons with the log should be limited only to the date range in the data at inFilePath.
+    Prints a message that the process is complete.
+    Returns nothing.
+    '''    
+    from processedDataset import ProcessedDataset, loadProcessedDataset
+    
+    if isinstance(inFilePath, ProcessedDataset):
+        allEvents = inFilePath
+    else:
+        print("Opening import file:", path.basename(inFilePath))
+        allEvents = loadProcessedDataset(inFilePath) ##All lines read from the import file, without the "Parsed data..." line at the top
+    
+    errorCheckData(allEvents, allEvents.filePath, outFilePath, focalLogPath, limitLogDates)
+
+def errorCheckData(allEvents, dataFilePath, outFilePath, focalLogPath = "", limitLogDates = False):
+    '''
+    allEvents is a list of lists of strings (or a ProcessedDataset): the lines
+    of processed Prim8 data (without the "Parsed data from" header line), each
+    split into its fields.
+    dataFilePath is a string: the path of the file the data are from (or
+    would be written to). Only its name is used, in the header of the output.
+    
+    Checks allEvents for possible errors, and counts some basic statistics.
     Errors, alerts, and statistics will be written to the file at outFilePath.
         If outFilePath already existed, everything already there will be
         retained. New data will be added to the top, followed by what was
         already there.
-    focalLogPath is the (optional) path to a focal sample log, which will allow a few additional kinds of checks to occur.
-    limitLogDates is a boolean, used to indicate whether comparisons with the log should be limited only to the date range in the data at inFilePath.
+    focalLogPath and limitLogDates are as in errorCheck.
     Prints a message that the process is complete.
     Returns nothing.
-    '''    
+    '''
     # Check if previous summary exists
     prevData = [] # To hold previous data, if any
     if path.isfile(outFilePath):
@@ -297,18 +230,9 @@ def errorCheck (inFilePath, outFilePath, focalLogPath = "", limitLogDates = Fals
     print("Creating export file:", path.basename(outFilePath))
     outFile = open(outFilePath,'w')
     
-    outMsg = writeHeader(inFilePath) 
+    outMsg = writeHeader(dataFilePath) 
     outFile.write(outMsg + '\n\n')
     
-    print("Opening import file:", path.basename(inFilePath))
-    impFile = open(inFilePath, 'r')
-    impEvents = impFile.readlines()
-    impFile.close()
-       
-    print("Adding all lines to allEvents list")
-    allEvents =  [line.strip().split('\t') for line in impEvents] ##List of all lines read from the import file (impFile)
-    allEvents.pop(0) ##Remove the "Parsed data..." line at the top
-    
     print("Getting data summary")
     outMsg = dataSummary(allEvents)
     outFile.write(outMsg + '\n\n')
@@ -324,7 +248,7 @@ def errorCheck (inFilePath, outFilePath, focalLogPath = "", limitLogDates = Fals
 
     print("Closing export file")
     outFile.close()
-    outMsg = "Finished checking data in " + path.basename(inFilePath)
+    outMsg = "Finished checking data in " + path.basename(dataFilePath)
     print(outMsg)
 
 #if __name__ == '__main__':
@@ -5,6 +5,11 @@ Created on 6 Aug 2015
 '''
 from babaseWriteHelpers import isType
 
+# The NoteScanners used by behaviorsInNote. Keys are tuples of the behaviors
+# looked for, so each list of behaviors is only made into a scanner once,
+# however many notes are checked for it.
+noteScanners = {}
+
 def behaviorsInNote(dataLine, criteriaBehavs):
     '''
     Checks the data at the end of dataLine (the string at [-1]) to see if any of
@@ -18,15 +23,19 @@ def behaviorsInNote(dataLine, criteriaBehavs):
             itself, not part of a larger word
             behaviorsInNote(dataLine, ['b']) is False, because although 'b' does
             occur, it's not its own word
+    
+    The scanner for criteriaBehavs is kept in noteScanners, so checking
+    note after note for the same behaviors doesn't make it again each time.
     '''
-    theNote = dataLine[-1].split()
-    theNote = [item.upper() for item in theNote]
+    from noteScanner import NoteScanner
     
-    for behav in criteriaBehavs:
-        if behav.upper() in theNote:
-            return True
+    behavsKey = tuple(criteriaBehavs)
+    scanner = noteScanners.get(behavsKey)
+    if scanner is None:
+        scanner = NoteScanner(criteriaBehavs)
+        noteScanners[behavsKey] = scanner
     
-    return False
+    return scanner.hasMatch(None, dataLine)
 
 def checkActorActeeNotReal(dataLines):
     '''
@@ -47,11 +56,12 @@ def checkActorActeeNotReal(dataLines):
     Returns a list of lists of strings: the lines where this is true.
     '''
     from constants import unknSnames, unnamedCodes, adlibAbbrev
+    from focalIndex import getFocalIndex
     
     # Make a set of known "placeholder" codes to check for 
     plcHoldrs = set(unknSnames.keys()).union(unnamedCodes)
     
-    linesOfInterest = [line for line in dataLines if isType(line, adlibAbbrev)]
+    linesOfInterest = [dataLines[row] for row in getFocalIndex(dataLines).rowsByType.get(adlibAbbrev, [])]
     
     return [line for line in linesOfInterest if line[5] in plcHoldrs or line[7] in plcHoldrs or len(line[5]) != 3 or len(line[7]) != 3]
 
@@ -66,8 +76,10 @@ def checkActorIsActee(dataLines):
     Returns a list of lists of strings: the lines where this is true.
     '''
     from constants import adlibAbbrev, neighborAbbrev
+    from focalIndex import getFocalIndex
     
-    linesOfInterest = [line for line in dataLines if isType(line, adlibAbbrev) or isType(line, neighborAbbrev)]
+    rowsByType = getFocalIndex(dataLines).rowsByType
+    linesOfInterest = [dataLines[row] for row in sorted(rowsByType.get(adlibAbbrev, []) + rowsByType.get(neighborAbbrev, []))]
     
     return [line for line in linesOfInterest if line[5] == line[7]]
 
@@ -82,10 +94,13 @@ def checkBehavsInNotes(dataLines, criteriaBehavs):
     Returns a list of lists of strings: the lines where this is true.
     '''
     from constants import noteAbbrev
+    from focalIndex import getFocalIndex
+    from noteScanner import NoteScanner, getNoteTokens
     
-    notes = [line for line in dataLines if isType(line, noteAbbrev)]
+    index = getFocalIndex(dataLines)
+    scanner = NoteScanner(criteriaBehavs, getNoteTokens(dataLines))
     
-    return [note for note in notes if behaviorsInNote(note, criteriaBehavs)]
+    return [dataLines[row] for row in index.rowsByType.get(noteAbbrev, []) if scanner.hasMatch(row, dataLines[row])]
 
 def checkDuplicateFocals(dataLines):
     '''
@@ -100,24 +115,16 @@ def checkDuplicateFocals(dataLines):
     checks for cases where the same individual was sampled more than once in the
     same day.
     
-    Returns a list of (date, name) tuples (date and name are both strings),
-    sorted by date, listing all duplicate focals. If none found, returns an
-    empty list.
+    Returns a list of lists of strings: every focal header line for an
+    individual sampled more than once in a day, sorted by date and name (see
+    duplicateRows). If none found, returns an empty list.
     '''
     from constants import focalAbbrev
+    from focalIndex import getFocalIndex
     
-    # Make list of (date, name) tuples for each focal sample
-    dateNames = [(line[2],line[5]) for line in dataLines if isType(line, focalAbbrev)]
-    
-    duplicateFocals = set() 
-    for focal in dateNames:
-        if dateNames.count(focal) > 1:
-            duplicateFocals.add(focal)
+    focalRows = getFocalIndex(dataLines).rowsByType.get(focalAbbrev, [])
     
-    if len(duplicateFocals) > 0: # Then we have some duplicates
-        return sorted(list(duplicateFocals), key = lambda focal: focal[0])
-
-    return []
+    return [dataLines[row] for row in duplicateRows(dataLines, focalRows, [2, 5])]
 
 def checkDuplicateGroups(dataLines):
     '''
@@ -132,30 +139,15 @@ def checkDuplicateGroups(dataLines):
     checks for cases where more than one group was sampled on a single day.
     
     Returns a list of (date, groups) tuples (date and groups are both strings),
-    sorted by date, listing all duplicates. If none found, returns an empty
-    list.
+    sorted by date, listing all duplicates (see listDuplicateGroups). If none
+    found, returns an empty list.
     '''
     from constants import focalAbbrev
+    from focalIndex import getFocalIndex
     
-    # Make set of (date, group) tuples from all the data
-    focalInfoSet = set([(line[2], line[4]) for line in dataLines if isType(line, focalAbbrev)])
-    
-    # Dictionary of dates (keys) and list of group(s) (values) sampled on those dates
-    datesGroups = {}
-    
-    for (focalDate, focalGrp) in focalInfoSet:
-        if focalDate not in datesGroups:
-            datesGroups[focalDate] = [focalGrp]
-        else:
-            datesGroups[focalDate].append(focalGrp)
-            
-    duplicateFocals = []
-    
-    for (focalDate, groups) in sorted(datesGroups.items(), key = lambda pair: pair[0]): # Sort by date
-        if len(groups) > 1:
-            duplicateFocals.append((focalDate, str(groups)))            
+    focalRows = getFocalIndex(dataLines).rowsByType.get(focalAbbrev, [])
     
-    return duplicateFocals
+    return listDuplicateGroups(dataLines, focalRows)
 
 def checkFocalInfantStatus(dataLines, moms):
     '''
@@ -174,18 +166,28 @@ def checkFocalInfantStatus(dataLines, moms):
     Gathers all the lines from dataLines that represent individual "points" in
     a focal sample, then checks each one to see if the row's data says
     anything about the presence or absence of the focal's infant. Next, this
-    function uses the provided dictionary, moms, to see if the focal really
+    function uses the provided InfantPeriods, moms, to see if the focal really
     did or did not have an infant on that day. Any rows where the focal data
     disagrees with "moms", regarding whether or not she has an infant are
     returned. Each row has an extra string appended to the end, indicating her
     infant status according to "moms": "(HAS INFANT)" or "(NO INFANT)".
     
+    moms is an InfantPeriods, presumably from
+    demographyIndex.getInfantPeriods(). All the points are looked up in it
+    at once.
+    
     Returns a list of lists of strings, the aforementioned rows. If no rows
     found with this discrepancy, returns an empty list.
     '''
-    from constants import pntAbbrev, pntActNoInfant
+    from constants import pntActNoInfant
+    from focalIndex import getFocalIndex
+    from timestampCodec import parseDateTime
+    
+    # Only the points that say something about infants (i.e. [6] is at
+    # least 4 characters long) need checking
+    infPnts = [dataLines[row] for row in getFocalIndex(dataLines).pointRows if len(dataLines[row][6]) >= 4]
+    demogSaysInfant = moms.hadInfants([(pnt[5], parseDateTime(pnt[2], pnt[3])) for pnt in infPnts])
     
-    thePnts = [line for line in dataLines if isType(line,pntAbbrev)]
     wrongInfPnts = []
     
     # Dict with string explanation of whether the focal individual has an
@@ -194,19 +196,14 @@ def checkFocalInfantStatus(dataLines, moms):
     momsStr[True] = '(HAS INFANT)'
     momsStr[False] = '(NO INFANT)'
     
-    for pnt in thePnts:
-        if len(pnt[6]) < 4:
-            # This point does not say anything about infants. Ignore.
-            continue
-        # Else, it does say something about infants. Does it mention one, or
-        # does it specifically say that she doesn't have one?
+    for (pnt, demogSays) in zip(infPnts, demogSaysInfant):
+        # Does the point mention an infant, or does it specifically say that
+        # she doesn't have one?
         pntSaysInfant = (pnt[6][2] != pntActNoInfant)
-        # Now, what does other data (demography data, presumably) say about
-        # whether she has an infant?
-        demogSaysInfant = hasInfant(pnt, moms)
-        if pntSaysInfant != demogSaysInfant: # Discrepant! Add to return list.
+        # Compare with what the demography data say (demogSays)
+        if pntSaysInfant != demogSays: # Discrepant! Add to return list.
             outLine = pnt[:]
-            outLine.append(momsStr[demogSaysInfant])
+            outLine.append(momsStr[demogSays])
             wrongInfPnts.append(outLine)
     
     return wrongInfPnts
@@ -219,20 +216,24 @@ def checkFocalOverlaps(dataLines):
     
     Checks for overlapping focals in dataLines, and returns a list of
     (focal1, focal2) tuples. focal1 and 2 are both lists of strings.
-        focal1 is a "header" line, focal2 is the "header" of the last focal to
-        occur during focal1
-    '''
+        focal1 is a "header" line, focal2 is the "header" of a focal that
+        began after focal1 began, but before it ended.
+    The tuples are in the order the focal1 headers occur in dataLines, then
+    the order of the focal2 headers (as if findOverlaps were used on each
+    header in turn).
     
-    from constants import focalAbbrev
+    Rather than compare every focal with every other focal, the focals are
+    "swept" through in order of when they began (see sweepOverlaps).
+    '''
+    from focalIndex import getFocalIndex
+    from timestampCodec import getRowEpochs, lineEpoch, parseDateTime
     
-    allFocals = [line for line in dataLines if isType(line, focalAbbrev)]
-    overlapHdrs = []
+    index = getFocalIndex(dataLines)
+    epochs = getRowEpochs(dataLines)
+    begins = [lineEpoch(epochs, dataLines, row) for row in index.focalRows]
+    ends = [parseDateTime(dataLines[row][2], dataLines[row][-1]) for row in index.focalRows]
     
-    for focal in allFocals:
-        allOverlaps = findOverlaps(focal, allFocals)
-        for overlap in allOverlaps:
-            overlapHdrs.append((focal,overlap))
-    return overlapHdrs
+    return [(dataLines[index.focalRows[focal1]], dataLines[index.focalRows[focal2]]) for (focal1, focal2) in sweepOverlaps(begins, ends)]
 
 def checkInvalidFocalTypes(dataLines):
     '''
@@ -245,9 +246,10 @@ def checkInvalidFocalTypes(dataLines):
     
     Returns a list of lists of strings: the lines where this is true.
     '''
-    from constants import focalAbbrev, stypeAdultFem, stypeJuv
+    from constants import stypeAdultFem, stypeJuv
+    from focalIndex import getFocalIndex
     
-    focals = [line for line in dataLines if isType(line, focalAbbrev)]
+    focals = [dataLines[row] for row in getFocalIndex(dataLines).focalRows]
     
     return [focal for focal in focals if focal[6] not in [stypeAdultFem, stypeJuv]]
 
@@ -263,35 +265,36 @@ def checkMountsConsortsDuringFocal(dataLines):
     file, stripped and split. [0] in each list of strings is the "type" of data
     recorded in that line.
     '''
-    from constants import focalAbbrev, noteAbbrev, adlibAbbrev, bb_consort, bb_mount, bb_ejaculation
-    from datetime import datetime
+    from constants import noteAbbrev, adlibAbbrev, bb_consort, bb_mount, bb_ejaculation
+    from focalIndex import getFocalIndex
+    from noteScanner import NoteScanner, getNoteTokens
+    from timestampCodec import getRowEpochs, lineEpoch, parseDateTime
     
     mountsEtc = [bb_consort, bb_mount, bb_ejaculation]
-    outLines = []
-    lastFocal = []
-    focalEnd = ''
-    
-    for line in dataLines:
-        if isType(line, focalAbbrev):
-            lastFocal = line[:]
-            focalEnd = ' '.join([lastFocal[2], lastFocal[7]])
-            focalEnd = datetime.strptime(focalEnd, '%Y-%m-%d %H:%M:%S')
-        
-        # Check for behaviors in notes
-        elif isType(line, noteAbbrev) and behaviorsInNote(line, mountsEtc):
-            if len(lastFocal) == 0: # no focal yet
-                outLines.append(line)
-            elif not duringFocal(line, focalEnd):
-                outLines.append(line)
-
-        # Check for behaviors in ad-libs
-        elif isType(line, adlibAbbrev) and line[6] in mountsEtc:
-            if len(lastFocal) == 0: # no focal yet
-                outLines.append(line)
-            elif not duringFocal(line, focalEnd):
-                outLines.append(line)
+    scanner = NoteScanner(mountsEtc, getNoteTokens(dataLines))
+    index = getFocalIndex(dataLines)
+    epochs = getRowEpochs(dataLines)
+    focalEnds = {} # Focal number: end of the focal, in seconds since 1970. Only for focals that are needed.
+    outRows = []
+    
+    # Check for behaviors in notes and in ad-libs
+    for row in sorted(index.rowsByType.get(noteAbbrev, []) + index.rowsByType.get(adlibAbbrev, [])):
+        line = dataLines[row]
+        if isType(line, noteAbbrev) and not scanner.hasMatch(row, line):
+            continue
+        if isType(line, adlibAbbrev) and line[6] not in mountsEtc:
+            continue
+        focalNum = index.focalOf[row]
+        if focalNum < 0: # no focal yet
+            outRows.append(row)
+            continue
+        if focalNum not in focalEnds:
+            focalLine = dataLines[index.focalRows[focalNum]]
+            focalEnds[focalNum] = parseDateTime(focalLine[2], focalLine[7])
+        if lineEpoch(epochs, dataLines, row) >= focalEnds[focalNum]:
+            outRows.append(row)
     
-    return outLines
+    return [dataLines[row] for row in outRows]
 
 def checkMountsConsortsInvolvedFocal(dataLines):
     '''
@@ -299,46 +302,66 @@ def checkMountsConsortsInvolvedFocal(dataLines):
     and makes sure either the actor or actee was the focal individual. Returns a
     list of list of strings representing all the cases where this is true.
     
-    Checks both "note" lines and "ad-lib" lines for these behaviors.
+    Checks both "note" lines and "ad-lib" lines for these behaviors. Notes
+    are only checked if they're written "actor act actee", so notes that are
+    too short for that are skipped.
     
     dataLines is a list of list of strings, presumed to be all the data from a
     file, stripped and split. [0] in each list of strings is the "type" of data
     recorded in that line.
     '''
-    from constants import focalAbbrev, noteAbbrev, adlibAbbrev, bb_consort, bb_mount, bb_ejaculation
+    from constants import noteAbbrev, adlibAbbrev, bb_consort, bb_mount, bb_ejaculation
+    from focalIndex import getFocalIndex
+    from noteScanner import NoteScanner, getNoteTokens
     
     mountsEtc = [bb_consort, bb_mount, bb_ejaculation]
-    outLines = []
-    lastFocal = []
-    focalIndiv = ''
+    scanner = NoteScanner(mountsEtc, getNoteTokens(dataLines))
+    index = getFocalIndex(dataLines)
+    outRows = []
     
     # Gather lines of interest
-    for line in dataLines:
-        if isType(line, focalAbbrev):
-            lastFocal = line[:]
-            focalIndiv = lastFocal[5].upper()
+    for row in sorted(index.rowsByType.get(noteAbbrev, []) + index.rowsByType.get(adlibAbbrev, [])):
+        line = dataLines[row]
+        focalIndiv = ''
+        if index.focalOf[row] >= 0:
+            focalIndiv = dataLines[index.focalRows[index.focalOf[row]]][5].upper()
 
-        elif isType(line, noteAbbrev) and behaviorsInNote(line, mountsEtc):
+        if isType(line, noteAbbrev) and scanner.hasMatch(row, line):
             if focalIndiv == '': # no focal yet
-                outLines.append(line)
+                outRows.append(row)
                 continue
-            interaction = (line[-1]).split() # SHOULD be [actor, act, actee]
-            if interaction[1].upper() in mountsEtc: # this is an admittedly poor attempt to parse actor/actee from a note
-                actor = interaction[0].upper()
-                actee = interaction[2].upper()
-                if focalIndiv not in [actor, actee]:
-                    outLines.append(line)
+            interaction = scanner.interaction(row, line) # SHOULD be [actor, act, actee]
+            if interaction is not None: # this is an admittedly poor attempt to parse actor/actee from a note
+                if focalIndiv not in [interaction.actor, interaction.actee]:
+                    outRows.append(row)
 
         elif isType(line, adlibAbbrev) and line[6] in mountsEtc:
             if focalIndiv == '': # no focal yet
-                outLines.append(line)
+                outRows.append(row)
             else:
                 actor = line[5]
                 actee = line[7]
                 if focalIndiv not in [actor, actee]:
-                    outLines.append(line)
+                    outRows.append(row)
     
-    return outLines
+    return [dataLines[row] for row in outRows]
+
+def checkNeighborCodes(dataLines):
+    '''
+    Checks neighbor lines in dataLines for cases where the neighbor code (at
+    [-1]) isn't one of the Prim8 neighbor codes (N0, N1, N2).
+    
+    dataLines is a list of list of strings, presumed to be all the data from a
+    file, stripped and split.
+    
+    Returns a list of lists of strings: the lines where this is true.
+    '''
+    from constants import neighborAbbrev, p8_nghcodes
+    from focalIndex import getFocalIndex
+    
+    linesOfInterest = [dataLines[row] for row in getFocalIndex(dataLines).rowsByType.get(neighborAbbrev, [])]
+    
+    return [line for line in linesOfInterest if line[-1] not in p8_nghcodes]
 
 def checkNeighborNotReal(dataLines):
     '''
@@ -359,11 +382,12 @@ def checkNeighborNotReal(dataLines):
     Returns a list of lists of strings: the lines where this is true.
     '''
     from constants import unnamedCodes, neighborAbbrev
+    from focalIndex import getFocalIndex
     
     # Make a set of known "placeholder" codes to check for 
     plcHoldrs = set(unnamedCodes)
     
-    linesOfInterest = [line for line in dataLines if isType(line, neighborAbbrev)]
+    linesOfInterest = [dataLines[row] for row in getFocalIndex(dataLines).rowsByType.get(neighborAbbrev, [])]
     
     return [line for line in linesOfInterest if line[5] in plcHoldrs or line[7] in plcHoldrs or len(line[5]) != 3 or len(line[7]) != 3]
 
@@ -378,20 +402,9 @@ def checkNeighborsPerPoint(dataLines):
     string: the items from a "point" list of strings joined and tab-delimited.
     The "number of neighbors" is an integer.
     '''
-    from constants import pntAbbrev, neighborAbbrev
-    
-    lastPoint = 'NONE YET'
-    pointsAndCounts = {}
-    pointsAndCounts[lastPoint[:]] = 0
-    
-    for line in dataLines:
-        if isType(line, pntAbbrev):
-            lastPoint = '\t'.join(line)
-            pointsAndCounts[lastPoint[:]] = 0
-        elif isType(line, neighborAbbrev):
-            pointsAndCounts[lastPoint[:]] += 1
+    from sharedResults import neighborCountsPerPoint
     
-    return sorted(pointsAndCounts.items(), key = lambda pair: pair[0])
+    return list(neighborCountsPerPoint(dataLines))
 
 def checkNotesNoFocals(dataLines):
     '''
@@ -405,17 +418,12 @@ def checkNotesNoFocals(dataLines):
     Returns a list of list of strings: the "note" lines on days with no focals.
     '''
     from constants import focalAbbrev, noteAbbrev
+    from focalIndex import getFocalIndex
     
-    focalDates = set()
-    notes = []
-    
-    for line in dataLines:
-        if isType(line, focalAbbrev):
-            focalDates.add(line[2]) # Add the focal date
-        elif isType(line, noteAbbrev):
-            notes.append(line)
+    index = getFocalIndex(dataLines)
+    noteRows = notesWithoutFocals(dataLines, index.rowsByType.get(focalAbbrev, []), index.rowsByType.get(noteAbbrev, []))
     
-    return [note for note in notes if note[2] not in focalDates]
+    return [dataLines[row] for row in noteRows]
 
 def checkPointMatchesFocal(dataLines):
     '''
@@ -431,21 +439,9 @@ def checkPointMatchesFocal(dataLines):
     Returns a list of list of strings: the "point" lines that don't match the
     current focal.
     '''
-    from constants import focalAbbrev, pntAbbrev
+    from sharedResults import nonMatchingPointRows
     
-    lastFocal = []
-    nonMatchingPoints = []
-    
-    for line in dataLines:
-        if isType(line, focalAbbrev):
-            lastFocal = line[:]
-        elif isType(line, pntAbbrev):
-            if lastFocal == []: #PNT with no HDR yet, report this
-                nonMatchingPoints.append(line)
-            elif not sameActor(lastFocal, line) or not sameDate(lastFocal, line):
-                nonMatchingPoints.append(line)
-
-    return nonMatchingPoints    
+    return [dataLines[row] for row in sorted(nonMatchingPointRows(dataLines))]
 
 def checkSpecificBehavior(dataLines, specBehaviors):
     '''
@@ -504,13 +500,20 @@ def checkUniqueNeighbors(dataLines, sampleProtocols):
     dataLines is a list of lists of strings, presumed to be all the data from a
     file, stripped and split. sampleProtocols is a list of strings.
     '''
-    from constants import unknSnames, focalAbbrev, pntAbbrev, neighborAbbrev
+    from constants import pntAbbrev, neighborAbbrev
+    from focalIndex import getFocalIndex
+    
+    index = getFocalIndex(dataLines)
     
-    # Make placeholders for iteration.
-    # Holds the last-read "header" line, but only for focals of the type(s) allowed by sampleProtocols
-    currentHeader = []
-    #Holds the last-read "point" line, but only if it was in an allowed focal 
-    currentPoint = []
+    # Only points and neighbors in focals of the type(s) allowed by sampleProtocols matter here
+    def inFocalOfInterest(row):
+        return index.focalOf[row] >= 0 and dataLines[index.focalRows[index.focalOf[row]]][6] in sampleProtocols
+    
+    # The points that count: in a focal of interest, and on the same date as the focal
+    goodPoints = set()
+    for row in index.pointRows:
+        if inFocalOfInterest(row) and sameDate(dataLines[row], dataLines[index.focalRows[index.focalOf[row]]]): #This should always be true, but checked just in case
+            goodPoints.add(row)
     
     # Dictionary of points and neighbors.
     myPnts = {}
@@ -521,56 +524,22 @@ def checkUniqueNeighbors(dataLines, sampleProtocols):
     missingPntKey = '(MISSING POINT LINE)'
     myPnts[missingPntKey] = []
     
-    for line in dataLines:
-        if line[0] not in [focalAbbrev, pntAbbrev, neighborAbbrev]:
-            # Then we don't care about it for this question
-            continue
-        elif isType(line, focalAbbrev):
-            if line[6] in sampleProtocols: #This is a focal sample of interest
-                currentHeader = line[:]
-                currentPoint = []
-            else: #We don't care about any of the data in this focal
-                currentHeader = []
-                currentPoint = []
-                continue
-        # All that's left are points and neighbors. If currentHeader is empty, then we don't care about any of these.
-        elif currentHeader == []:
-            continue
-        # Only points and neighbors that actually happened during focals of interest are left
-        elif isType(line, pntAbbrev):
-            if sameDate(line, currentHeader): #This should always be true, but added here just in case
-                currentPoint = line[:]
-                myPnts['\t'.join(currentPoint)] = []
-        elif isType(line, neighborAbbrev):
-            if currentPoint == []: #This should only happen if the observer messed up somewhere else
-                myPnts[missingPntKey].append(line)
-            elif sameDate(line, currentPoint):
-                myPnts['\t'.join(currentPoint)].append(line)
-    
-    # Get list of names that are allowed to be nonunique
-    fakeNames = unknSnames.keys()
-    
-    # Make list to hold the point and neighbor lines with nonunique neighbors
-    nonUniqueNeighbors = []
-    
-    for (point, neighbors) in sorted(myPnts.items()):
-        if len(neighbors) > 3:
-            # Then you've got too many neighbors.  Don't bother
-            # with checking for neighbor uniqueness, this point has
-            # bigger issues.
+    # Go through the good points and the neighbors of interest in order
+    for row in sorted(list(goodPoints) + [row for row in index.rowsByType.get(neighborAbbrev, []) if inFocalOfInterest(row)]):
+        line = dataLines[row]
+        if isType(line, pntAbbrev):
+            myPnts['\t'.join(line)] = []
             continue
-        nghNames = []
-        for neighbor in neighbors: #Collect all the neighbor names into one list
-            if neighbor[7] not in fakeNames:
-                nghNames.append(neighbor[7])
-        if len(nghNames) > len(set(nghNames)): #Then 1 or more neighbors is redundant
-            if len(nonUniqueNeighbors) > 0: # For every instance after the first, add a newline first
-                nonUniqueNeighbors.append([]) # When this is output to file, a newline will be added
-            nonUniqueNeighbors.append(point.split('\t'))
-            for neighbor in neighbors:
-                nonUniqueNeighbors.append(neighbor)
-
-    return nonUniqueNeighbors
+        # Find this neighbor's point: the last good point since its focal began
+        pointNum = index.pointOf[row]
+        while pointNum >= 0 and index.pointRows[pointNum] > index.focalRows[index.focalOf[row]] and index.pointRows[pointNum] not in goodPoints:
+            pointNum -= 1
+        if pointNum < 0 or index.pointRows[pointNum] < index.focalRows[index.focalOf[row]]: #This should only happen if the observer messed up somewhere else
+            myPnts[missingPntKey].append(line)
+        elif sameDate(line, dataLines[index.pointRows[pointNum]]):
+            myPnts['\t'.join(dataLines[index.pointRows[pointNum]])].append(line)
+    
+    return listNonUniqueNeighbors(myPnts)
 
 def countFocalTypes(dataLines):
     '''
@@ -683,26 +652,9 @@ def countPointsPerFocal(dataLines, incOutOfSights = True):
     Returns a list of (Focal header as string, integer number of
     points) tuples.
     '''
-    from constants import outOfSightValue
-    
-    outData = []
+    from sharedResults import pointCountsPerFocal
     
-    # Remove points that somehow appear during a focal duration but
-    # are not part of the same focal sample
-    nonMatchingPoints = checkPointMatchesFocal(dataLines)
-    theData = [line for line in dataLines if line not in nonMatchingPoints]
-    
-    # Remove out of sight points from counts, if requested
-    if not incOutOfSights:
-        oosPoints = pointsOutOfSight(dataLines)
-        theData = [line for line in theData if line not in oosPoints]
-    
-    focalsDict = getPointsPerFocal(theData)
-    
-    for (focal, points) in sorted(focalsDict.items()):
-        outData.append((focal, len(points)))
-    
-    return outData
+    return list(pointCountsPerFocal(dataLines, incOutOfSights))
 
 def countSummary(dataLines):
     '''
@@ -744,18 +696,32 @@ def countUniqueDates(dataLines):
     
     return len(theDates)
 
+def duplicateRows(lines, rows, keyIndexes):
+    '''
+    Finds the lines that have the same values as another line at
+    keyIndexes. lines, rows, and keyIndexes are as in groupRows.
+    
+    Returns a list of integers: the rows whose key isn't unique, sorted by
+    key (e.g. by date, then name), and then in the order they were given.
+    '''
+    groups = groupRows(lines, rows, keyIndexes)
+    
+    return [row for key in sorted(groups) if len(groups[key]) > 1 for row in groups[key]]
+
 def duringFocal (eventLine, focalEndTime):
     '''
     Checks if the day/time in eventLine is before the focalEndTime.
     eventLine is a list of strings. The date is at eventLine[2], the time is at eventLine[3].
-    focalEndTime is a datetime, not just a time.
+    focalEndTime is a datetime, not just a time, or an integer number of
+    seconds since 1970 (see timestampCodec).
     Returns TRUE or FALSE.
     '''
     from datetime import datetime
+    from timestampCodec import parseDateTime, fromDatetime
     
-    eventDayTime = ' '.join(eventLine[2:4])
-    eventDateTime = datetime.strptime(eventDayTime, '%Y-%m-%d %H:%M:%S')
-    return eventDateTime < focalEndTime
+    if isinstance(focalEndTime, datetime):
+        focalEndTime = fromDatetime(focalEndTime)
+    return parseDateTime(eventLine[2], eventLine[3]) < focalEndTime
 
 def findOverlaps(thisHdrLine, otherHdrs):
     '''
@@ -768,12 +734,14 @@ def findOverlaps(thisHdrLine, otherHdrs):
     list of lists of strings: any overlapping headers from otherHdrs, or an
     empty list if no overlaps.
     '''
-    thisHdrBegin = getDateTime(thisHdrLine, 2, 3)
-    thisHdrEnd = getDateTime(thisHdrLine, 2, -1)
+    from timestampCodec import parseDateTime
+    
+    thisHdrBegin = parseDateTime(thisHdrLine[2], thisHdrLine[3])
+    thisHdrEnd = parseDateTime(thisHdrLine[2], thisHdrLine[-1])
     overLaps = []
     
     for hdr in otherHdrs:
-        otherHdrBegin = getDateTime(hdr, 2, 3)
+        otherHdrBegin = parseDateTime(hdr[2], hdr[3])
         if otherHdrBegin > thisHdrBegin and otherHdrBegin < thisHdrEnd:
             overLaps.append(hdr)
     
@@ -788,23 +756,18 @@ def firstAndLastLines(dataLines):
     Returns two strings, both formatted 'yyyy-mm-dd hh:mm:ss' and representing
     the first and last events in dataLines.
     '''
-    #Make sure the data are in chronological order
-    srtLines = sorted(dataLines, key = lambda line: (line[2], line[3]))
+    from sharedResults import firstAndLastTimes
     
-    firstEvent = getDateTime(srtLines[0], 2, 3).strftime('%Y-%m-%d %H:%M:%S')
-    lastEvent = getDateTime(srtLines[-1], 2, 3).strftime('%Y-%m-%d %H:%M:%S')
-    
-    return (firstEvent, lastEvent)
+    return firstAndLastTimes(dataLines)
     
 def getDateTime(eventLine, dateIndex, timeIndex):
     '''
     Given a list of strings (eventLine) with a yyyy-mm-dd date at [dateIndex] and the hh:mm:ss time at [timeIndex].
     Returns a datetime object with the date and time from eventLine.
     '''
-    from datetime import datetime
+    from timestampCodec import parseDateTime, toDatetime
     
-    joinedTime = ' '.join([eventLine[dateIndex],eventLine[timeIndex]]) ##Result should be string 'yyyy-mm-dd hh:mm:ss'
-    return datetime.strptime(joinedTime, '%Y-%m-%d %H:%M:%S')
+    return toDatetime(parseDateTime(eventLine[dateIndex], eventLine[timeIndex]))
 
 def getPointsPerFocal(dataLines):
     '''
@@ -816,21 +779,51 @@ def getPointsPerFocal(dataLines):
     file, stripped and split.  They are also presumed to be in chronological
     order.
     '''
-    from constants import focalAbbrev, pntAbbrev
+    from focalIndex import getFocalIndex
     
-    focalCounts = {}
-    lastFocal = 'NONE YET'
-    focalCounts[lastFocal] = []
+    index = getFocalIndex(dataLines)
     
-    for line in dataLines:
-        if isType(line, focalAbbrev):
-            lastFocal = '\t'.join(line)
-            focalCounts[lastFocal] = []
-        elif isType(line, pntAbbrev):
-            focalCounts[lastFocal].append(line)
+    focalPoints = [[] for focalRow in index.focalRows] # Points in each focal, by focal number
+    noFocalPoints = [] # Points before any focal
+    for row in index.pointRows:
+        if index.focalOf[row] < 0:
+            noFocalPoints.append(dataLines[row])
+        else:
+            focalPoints[index.focalOf[row]].append(dataLines[row])
+    
+    focalCounts = {}
+    focalCounts['NONE YET'] = noFocalPoints
+    for (focalNum, row) in enumerate(index.focalRows):
+        focalCounts['\t'.join(dataLines[row])] = focalPoints[focalNum] # If the same header occurs twice, the later one's points are kept
     
     return focalCounts
 
+def groupRows(lines, rows, keyIndexes):
+    '''
+    Groups lines of data by their values at certain indexes, in one pass.
+    
+    lines is anything that gives a line of data (list of strings) for each
+    row (its index in the data): usually dataLines itself, or a dictionary of
+    only some of its lines. rows is a list of the rows (integers) to group,
+    and keyIndexes a list of the indexes in each line to group them by, e.g.
+    [2, 5] for (date, name).
+    
+    Returns a dictionary whose keys are tuples of strings (the values at
+    keyIndexes) and whose values are lists of the rows with that key, in the
+    order given. The keys are in the order they were first seen.
+    '''
+    groups = {}
+    
+    for row in rows:
+        line = lines[row]
+        key = tuple([line[i] for i in keyIndexes])
+        if key in groups:
+            groups[key].append(row)
+        else:
+            groups[key] = [row]
+    
+    return groups
+
 def hasInfant(dataLine, momDict):
     '''
     Asks if the focal individual in dataLine actually had an infant on the
@@ -838,26 +831,72 @@ def hasInfant(dataLine, momDict):
     existence of an infant, or lack thereof.) Returns True (she does) or False,
     based on the info in momDict.
     
-    momDict is a dictionary of moms and their kids, presumably created by the
-    momsAndInfants() function.
+    momDict is an InfantPeriods, presumably from
+    demographyIndex.getInfantPeriods().
     
     If the focal individual doesn't exist in momDict, returns False. As
     opposed to an error.
     '''
-    thisMom = dataLine[5]
-    thisDate = getDateTime(dataLine, 2, 3)
+    from timestampCodec import parseDateTime
     
-    if thisMom[:] not in momDict:
-        return False
+    return momDict.hadInfant(dataLine[5], parseDateTime(dataLine[2], dataLine[3]))
+
+def listDuplicateGroups(lines, focalRows):
+    '''
+    Finds the days when more than one group was sampled. lines is as in
+    groupRows, and focalRows is a list of the rows of focal headers, with
+    the date at [2] and the group at [4].
     
-    for kid in momDict[thisMom[:]]:
-        kidBirth = kid[0]
-        kidEnd = kid[1]
-        if thisDate >= kidBirth and thisDate <= kidEnd: # Found an infant
-            return True
+    Returns a list of (date, groups) tuples, sorted by date. groups is a
+    string: the list of the groups sampled that day, in the order they were
+    first sampled.
+    '''
+    duplicateGroups = []
+    
+    for (dateKey, dateRows) in sorted(groupRows(lines, focalRows, [2]).items()):
+        groups = [groupKey[0] for groupKey in groupRows(lines, dateRows, [4])]
+        if len(groups) > 1:
+            duplicateGroups.append((dateKey[0], str(groups)))
     
-    # No infant found
-    return False
+    return duplicateGroups
+
+def listNonUniqueNeighbors(myPnts):
+    '''
+    myPnts is a dictionary of points and their neighbors, as made in
+    checkUniqueNeighbors: keys are point lines, joined as strings, and
+    values are lists of the neighbor lines (as lists of strings) for each
+    point.
+    
+    Returns a list of lists of strings: the point lines that have
+    non-unique neighbors, each followed by all of its neighbor lines (see
+    checkUniqueNeighbors).
+    '''
+    from constants import unknSnames
+    
+    # Get list of names that are allowed to be nonunique
+    fakeNames = unknSnames.keys()
+    
+    # Make list to hold the point and neighbor lines with nonunique neighbors
+    nonUniqueNeighbors = []
+    
+    for (point, neighbors) in sorted(myPnts.items()):
+        if len(neighbors) > 3:
+            # Then you've got too many neighbors.  Don't bother
+            # with checking for neighbor uniqueness, this point has
+            # bigger issues.
+            continue
+        nghNames = []
+        for neighbor in neighbors: #Collect all the neighbor names into one list
+            if neighbor[7] not in fakeNames:
+                nghNames.append(neighbor[7])
+        if len(nghNames) > len(set(nghNames)): #Then 1 or more neighbors is redundant
+            if len(nonUniqueNeighbors) > 0: # For every instance after the first, add a newline first
+                nonUniqueNeighbors.append([]) # When this is output to file, a newline will be added
+            nonUniqueNeighbors.append(point.split('\t'))
+            for neighbor in neighbors:
+                nonUniqueNeighbors.append(neighbor)
+
+    return nonUniqueNeighbors
 
 def momsAndInfants(momDataFilePath):
     '''
@@ -882,9 +921,10 @@ def momsAndInfants(momDataFilePath):
     those dates have been converted from strings to datetime objects. E.g. the
     the value for a mom with 3 kids will be a list of 3 tuples, each having
     the date boundaries during which that kid was the mom's "infant".
-    '''
-    from datetime import datetime
     
+    For checking whether moms had infants, demographyIndex.getInfantPeriods
+    is much faster, and only reads the file once.
+    '''
     momFile = open(momDataFilePath, "r")
     momFile.readline() # Skip the column descriptions
     
@@ -893,8 +933,8 @@ def momsAndInfants(momDataFilePath):
     for line in momFile:
         thisLine = line.strip().split('\t')
         thisMom = thisLine[0]
-        kidBirth = datetime.strptime(thisLine[2],'%Y-%m-%d')
-        endDate = datetime.strptime(thisLine[3],'%Y-%m-%d')
+        kidBirth = yyyymmddToDate(thisLine[2])
+        endDate = yyyymmddToDate(thisLine[3])
         thisKid = (kidBirth, endDate)
         if thisMom[:] in momDict.keys(): # This mom already added. Add the kid
             momDict[thisMom[:]].append(thisKid)
@@ -905,6 +945,18 @@ def momsAndInfants(momDataFilePath):
     
     return momDict
 
+def notesWithoutFocals(lines, focalRows, noteRows):
+    '''
+    Finds the notes on days without any focal samples. lines is as in
+    groupRows, and focalRows and noteRows are lists of the rows of the focal
+    headers and notes. Both have the date at [2].
+    
+    Returns a list of integers: the rows of those notes, in order.
+    '''
+    focalDates = groupRows(lines, focalRows, [2])
+    
+    return sorted([row for (noteDate, dateRows) in groupRows(lines, noteRows, [2]).items() if noteDate not in focalDates for row in dateRows])
+
 def pointsOutOfSight(dataLines):
     '''
     dataLines is a list of list of strings, presumed to be all the data from a
@@ -917,11 +969,9 @@ def pointsOutOfSight(dataLines):
     
     Returns a list of lists of strings: all the "out of sight" lines.
     '''
-    from constants import pntAbbrev, outOfSightValue
-    
-    oosLines =[line for line in dataLines if isType(line, pntAbbrev) and line[6] == outOfSightValue]
+    from sharedResults import outOfSightRows
     
-    return oosLines
+    return [dataLines[row] for row in sorted(outOfSightRows(dataLines))]
 
 def sameActor(eventLine1, eventLine2):
     '''
@@ -949,11 +999,47 @@ def sameDate(eventLine1, eventLine2):
     
     Returns TRUE or FALSE.
     '''
-    from datetime import datetime
+    from timestampCodec import parseDate
     
-    date1 = datetime.strptime(eventLine1[2],'%Y-%m-%d')
-    date2 = datetime.strptime(eventLine2[2],'%Y-%m-%d')
-    return date1 == date2
+    return parseDate(eventLine1[2]) == parseDate(eventLine2[2])
+
+def sweepOverlaps(begins, ends):
+    '''
+    begins and ends are lists of integers, the beginning and end times (e.g.
+    in seconds since 1970) of some focal samples: the beginning and end of
+    focal number i are begins[i] and ends[i].
+    
+    Finds every pair of focals where the second began after the first began,
+    but before it ended. The focals are "swept" through in order of when
+    they began, keeping track of which ones haven't ended yet, so this takes
+    time in proportion to n log n (plus the number of pairs found), rather
+    than n squared.
+    
+    Returns a sorted list of (focal1 number, focal2 number) tuples.
+    '''
+    import heapq
+    
+    byBegin = sorted(range(len(begins)), key = begins.__getitem__) # Focal numbers, in order of when they began
+    notEnded = [] # (end, focal number) heap of the focals begun so far that may not have ended yet
+    overlapNums = [] # (focal1 number, focal2 number)
+    i = 0
+    while i < len(byBegin):
+        thisBegin = begins[byBegin[i]]
+        while len(notEnded) > 0 and notEnded[0][0] <= thisBegin:
+            heapq.heappop(notEnded)
+        
+        # Focals that began at the same time don't overlap each other, so
+        # find all the ones that began now before adding any to notEnded
+        nextI = i
+        while nextI < len(byBegin) and begins[byBegin[nextI]] == thisBegin:
+            overlapNums.extend([(focalNum, byBegin[nextI]) for (end, focalNum) in notEnded])
+            nextI += 1
+        for focalNum in byBegin[i:nextI]:
+            heapq.heappush(notEnded, (ends[focalNum], focalNum))
+        i = nextI
+    
+    overlapNums.sort()
+    return overlapNums
 
 def theseWithoutThose(dataLines, thisType, notThose, butYesThem = [], beforeThem = []):
     '''
@@ -1014,6 +1100,8 @@ def theseWithoutThose(dataLines, thisType, notThose, butYesThem = [], beforeThem
     
     Returns a list of lists of strings.
     '''
+    from focalIndex import getFocalIndex
+    from heapq import merge
     
     if thisType in notThose:
         return ['ERROR (' + thisType + ': Cannot exclude an item type from itself']
@@ -1029,7 +1117,12 @@ def theseWithoutThose(dataLines, thisType, notThose, butYesThem = [], beforeThem
     if len(butYesThem) > 0:
         checkYes = True
     
-    for line in dataLines:
+    # Lines of any other type don't change anything below, so only go
+    # through the lines of these types
+    rowsByType = getFocalIndex(dataLines).rowsByType
+    linesOfInterest = [dataLines[row] for row in merge(*[rowsByType.get(lineType, []) for lineType in set([thisType] + notThose + butYesThem + beforeThem)])]
+    
+    for line in linesOfInterest:
         if maybeThis == []:
             if isType(line, thisType):
                 maybeThis = line[:]
@@ -1138,7 +1231,7 @@ def yyyymmddToDate(dateString):
     
     Returns a datetime object from the provided date.
     '''
-    from datetime import datetime
+    from timestampCodec import parseDate, toDatetime
     
-    return datetime.strptime(dateString, '%Y-%m-%d')
+    return toDatetime(parseDate(dateString))
 
@@ -0,0 +1,210 @@
+'''
+Created on 17 Oct 2026
+
+The checks in errorChecking.errorAlertSummary, each written as a "rule": a
+small object that knows what it checks for (its title), does the check, and
+writes up what it found (see errorCheckingHelpers.writeAlert).
+
+The checks themselves are the functions in errorCheckingHelpers. A rule
+only calls its function and puts the results in the form that's reported.
+Those functions look lines up in the data's FocalIndex (see focalIndex) and
+share anything that more than one of them needs (see sharedResults), so
+runRules makes sure the data are a ProcessedDataset, where these are saved.
+That way the index and the shared results are only worked out once, no
+matter how many rules there are.
+'''
+from constants import focalAbbrev, pntAbbrev, neighborAbbrev, outOfSightValue
+from errorCheckingHelpers import checkDuplicateFocals, checkDuplicateGroups, checkFocalOverlaps, checkNeighborsPerPoint
+from errorCheckingHelpers import checkPointMatchesFocal, checkTooManyPoints, checkUniqueNeighbors, theseWithoutThose, writeAlert
+
+class ErrorRule(object):
+    '''
+    One check for errors (or things that may be errors) in the data. This
+    does nothing by itself; each kind of check is a subclass that sets
+    "title" and overrides check.
+
+    A rule's findings are kept in alertData, a list of strings, usually one
+    for each case found.
+    '''
+    title = '' ##What was checked, in human language (see writeAlert)
+
+    def __init__(self):
+        self.alertData = []
+        self.numForAlert = '' ##Only needed when the number of cases isn't len(alertData). See writeAlert.
+
+    def check(self, dataLines):
+        '''
+        dataLines is a ProcessedDataset (see runRules).
+
+        Does the check, and saves the findings in alertData.
+        '''
+        pass
+
+    def render(self, showSpecifics = True):
+        '''
+        Returns a string: this rule's findings, written by writeAlert.
+        '''
+        return writeAlert(self.title, self.alertData, showSpecifics, self.numForAlert)
+
+def runRules(dataLines, rules):
+    '''
+    dataLines is a list of list of strings, presumed to be all the data from a
+    file, stripped and split, or a ProcessedDataset. rules is a list of
+    ErrorRule objects.
+
+    Does each rule's check, in order. If dataLines isn't a ProcessedDataset,
+    it's made into one first, so the rules can share the FocalIndex and
+    other results.
+
+    Returns rules.
+    '''
+    from processedDataset import ProcessedDataset
+
+    if not isinstance(dataLines, ProcessedDataset):
+        dataLines = ProcessedDataset('', dataLines)
+
+    for rule in rules:
+        rule.check(dataLines)
+
+    return rules
+
+class LinesRule(ErrorRule):
+    '''
+    Any check whose function returns the lines (lists of strings) it found.
+    Each line is reported tab-delimited.
+    '''
+    def __init__(self, title, checkFunction, *checkArgs):
+        '''
+        title is a string (see ErrorRule). checkFunction is the function
+        that does the check, called as checkFunction(dataLines, *checkArgs).
+        '''
+        ErrorRule.__init__(self)
+        self.title = title
+        self.checkFunction = checkFunction
+        self.checkArgs = checkArgs
+
+    def check(self, dataLines):
+        self.alertData = ['\t'.join(line) for line in self.checkFunction(dataLines, *self.checkArgs)]
+
+class DuplicateFocalsRule(ErrorRule):
+    '''
+    Same individual sampled more than once in a day (see
+    checkDuplicateFocals).
+    '''
+    title = 'Duplicate (date, sname) pairs'
+
+    def check(self, dataLines):
+        duplicates = checkDuplicateFocals(dataLines)
+        self.alertData = ['\t'.join(line) for line in duplicates]
+        self.numForAlert = len(set([(line[2], line[5]) for line in duplicates])) # Number of (date, sname) pairs, not header lines
+
+class DuplicateGroupsRule(ErrorRule):
+    '''
+    More than one group sampled in a day (see checkDuplicateGroups).
+    '''
+    title = '>1 group sampled in a day'
+
+    def check(self, dataLines):
+        self.alertData = ['\t'.join(pair) for pair in checkDuplicateGroups(dataLines)]
+
+class FocalOverlapsRule(ErrorRule):
+    '''
+    Focals that began before an earlier focal ended (see
+    checkFocalOverlaps).
+    '''
+    title = 'Overlapping focals'
+
+    def check(self, dataLines):
+        for (focal1, focal2) in checkFocalOverlaps(dataLines):
+            outFocal1 = ' '.join([focal1[2], focal1[3], focal1[5]]) # Date, time, ID
+            outFocal2 = ' '.join([focal2[2], focal2[3], focal2[5]])
+            self.alertData.append(', '.join([outFocal1, outFocal2]))
+
+class TooManyPointsRule(ErrorRule):
+    '''
+    Focals with more than maxPointsPerFocal points, not counting points that
+    don't match the focal (see checkTooManyPoints).
+    '''
+    title = 'Focal samples with > 10 points'
+
+    def check(self, dataLines):
+        self.alertData = [(focal + '; ' + str(count) + ' points') for (focal, count) in checkTooManyPoints(dataLines)]
+
+class PointsWithoutNeighborsRule(ErrorRule):
+    '''
+    In-sight points with no neighbors before the next point or focal, not
+    counting points that don't match the focal.
+    '''
+    title = 'In-sight points w/o neighbors'
+
+    def check(self, dataLines):
+        nonMatchingPoints = set(['\t'.join(line) for line in checkPointMatchesFocal(dataLines)])
+        alertData = theseWithoutThose(dataLines, pntAbbrev, [neighborAbbrev], beforeThem = [focalAbbrev])
+        alertData = ['\t'.join(line) for line in alertData if line[6] != outOfSightValue] #Exclude out-of-sight points
+        self.alertData = [line for line in alertData if line not in nonMatchingPoints] #Exclude non-matching points
+
+class TooManyNeighborsRule(ErrorRule):
+    '''
+    Points with more than 3 neighbors (see checkNeighborsPerPoint).
+    '''
+    title = 'Points with >3 neighbors'
+
+    def check(self, dataLines):
+        self.alertData = [point for (point, count) in checkNeighborsPerPoint(dataLines) if count > 3]
+
+class UniqueNeighborsRule(ErrorRule):
+    '''
+    Points (in samples of certain types) whose neighbors aren't all
+    different individuals (see checkUniqueNeighbors).
+    '''
+    def __init__(self, title, sampleProtocols):
+        '''
+        title is a string (see ErrorRule). sampleProtocols is a list of
+        strings: the focal sample types to check.
+        '''
+        ErrorRule.__init__(self)
+        self.title = title
+        self.sampleProtocols = sampleProtocols
+
+    def check(self, dataLines):
+        nonUniqueNeighbors = checkUniqueNeighbors(dataLines, self.sampleProtocols)
+        self.numForAlert = len([line for line in nonUniqueNeighbors if len(line) > 0 and line[0] == pntAbbrev])
+        self.alertData = ['\t'.join(line) for line in nonUniqueNeighbors]
+
+class FocalsNotLoggedRule(ErrorRule):
+    '''
+    Focal samples that aren't in the focal sample log (see
+    compareFocalLogs.getFocalsNotLogged). The comparison the other way, for
+    LoggedNotDoneRule, is done at the same time and saved in notDone.
+    '''
+    title = "Focal samples that aren't in the log"
+
+    def __init__(self, focalLogPath, limitLogDates = False):
+        ErrorRule.__init__(self)
+        self.focalLogPath = focalLogPath
+        self.limitLogDates = limitLogDates
+        self.notDone = []
+
+    def check(self, dataLines):
+        from compareFocalLogs import reconcileFocalLog
+
+        (notLogged, self.notDone) = reconcileFocalLog(dataLines, self.focalLogPath, self.limitLogDates)
+        self.alertData = [line[0]+"\t"+line[2]+" point(s) in sight, out of "+line[1] for line in notLogged]
+
+class LoggedNotDoneRule(ErrorRule):
+    '''
+    Samples logged as complete that aren't in the data (see
+    compareFocalLogs.getLoggedNotDone).
+    '''
+    title = "Logged samples that aren't in the data"
+
+    def __init__(self, notLoggedRule):
+        '''
+        notLoggedRule is the FocalsNotLoggedRule that's run along with this
+        one (and before it), which finds these samples too.
+        '''
+        ErrorRule.__init__(self)
+        self.notLoggedRule = notLoggedRule
+
+    def check(self, dataLines):
+        self.alertData = self.notLoggedRule.notDone
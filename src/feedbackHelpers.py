@@ -7,7 +7,7 @@ our Kenyan observers.
 @author: Jake Gordon, <jacob.b.gordon@gmail.com>
 '''
 from babaseWriteHelpers import isType
-from datetime import datetime
+from timestampCodec import parseDateTime, parseDateTimeString, formatKenyaDate, formatKenyaDateTime
 
 def kenyaDateTime(strDateTime, useTime = True):
     '''
@@ -23,16 +23,10 @@ def kenyaDateTime(strDateTime, useTime = True):
     Returns a string: the date/time in the new format. If useTime is False,
     the string only returns the date.
     '''
-    thisStr = strDateTime[:]
-    
     if not useTime: # Then only fetch the date
-        thisStr = thisStr[:10] + ' 00:00:00'
-        
-        thisDate = datetime.strptime(thisStr, '%Y-%m-%d %H:%M:%S')
-        return (datetime.strftime(thisDate, '%d%b%y')).upper()
+        return formatKenyaDate(parseDateTime(strDateTime[:10], '00:00:00'))
     
-    thisDate = datetime.strptime(thisStr, '%Y-%m-%d %H:%M:%S')
-    return (datetime.strftime(thisDate, '%d%b%y %H:%M:%S')).upper()
+    return formatKenyaDateTime(parseDateTimeString(strDateTime))
 
 def kenyaFixDateInLine(dataLine):
     '''
@@ -0,0 +1,71 @@
+'''
+Created on 17 Oct 2026
+
+An index of which focal sample (and which point) every line of processed
+Prim8 data belongs to.
+
+Many checks need to know which "header" (HDR) line a point, neighbor,
+ad-lib, or note belongs to, and which point a neighbor belongs to.  Instead
+of each check walking through the data keeping track of the "last focal" or
+"last point" itself, the index is made once, in a single pass, and each
+check simply looks lines up in it.  When the data are a ProcessedDataset,
+the index is saved with the dataset, so it's only ever made once.
+'''
+from array import array
+from collections import namedtuple
+
+# The index for a list of lines of data (a "row" is the index of a line in the list):
+#    focalRows: array of the rows of each focal header, in order.  A focal's number is its index in this array.
+#    pointRows: array of the rows of each point line, in order.  A point's number is its index in this array.
+#    focalOf: array with the focal number for every row: the last focal header at or before the row, or -1 if none.
+#    pointOf: array with the point number for every row: the last point at or before the row, or -1 if none.
+#        Note that this is NOT reset by a new focal header.  Compare focalOf for the row and for the point's row
+#        (focalOf[pointRows[pointOf[row]]]) to see if the point belongs to the same focal.
+#    rowsByType: dictionary whose keys are line types (e.g. pntAbbrev) and values are lists of the rows of that type, in order.
+FocalIndex = namedtuple('FocalIndex', ['focalRows', 'pointRows', 'focalOf', 'pointOf', 'rowsByType'])
+
+def buildFocalIndex(dataLines):
+    '''
+    dataLines is a list of lists of strings (or a ProcessedDataset),
+    presumed to be all the data from a file, stripped and split, in
+    chronological order.
+
+    Returns a FocalIndex for dataLines.
+    '''
+    from constants import focalAbbrev, pntAbbrev
+
+    focalRows = array('l')
+    pointRows = array('l')
+    focalOf = array('l')
+    pointOf = array('l')
+    rowsByType = {}
+
+    currentFocal = -1
+    currentPoint = -1
+    for (row, line) in enumerate(dataLines):
+        lineType = line[0]
+        if lineType == focalAbbrev:
+            currentFocal = len(focalRows)
+            focalRows.append(row)
+        elif lineType == pntAbbrev:
+            currentPoint = len(pointRows)
+            pointRows.append(row)
+        focalOf.append(currentFocal)
+        pointOf.append(currentPoint)
+        if lineType not in rowsByType:
+            rowsByType[lineType] = []
+        rowsByType[lineType].append(row)
+
+    return FocalIndex(focalRows, pointRows, focalOf, pointOf, rowsByType)
+
+def getFocalIndex(dataLines):
+    '''
+    Returns the FocalIndex for dataLines (see buildFocalIndex).  If dataLines
+    is a ProcessedDataset, the index is only made the first time, and saved
+    with the dataset.
+    '''
+    from processedDataset import ProcessedDataset
+
+    if isinstance(dataLines, ProcessedDataset):
+        return dataLines.cached('focalIndex', buildFocalIndex)
+    return buildFocalIndex(dataLines)
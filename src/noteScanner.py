@@ -0,0 +1,113 @@
+'''
+Created on 17 Oct 2026
+
+Looks for behaviors (e.g. mounts, ejaculations, consorts) in the free-text
+notes that observers write.
+
+A behavior is "in" a note if it occurs as one of the note's space-delimited
+words, ignoring case (see errorCheckingHelpers.behaviorsInNote). So instead
+of comparing each word with each behavior, the behaviors are put into a
+single set (a NoteScanner), and each note is split into words, upper case,
+only once. The words in each note can be saved by row (see getNoteTokens),
+so every check that scans the same data can share them.
+'''
+from collections import namedtuple
+
+# A behavior found in a note:
+#    behavior: the word that matched, upper case.
+#    position: the index of that word in the note.
+#    actor: the word just before it (upper case), or '' if none.
+#    actee: the word just after it (upper case), or '' if none.
+# Notes about interactions are usually written "actor act actee", e.g.
+# "SIN M ABC", but there is no guarantee of that. Use actor and actee with
+# care.
+NoteMatch = namedtuple('NoteMatch', ['behavior', 'position', 'actor', 'actee'])
+
+def tokenizeNote(dataLine):
+    '''
+    dataLine is a list of strings: a "note" line, with the note itself at
+    [-1].
+
+    Returns a tuple of strings: the words in the note, in upper case.
+    '''
+    return tuple(dataLine[-1].upper().split())
+
+def getNoteTokens(dataLines):
+    '''
+    Returns a dictionary for saving the words in each note in dataLines
+    (keys are rows, values are from tokenizeNote), to give to NoteScanners.
+    If dataLines is a ProcessedDataset, the dictionary is saved with it, so
+    each note is only split into words once, whichever check does it first.
+    '''
+    from sharedResults import sharedResult
+
+    return sharedResult(dataLines, 'noteTokens', lambda dataset: {})
+
+class NoteScanner(object):
+    '''
+    Finds any of a set of behaviors in notes.
+    '''
+
+    def __init__(self, criteriaBehavs, noteTokens = None):
+        '''
+        criteriaBehavs is a list of strings: the behaviors to look for (any
+        case). noteTokens is an optional dictionary of the words in each note
+        by row (see getNoteTokens), to be shared with other scanners for the
+        same data.
+        '''
+        self.behaviors = frozenset([behav.upper() for behav in criteriaBehavs])
+        if noteTokens is None:
+            noteTokens = {}
+        self.noteTokens = noteTokens
+
+    def tokens(self, row, dataLine):
+        '''
+        Returns the words in dataLine, a "note" line (see tokenizeNote). If row
+        isn't None, the words are saved as the words for that row, and only
+        worked out the first time.
+        '''
+        if row is None:
+            return tokenizeNote(dataLine)
+        noteTokens = self.noteTokens.get(row)
+        if noteTokens is None:
+            noteTokens = tokenizeNote(dataLine)
+            self.noteTokens[row] = noteTokens
+        return noteTokens
+
+    def hasMatch(self, row, dataLine):
+        '''
+        Returns True if any of the behaviors are in the note in dataLine, or
+        False. row is as in tokens.
+        '''
+        return not self.behaviors.isdisjoint(self.tokens(row, dataLine))
+
+    def scan(self, row, dataLine):
+        '''
+        Returns a list of NoteMatches: every behavior in the note in dataLine,
+        in the order they occur. row is as in tokens.
+        '''
+        noteTokens = self.tokens(row, dataLine)
+        if self.behaviors.isdisjoint(noteTokens):
+            return []
+
+        lastPosition = len(noteTokens) - 1
+        matches = []
+        for (position, word) in enumerate(noteTokens):
+            if word in self.behaviors:
+                actor = noteTokens[position - 1] if position > 0 else ''
+                actee = noteTokens[position + 1] if position < lastPosition else ''
+                matches.append(NoteMatch(word, position, actor, actee))
+        return matches
+
+    def interaction(self, row, dataLine):
+        '''
+        For notes written "actor act actee", where act is one of the
+        behaviors.
+
+        Returns the NoteMatch for the act, or None if the note doesn't start
+        that way (e.g. if it's too short).
+        '''
+        for match in self.scan(row, dataLine):
+            if match.position == 1 and match.actee != '':
+                return match
+        return None
@@ -14,6 +14,7 @@ not performed here, and the text of some of the alerts is reworded.
 '''
 from constants import *
 from compareFocalLogs import *
+from demographyIndex import getInfantPeriods
 from errorCheckingHelpers import *
 from feedbackHelpers import *
 from os import path
@@ -126,8 +127,8 @@ def feedbackAlerts(dataLines, focalLogPath = "", showSpecifics = True):
     alertLines.append(commentLine)
     
     # Points implying focal has an infant when she doesn't, and vice versa
-    # First, get a dictionary of moms and their kids
-    moms = momsAndInfants("./momsAndInfants.txt")
+    # First, get the periods when moms had infants
+    moms = getInfantPeriods()
     alertData = checkFocalInfantStatus(dataLines, moms)
     # Prune this a bit, so we can use the "kenyaFixLine" function.
     alertData = [line[0:7] + [line[-1]] for line in alertData]
@@ -139,7 +140,8 @@ def feedbackAlerts(dataLines, focalLogPath = "", showSpecifics = True):
     print("Check for in-sight points with no neighbors")
     alertData = theseWithoutThose(dataLines, pntAbbrev, [neighborAbbrev], beforeThem = [focalAbbrev])
     alertData = [line for line in alertData if line[6] != outOfSightValue] #Exclude out-of-sight points
-    alertData = [line for line in alertData if line not in checkPointMatchesFocal(dataLines)] #Exclude non-matching points
+    nonMatchingPoints = set([tuple(line) for line in checkPointMatchesFocal(dataLines)])
+    alertData = [line for line in alertData if tuple(line) not in nonMatchingPoints] #Exclude non-matching points
     alertData = ['\t'.join(kenyaFixLine(line)) for line in alertData]
     commentLine = writeAlert('Points where you forgot to enter neighbors', alertData, showSpecifics) + '\n'
     alertLines.append(commentLine)
@@ -182,9 +184,11 @@ def feedbackAlerts(dataLines, focalLogPath = "", showSpecifics = True):
     # Check for focals done that aren't in the log (if provided).
     # Exclude focals with no points.
     if focalLogPath != "":
-        # Then a log was provided. Do this check.
+        # Then a log was provided. Do this check (and find the logged
+        # focals that aren't in the data at the same time).
         print("Check for focals done that aren't in the log")
-        alertData = getFocalsNotLogged(dataLines, focalLogPath)
+        (notLogged, notDone) = reconcileFocalLog(dataLines, focalLogPath)
+        alertData = notLogged
         # This level of detail is not wanted, apparently
         # alertData = [line[0]+"\t"+line[2]+" point(s) in sight, out of "+line[1] for line in alertData if int(line[1]) > 0]
         alertData = [(line[0]).strip().split('\t') for line in alertData]
@@ -198,7 +202,7 @@ def feedbackAlerts(dataLines, focalLogPath = "", showSpecifics = True):
         # Then a log was provided. Do this check.
         print("Check for logged (as complete) focals that aren't in the data")
         alertData = []
-        for line in getLoggedNotDone(dataLines, focalLogPath):
+        for line in notDone:
             line = line.strip().split('\t')
             alertData.append(kenyaDateTime(line[0], False) + '\t' + line[3])
         commentLine = writeAlert("Focal samples in the log but aren't in the data", alertData, showSpecifics) + '\n'
@@ -209,6 +213,8 @@ def feedbackAlerts(dataLines, focalLogPath = "", showSpecifics = True):
 def makeFeedback (inFilePath, outFilePath, focalLogPath = ""):
     '''
     Checks the data in the file at inFilePath for possible errors/alerts.
+    inFilePath may also be a ProcessedDataset (see processedDataset) with the
+    data already loaded.
     Also does some counting of basic statistics about the data, e.g. (how many focals, how many adlibs, etc.)
     Errors, alerts, and statistics will be written to the file at outFilePath.
         UNLIKE the "errorChecking" function in errorChecking package,
@@ -218,20 +224,21 @@ def makeFeedback (inFilePath, outFilePath, focalLogPath = ""):
     Prints a message that the process is complete.
     Returns nothing.
     '''    
+    from processedDataset import ProcessedDataset, loadProcessedDataset
+    
+    if isinstance(inFilePath, ProcessedDataset):
+        allEvents = inFilePath
+    else:
+        print("Opening import file:", path.basename(inFilePath))
+        allEvents = loadProcessedDataset(inFilePath) ## Without the header line
+    inFilePath = allEvents.filePath
+    
     print("Creating export file:", path.basename(outFilePath) )
     outFile = open(outFilePath,'w')
     
     outMsg = writeHeader(inFilePath) 
     outFile.write(outMsg + '\n\n')
     
-    print("Opening import file:", path.basename(inFilePath))
-    impFile = open(inFilePath, 'r')
-    impFile.readline() ## Skip the header line
-    allEvents = impFile.readlines()
-    impFile.close()
-    
-    allEvents =  [line.strip().split('\t') for line in allEvents]
-    
     print("Getting data summary")
     outMsg = observerDataSummary(allEvents)
     outFile.write(outMsg + '\n\n')
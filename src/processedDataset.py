@@ -0,0 +1,110 @@
+'''
+Created on 17 Oct 2026
+
+The data from a processed Prim8 data file (the tab-delimited .txt written by
+readDumpFile.writeAll), read once and kept in memory so it can be given to
+every tool that needs it: babaseWriter, errorChecking, observerFeedback,
+gatherAllData, gatherAgonisms, etc.
+
+A ProcessedDataset acts like the list of split lines these tools have always
+used (dataset[i] is a list of strings, and it can be looped over, sliced,
+and so on), so all the older code works with it unchanged. It also keeps:
+    --the file's header line, and the program, setup, and tablet IDs in it
+    --the date and time of each line, as seconds since 1970 (see
+      timestampCodec)
+The data are kept line by line, not in columns: each line is still its own
+list of strings. The only thing done to save memory is that strings that
+repeat a lot (line types, observers, dates, groups, snames, etc.) are stored
+only once, no matter how many lines use them.
+'''
+from timestampCodec import rowEpochs
+
+class ProcessedDataset(object):
+    '''
+    The lines of data from a processed Prim8 data file, each split into its
+    fields, plus some metadata about them. See the module
+    description for details.
+    '''
+    def __init__(self, header, dataLines, filePath = ''):
+        '''
+        header is a string: the first line of the file, "Parsed data from: ..."
+        dataLines is a list of lists of strings: the rest of the lines of the
+            file, each split into its fields.
+        filePath is a string: the path of the file the data came from (or
+            will be written to), if any.
+        '''
+        from babaseWriteHelpers import getProgramSetup
+        from constants import noteAbbrev
+
+        self.filePath = filePath
+        self.header = header.rstrip('\r\n')
+        try:
+            self.prgID, self.setupID, self.tabletID = getProgramSetup(self.header)
+        except IndexError: ##Not a proper header
+            self.prgID, self.setupID, self.tabletID = '', '', ''
+
+        # Keep only one copy of each repeated string. Notes (and times) are
+        # rarely repeated, so they aren't included.
+        sharedStrings = {}
+        share = sharedStrings.setdefault
+        self.rows = []
+        for line in dataLines:
+            sharedLine = [share(field, field) for field in line[:3]] + line[3:4]
+            if line[0] == noteAbbrev:
+                sharedLine.extend(line[4:])
+            else:
+                sharedLine.extend([share(field, field) for field in line[4:]])
+            self.rows.append(sharedLine)
+
+        self.epochs = rowEpochs(self.rows) ##Lines without a usable date and time get unknownEpoch
+
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def cached(self, name, builder):
+        '''
+        name is a string, and builder is a function that takes this dataset
+        as its only parameter.
+
+        The first time this is called with a given name, calls builder and
+        saves its result. After that, just returns the saved result. This
+        lets several tools share anything that takes a while to work out
+        from the data.
+        '''
+        if name not in self._cache:
+            self._cache[name] = builder(self)
+        return self._cache[name]
+
+def loadProcessedDataset(filePath):
+    '''
+    Reads the processed Prim8 data file at filePath.
+
+    Returns a ProcessedDataset. Each line is split exactly as the tools
+    always have: line.strip().split('\\t').
+    '''
+    dataFile = open(filePath, 'r')
+    header = dataFile.readline()
+    dataLines = [line.strip().split('\t') for line in dataFile]
+    dataFile.close()
+
+    return ProcessedDataset(header, dataLines, filePath)
+
+def getDataset(fileOrDataset):
+    '''
+    fileOrDataset is either a string (the path to a processed Prim8 data
+    file) or a ProcessedDataset.
+
+    Returns a ProcessedDataset: fileOrDataset itself, or else the data
+    loaded from the file.
+    '''
+    if isinstance(fileOrDataset, ProcessedDataset):
+        return fileOrDataset
+    return loadProcessedDataset(fileOrDataset)
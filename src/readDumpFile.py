@@ -8,23 +8,89 @@ Created on 27 Aug 2015
 '''
 import sys
 import csv
-from datetime import datetime, timedelta
+from array import array
+from collections import namedtuple
+from datetime import date, datetime, timedelta
 
-def cleanDumpData(filePath):
+dumpParserVersion = 2 ##Change this whenever makeAllDicts changes the data it returns, so old parsed data in the dumpCache won't be reused
+
+epochDateTime = datetime(1970, 1, 1) ##Event date/times are stored as seconds since this moment
+
+##Everything needed to write one behavior instance. See addInstanceRecordsDict.
+InstanceRecord = namedtuple('InstanceRecord', ['typeAbbrev', 'observer', 'group', 'actor', 'act', 'actee', 'modifier'])
+
+def getIntColumns(legend):
+    '''
+    Given legend, a list of strings: the column "legend" (names of the columns) of one table from
+    the prim8 import file.
+    
+    Finds which columns hold numbers: those named in p8IntColumns (from constants), and those whose
+    names end with "id".  All the others hold text.
+    Returns a tuple of integers: the indices of the number columns.
+    '''
+    from constants import p8IntColumns
+    
+    intNames = set(p8IntColumns)
+    return tuple([x for (x, columnName) in enumerate(legend) if columnName in intNames or columnName.lower().endswith('id')])
+
+def typeDumpRow(line, intColumns):
+    '''
+    Given line, a list of strings representing one line of table data from the prim8 import file,
+    and intColumns, the indices of the table's number columns (from getIntColumns).
+    
+    Converts the items in the number columns into integers.  Blank items (e.g. a behavior with no
+    actee) are left as blank strings.  Items in other columns are never converted.
+    Returns the same (converted) list.
+    '''
+    for x in intColumns:
+        if x < len(line) and line[x].isdigit(): ##then item is a number and shouldn't stay a string
+            line[x] = int(line[x])
+    return line
+
+def iterDumpRecords(filePath):
     '''
-    Given a file path:
-        1) opens the file,
-        2) processes its data into a list of lists of strings, ready to be parsed, and
-        3) closes the file.
+    Given a file path, streams the file's data straight from the open file handle,
+    one line at a time, and yields a (table name, typed line) tuple for every
+    line of table data.  The file is closed when the generator finishes.
+    
     Performs comma-separated split using csvreader to account for the possibility of commas in data fields.
-    Returns a list of lists of strings: each (inner) list of strings represents one line of data from openedFile. 
+    Lines with only one item indicate the beginning of a new table. These are not
+    yielded themselves, but all the lines that follow belong to that table until
+    the next one begins.  The first line yielded for each table is its column
+    "legend", as a list of strings.  The legend says which columns hold numbers
+    (see getIntColumns), so every other line is a list of strings and integers
+    (see typeDumpRow).
+    
+    Only one line of the file is held in memory at a time, no matter how large
+    the file is.
+    
+    Raises a ValueError if a table name isn't recognized, or if data occur before
+    any table has begun.
     '''
-    theFile = open(filePath, "r")
-    fullText = theFile.read().splitlines()
-    theFile.close()
+    from constants import p8TableList
     
-    fullText = csv.reader(fullText, delimiter=',', quotechar='"')
-    return fullText
+    tableNames = set(p8TableList)
+    
+    with open(filePath, "r", newline='') as theFile:
+        allLines = csv.reader(theFile, delimiter=',', quotechar='"')
+        currentTable = ''
+        intColumns = None ##Number columns of the current table. None until its legend is read.
+        for line in allLines:
+            if len(line) == 0: ##Blank line, nothing to add
+                continue
+            if len(line) == 1: ##Then the line should indicate the beginning of a new table.
+                if line[0] not in tableNames: ##Then there's a problem in the file
+                    raise ValueError("Problem at line " + str(allLines.line_num) + ": " + line[0] + " is not a recognized table name")
+                currentTable = line[0]
+                intColumns = None
+                continue
+            if currentTable == '':
+                raise ValueError("Problem at line " + str(allLines.line_num) + ": data found before any table name")
+            if intColumns is None: ##This is the legend
+                intColumns = getIntColumns(line)
+                yield currentTable, line
+            else:
+                yield currentTable, typeDumpRow(line, intColumns)
 
 def makeAllDicts(filePath):
     '''
@@ -32,10 +98,9 @@ def makeAllDicts(filePath):
     Each of the "inner" dictionaries is essentially one "table" of data from the input file.
 
     The names of each of the "inner" dictionaries is given by the local list, "p8TableList".
-    Returns the dictionary of dictionaries.
+    The file is read in a single pass, via iterDumpRecords.
+    Returns the dictionary of dictionaries, or an empty dictionary if there was a problem in the file.
     '''
-    allLines = cleanDumpData(filePath) # Opens and closes file
-    
     fullDict = {} ##The big, bad dictionary of dictionaries returned by this function
     
     from constants import p8TableList
@@ -43,23 +108,16 @@ def makeAllDicts(filePath):
     for table in p8TableList: ##Create a bunch of empty dictionaries, with names from p8TableList
         fullDict[table] = {}
     
-    currentDictName = '' ##Used in the below "for" loop, to indicate which dictionary to add all the data
-    for n,line in enumerate(allLines): ##Enumerating and adding n to allow the return of line numbers in case there's an error
-        print("Line " + str(n) + ": "+  " ".join(line))
-        ##TODO: Change the way line number is returned. If the input file has any spurious newline characters, then n does not accurately indicate line number in the original file.
-        if len(line) == 1: ##Then the line should indicate the beginning of a new table.  Until a new table starts, all following lines should be added to the dictionary of this name.
-            if line[0] not in p8TableList: ##Then there's a problem in the file
-                print("Problem at line", (n+1), ":", line[0], " is not a recognized table name")
-                fullDict = {} ##Empty the dictionary, to essentially halt any processes that may come after
-                return fullDict
-            print('Begin', line[0], 'dictionary.')
-            currentDictName = line[0]
-        else: ##Line should be actual data to add to a table
-            for x,item in enumerate(line): ##Check for numbers that are saved as strings
-                if item.isdigit(): ##then item is a number and shouldn't stay a string
-                    line[x] = int(item)
-            fullDict[currentDictName][line[0]] = line[1:] ##Set the first column of the data as the key, everything else as the value
-            print('Added', line[1:], "to", currentDictName, 'with key #', line[0])
+    currentDictName = '' ##Only used to announce when each new table begins
+    try:
+        for (tableName, line) in iterDumpRecords(filePath):
+            if tableName != currentDictName:
+                print('Begin', tableName, 'dictionary.')
+                currentDictName = tableName
+            fullDict[tableName][line[0]] = line[1:] ##Set the first column of the data as the key, everything else as the value
+    except ValueError as problem:
+        print(problem)
+        return {} ##Empty dictionary, to essentially halt any processes that may come after
     fullDict = addInstancesModifiersDict(fullDict)
     print('Finished creating dictionary of dictionaries!')
     return fullDict
@@ -87,24 +145,6 @@ def addInstancesModifiersDict(masterDict):
     print(dictInstMods, "dictionary populated")
     return masterDict
 
-def rawGetDateTime (itemList, yearIndex):
-    '''
-    Given a list (itemList, presumably the value returned from a dictionary created from the Prim8 import file), and the index (yearIndex) in that list where the "Year" value is stored.
-    (Assumes that "Year" is followed by Month, Day, Time)
-    Outputs the date and time as a single "datetime" object.
-    '''
-    print("Making date/time beginning at", itemList[yearIndex], "from list", itemList)
-    thisYear = itemList[yearIndex]
-    thisMonth = itemList[yearIndex+1]
-    thisDay = itemList[yearIndex+2]
-    timeList = itemList[yearIndex+3].split(":")
-    thisHour = int(timeList[0])
-    thisMinute = int(timeList[1])
-    thisSecond = int(timeList[2])
-    outDateTime = datetime(thisYear, thisMonth, thisDay, thisHour, thisMinute, thisSecond)
-    ##print("Date/time is", outDateTime)
-    return outDateTime
-
 def getYearIndex (someDictionary):
     '''
     Given a dictionary where: (these are assumptions, not checked-for in the code)
@@ -134,62 +174,95 @@ def getYearIndex (someDictionary):
     print("Couldn't find a 'year' in this dictionary")
     return -1
 
-def addEventKeys (targetList, sourceDictionary, dictName):
+def secondsToDateTime(eventSeconds):
     '''
-    Given a dictionary (sourceDictionary) to read from, adds (datetime, dictName, dictionary key) tuples to the targetList.
-    Used to combine data ("events") of different types together into a single list that can easily be sorted by time.  
-    Returns the appended list. (or, if there were no data in targetList to add, returns the unappended list)  
+    Given an integer number of seconds since the beginning of 1970-01-01 (as used in
+    the event timeline), returns the datetime object that many seconds later.
+    '''
+    return epochDateTime + timedelta(0, eventSeconds)
+
+def getTableEventSeconds(sourceDictionary):
+    '''
+    Given a dictionary (sourceDictionary), one of the "tables" of events read from the import file.
+    Its "legend" must include a "Year" column, followed by the Month, Day, and Time columns.
+    
+    The legend is read only once, and the date/time columns of every event are converted
+    together, column by column, into the number of seconds since 1970-01-01.
+    
+    Returns two arrays of integers: the sorted keys of the events in the table (the
+    "legend" is omitted), and the date/time of each of those events, in seconds.
     '''
     ##Get and sort all the keys in the dictionary, except the "legend". Omitting that should leave only ID numbers
-    eventKeys = sorted([k for k in sourceDictionary.keys() if str(k).isdigit()])
-    if len(eventKeys) == 0: ##Then there were no events recorded in the given table. 
-        return targetList
-    for i in eventKeys:
-        yrIdx = getYearIndex(sourceDictionary)
-        eventDateTime = rawGetDateTime(sourceDictionary[i], yrIdx)
-        finalInfo = (eventDateTime, dictName, i) 
-        targetList.append(finalInfo)
-    return targetList
+    eventKeys = array('q', sorted([k for k in sourceDictionary.keys() if str(k).isdigit()]))
+    eventSeconds = array('q')
+    if len(eventKeys) == 0: ##Then there were no events recorded in the given table.
+        return eventKeys, eventSeconds
+    
+    yrIdx = getYearIndex(sourceDictionary)
+    allRows = [sourceDictionary[k] for k in eventKeys]
+    
+    ##Dates repeat a lot, so convert each distinct date only once
+    dayNumbers = {}
+    for ymd in set([tuple(row[yrIdx:yrIdx+3]) for row in allRows]):
+        dayNumbers[ymd] = date(*ymd).toordinal() - epochDateTime.toordinal()
+    allDays = [dayNumbers[tuple(row[yrIdx:yrIdx+3])] for row in allRows]
+    
+    allTimes = [row[yrIdx+3].split(":") for row in allRows]
+    allTimes = [int(h)*3600 + int(m)*60 + int(s) for (h, m, s) in allTimes]
+    
+    eventSeconds.extend([(day * 86400) + time for (day, time) in zip(allDays, allTimes)])
+    return eventKeys, eventSeconds
+
+def getEventTimeline(masterDict):
+    '''
+    Given the big main dictionary of dictionaries masterDict.
+    
+    Gathers ALL observations that we want to record, from the tables listed in the observationTables
+    list in constants.py, into a timeline of events sorted chronologically.
+    
+    Events are first gathered in order of table name, then key. A single stable sort by date/time
+    then puts them in chronological order. Events at the same date/time stay in order of table name, then key.
+    
+    Returns four values:
+        1) a list of the table names, in the order used by the "table codes" (#3)
+        2) an array of integers: the date/time of each event, in seconds since 1970-01-01
+        3) an array of integers: the "table code" of each event, i.e. its table's index in (#1)
+        4) an array of integers: the key of each event in its table
+    All three arrays are in chronological order.
+    '''
+    from constants import observationTables
+    
+    tableNames = sorted(observationTables)
+    
+    allSeconds = array('q')
+    allTableCodes = array('b')
+    allKeys = array('q')
+    for (tableCode, tableName) in enumerate(tableNames):
+        eventKeys, eventSeconds = getTableEventSeconds(masterDict[tableName])
+        allKeys.extend(eventKeys)
+        allSeconds.extend(eventSeconds)
+        allTableCodes.extend([tableCode] * len(eventKeys))
+    
+    order = sorted(range(len(allSeconds)), key = allSeconds.__getitem__) ##sorted() is stable
+    
+    allSeconds = array('q', [allSeconds[i] for i in order])
+    allTableCodes = array('b', [allTableCodes[i] for i in order])
+    allKeys = array('q', [allKeys[i] for i in order])
+    return tableNames, allSeconds, allTableCodes, allKeys
 
 def getAllObservations(masterDict):
     '''
     Given the big main dictionary of dictionaries masterDict.
     
     Makes a list of (datetime, tablename, table key) tuples for ALL observations that we want to record.
-    Collects data from the tables listed in the observationTables list in constants.py
+    Collects data from the tables listed in the observationTables list in constants.py, using getEventTimeline.
     
-    Before returning, the list is sorted.
+    The list is sorted.
     
     Returns a list of tuples.
     '''
-    from constants import observationTables
-    
-    eventList = []
-    for tableName in observationTables:
-        addEventKeys(eventList, masterDict[tableName], tableName)
-    eventList.sort()
-    return eventList
-
-def getCodes(codeFilePath, longIndex, shortIndex):
-    '''
-    Given the path (codeFilePath) for a tab-delimited txt file, adds the short and long codes to two separate lists: one list for short codes, one for long codes.
-        --The "long" code in codeFile is at the (longIndex)'th index in each line (assuming the line is split).
-        --The "short" code in codeFile is at the (shortIndex)'th index in each line (assuming the line is split).
-    Codes will be added to both lists simultaneously, so longList[n] will correspond to shortList[n].
-    Returns two lists: first the one with long codes, then the one with short codes.
-    
-    Intended for cases like group names and food codes, where names/values used in Prim8 don't quite align with what we use in Babase.
-    '''
-    longCodes = []
-    shortCodes = []
-    codeFile = open(codeFilePath,'r')
-    allCodes = codeFile.readlines()
-    codeFile.close()
-    for code in allCodes:
-        cleanCode = code.strip().split("\t")
-        longCodes.append(cleanCode[longIndex].upper())
-        shortCodes.append(cleanCode[shortIndex].upper())
-    return longCodes, shortCodes
+    tableNames, allSeconds, allTableCodes, allKeys = getEventTimeline(masterDict)
+    return [(secondsToDateTime(s), tableNames[c], k) for (s, c, k) in zip(allSeconds, allTableCodes, allKeys)]
 
 def getObserver(masterDict, eventKey):
     '''
@@ -215,19 +288,17 @@ def getGroupAbbrev(masterDict, grpIDNum):
     masterDict is the big main dictionary of dictionaries, which is assumed to contain a "groups" dictionary.
     grpIDNum is an integer and a key in the "groups" dictionary.
     
-    Uses the getCodes function to parse out the group abbreviations preferred by Babase.
+    Uses the group codes from codeRegistry to look up the group abbreviations preferred by Babase.
     Returns a string: the Babase-preferred group abbreviation, or the name used in prim8 if a Babase-preferred abbreviation isn't found.     
     '''
     from constants import p8groups
+    from codeRegistry import getGroupCodes
     
-    ##Get a corrected list of group names, because prim8 doesn't comprehend group names with apostrophes. E.g. we want "ACA", not "acacia".  Prim8 can't handle "acacia's".
-    groupsLong, groupsShort = getCodes('./groupcodes.txt', 3, 2)
-        
+    ##Get a corrected group name, because prim8 doesn't comprehend group names with apostrophes. E.g. we want "ACA", not "acacia".  Prim8 can't handle "acacia's".
     currentGrpName = (masterDict[p8groups][grpIDNum][0])  ##Get group name
-    if currentGrpName.upper() in groupsLong: ##This _should_ be always true
-        grpIndex = groupsLong.index(currentGrpName.upper())
-        print("Replacing group name '" + currentGrpName + "' with '" + groupsShort[grpIndex] + "'")
-        currentGrpName = groupsShort[grpIndex]
+    groupShortName = getGroupCodes().get(currentGrpName.upper())
+    if groupShortName is not None: ##This _should_ be always true
+        currentGrpName = groupShortName
     else:
         print("Group name" + currentGrpName + "not recognized!")
     return currentGrpName
@@ -259,66 +330,115 @@ def getfocalStype(eventKey, masterDict):
     
     return focalStype
 
-def writeInstance(dayTime, eventKey, masterDict, instanceObserver='NOT GIVEN'):
+def addInstanceRecordsDict(masterDict):
+    '''
+    Given the big main dictionary of dictionaries masterDict, adds another dictionary to
+    masterDict, whose name is specified in the constants file as dictInstRecords.
+    
+    This new dictionary "joins" together everything from the other tables that is needed to
+    write each behavior instance: behaviorinstances -> behaviors -> behaviortypes,
+    behaviorinstances -> individuals (actor and actee), individuals -> groups, and
+    instances_modifiers -> modifiers. Its keys are behavior_instancesid's, and its values are
+    InstanceRecords, whose values are all upper-case strings ready for writing:
+        typeAbbrev: the behavior type (or neighborAbbrev for "proximity" behaviors)
+        observer: initials of the observer who recorded the instance
+        group: the Babase-preferred abbreviation of the actor's group
+        actor, act, actee: the actor's sname, the act, and the actee's sname (or emptyAbbrev)
+        modifier: the modifier (with foods converted to food codes), or None if no modifier
+    
+    Rows from the smaller tables (behaviors, individuals, etc.) are looked up and converted only
+    once each, no matter how many instances use them.
+    
+    Returns the updated masterDict.
+    '''
+    from constants import p8behaviors, p8behaviorinstances, p8behaviortypes, p8individuals, p8modifiers, p8observers, dictInstMods, dictInstRecords, neighborAbbrev, emptyAbbrev, proxBehavName
+    from codeRegistry import getFoodCodes
+    
+    behaviorInfo = {} ##behaviors id: (type abbreviation, act)
+    individualInfo = {} ##individuals id: (sname, group abbreviation)
+    observerInfo = {} ##observers id: initials
+    foodCodes = getFoodCodes()
+    
+    instanceRecords = {}
+    for (eventKey, instance) in masterDict[p8behaviorinstances].items():
+        if type(eventKey) != int: ##Skip the "legend"
+            continue
+        
+        if instance[1] not in behaviorInfo:
+            behavior = masterDict[p8behaviors][instance[1]]
+            eventType = masterDict[p8behaviortypes][behavior[7]][1] ##Using behavior type id, get the actual abbrev for that behavior type
+            if eventType == proxBehavName: ##Then it's a "neighbor" line. Let's use a shorter abbreviation.
+                eventType = neighborAbbrev
+            behaviorInfo[instance[1]] = (eventType.upper(), str(behavior[1]).upper())
+        eventType, actID = behaviorInfo[instance[1]]
+        
+        for individualID in [instance[0], instance[2]]:
+            if individualID != '' and individualID not in individualInfo:
+                individual = masterDict[p8individuals][individualID]
+                individualInfo[individualID] = (str(individual[1]).upper(), getGroupAbbrev(masterDict, individual[4]).upper()) ##Convert to string in case the sname is 997, 998
+        actorID, currentGrpName = individualInfo[instance[0]] ##Group is based on the residence of the actor
+        if instance[2] == '': ##There's no actee.
+            acteeID = emptyAbbrev
+        else:
+            acteeID = individualInfo[instance[2]][0]
+        
+        if instance[9] not in observerInfo:
+            observerInfo[instance[9]] = masterDict[p8observers][instance[9]][2]
+        
+        modifier = None
+        if eventKey in masterDict[dictInstMods]: ##then there was a modifier recorded with this event as well
+            modifier = masterDict[p8modifiers][masterDict[dictInstMods][eventKey]][1] ##Get the modifier (a string)
+            modifier = foodCodes.get(modifier.upper(), modifier).upper() ##If the modifier is a food, change it to its abbreviation.
+        
+        instanceRecords[eventKey] = InstanceRecord(eventType, observerInfo[instance[9]], currentGrpName, actorID, actID, acteeID, modifier)
+    
+    masterDict[dictInstRecords] = instanceRecords
+    print(dictInstRecords, "dictionary populated")
+    return masterDict
+
+def instanceFields(dayTime, eventKey, masterDict, instanceObserver='NOT GIVEN'):
     '''
-    Parses data for a line from the behavior_instances table and adds it together to a list.
-    The list is joined into a string, presumably to write to the outFile.
+    Gathers the data for a line from the behavior_instances table into a list of strings (the fields of the line).
     dayTime is a datetime object and represents the date and time of the instance.
     eventKey is an integer and is the key for the "instances" dictionary corresponding to the instance.
     "masterDict" is the main dictionary of dictionaries used so often in this program. Presumed to be "allData".
-    instanceObserver is the optional string of the observer's initials to use in the data.  If not given, observer will be looked-up in masterDict.
-    Returns a tuple, the string that can be written to the outFile, and the "observer" string.
+        All the data for the line are taken from its dictInstRecords dictionary, which is added first (by
+        addInstanceRecordsDict) if it's not there yet.
+    instanceObserver is the optional string of the observer's initials to use in the data.  If not given, the observer recorded with the instance is used.
+    Returns a tuple, the list of strings, and the "observer" string.
     '''
-    from constants import p8behaviors, p8behaviorinstances, p8behaviortypes, p8individuals, p8modifiers, dictInstMods,neighborAbbrev, emptyAbbrev, proxBehavName
+    from constants import dictInstRecords
     
-    outList = [] ##List of strings that will be joined together
+    if dictInstRecords not in masterDict:
+        addInstanceRecordsDict(masterDict)
+    record = masterDict[dictInstRecords][eventKey]
     
-    eventTypeID =  masterDict[p8behaviors][(masterDict[p8behaviorinstances][eventKey][1])][7] ##Look up behavior type id
-    eventType = masterDict[p8behaviortypes][eventTypeID][1] ##Using behavior type id, get the actual abbrev for that behavior type
-    if eventType == proxBehavName: ##Then it's a "neighbor" line. Let's use a shorter abbreviation.
-        eventType = neighborAbbrev
-    outList.append(eventType.upper()) ##Add code to indicate what kind of line this is
     if instanceObserver == 'NOT GIVEN':
-        observer = getObserver(masterDict, eventKey)
+        observer = record.observer
     else:
         observer = instanceObserver
-    outList.append(observer.upper())
-    outList.append(dayTime.date().isoformat())  ##Add date  
-    outList.append(dayTime.time().isoformat()) ##then time
-    currentGrpID = masterDict[p8individuals][(masterDict[p8behaviorinstances][eventKey][0])][4] ##Get group ID number, based on the residence of the actor
-    currentGrpName = getGroupAbbrev(masterDict, currentGrpID)
-    outList.append(currentGrpName.upper())
-    actorID = str(masterDict[p8individuals][(masterDict[p8behaviorinstances][eventKey][0])][1]) ##Get actor
-    outList.append(actorID.upper())
-    actID = str(masterDict[p8behaviors][(masterDict[p8behaviorinstances][eventKey][1])][1])  ##Get act
-    outList.append(actID.upper())
-    if masterDict[p8behaviorinstances][eventKey][2] == '': ##There's no actee. We don't want to pass '' to the "individuals" dictionary
-        acteeID = emptyAbbrev
-    else:
-        acteeID = str(masterDict[p8individuals][(masterDict[p8behaviorinstances][eventKey][2])][1]) ##Convert to string in case the actee is 997, 998
-    outList.append(acteeID.upper())
-    if eventKey in masterDict[dictInstMods]: ##then there was a modifier recorded with this event as well
-        modKey = masterDict[dictInstMods][eventKey] ##Get the modifiers ID
-        modifier = masterDict[p8modifiers][modKey][1] ##Get the modifier (a string)
-        foodsLong, foodsShort = getCodes('./foodcodes.txt', 1, 0) # Get food codes
-        if modifier.upper() in foodsLong: ##Then the modifier is a food, and we want to change it to its abbreviation.
-            foodIndex = foodsLong.index(modifier.upper())
-            print("Replacing food code '" + modifier + "' with '" + foodsShort[foodIndex] + "'")
-            modifier = foodsShort[foodIndex] ##Replace the long food name with its short name
-        outList.append(modifier.upper())
-    outLine = '\t'.join(outList)
-    print(outLine)
-    return str(outLine + '\n'), observer
+    
+    outList = [record.typeAbbrev, observer.upper(), dayTime.date().isoformat(), dayTime.time().isoformat(), record.group, record.actor, record.act, record.actee]
+    if record.modifier is not None:
+        outList.append(record.modifier)
+    return outList, observer
 
-def writeFocalFollow(dayTime, eventKey, masterDict, focalObserver):
+def writeInstance(dayTime, eventKey, masterDict, instanceObserver='NOT GIVEN'):
+    '''
+    Formats data for a line from the behavior_instances table (see instanceFields) into a string, presumably to write to the outFile.
+    Returns a tuple, the string that can be written to the outFile, and the "observer" string.
+    '''
+    outList, observer = instanceFields(dayTime, eventKey, masterDict, instanceObserver)
+    return str('\t'.join(outList) + '\n'), observer
+
+def focalFollowFields(dayTime, eventKey, masterDict, focalObserver):
     '''
     Parses data for a line from the focalfollows table and adds it together to a list.
-    The list is joined into a string, presumably to write to the outFile.
     dayTime is a datetime object and represents the date and time of the focal follow.
     eventKey is an integer and is the key for the "focalfollows" dictionary corresponding to the focal.
     masterDict is the big dictionary of dictionaries that stores all the data.
     focalObserver is a string, representing the initials of the observer of the focal sample.
-    Returns the string that can be written to the outFile.
+    Returns the list of strings.
     '''
     from constants import p8individuals, p8focalfollows, focalAbbrev
     
@@ -338,19 +458,24 @@ def writeFocalFollow(dayTime, eventKey, masterDict, focalObserver):
     focDurDelta = timedelta(0,focDuration)
     endTime = dayTime + focDurDelta
     outList.append(endTime.time().isoformat())
-    outLine = '\t'.join(outList)
-    print(outLine)
+    return outList
+
+def writeFocalFollow(dayTime, eventKey, masterDict, focalObserver):
+    '''
+    Joins the data for a line from the focalfollows table (see focalFollowFields) into a string, presumably to write to the outFile.
+    Returns the string that can be written to the outFile.
+    '''
+    outLine = '\t'.join(focalFollowFields(dayTime, eventKey, masterDict, focalObserver))
     return str(outLine + '\n')
 
-def writeAdLib(dayTime, eventKey, masterDict, adlibObserver):
+def adLibFields(dayTime, eventKey, masterDict, adlibObserver):
     '''
     Parses data for a line from the adlibs table and adds it together to a list.
-    The list is joined into a string, presumably to write to the outFile.
     dayTime is a datetime object and represents the date and time of the note.
     eventKey is an integer and is the key for the "adlibs" dictionary corresponding to the note.
     masterDict is the big dictionary of dictionaries that stores all the data.
     adlibObserver is a string, representing the initials of the observer of the note.
-    Returns the string that can be written to the outFile.
+    Returns the list of strings.
     '''
     from constants import noteAbbrev, p8adlib
     outList = [] ##List of strings that will be joined together
@@ -359,10 +484,51 @@ def writeAdLib(dayTime, eventKey, masterDict, adlibObserver):
     outList.append(dayTime.date().isoformat()) ## Date
     outList.append(dayTime.time().isoformat()) ## Time
     outList.append(masterDict[p8adlib][eventKey][-1]) ##Note
-    outLine = '\t'.join(outList)
-    print(outLine)
+    return outList
+
+def writeAdLib(dayTime, eventKey, masterDict, adlibObserver):
+    '''
+    Joins the data for a line from the adlibs table (see adLibFields) into a string, presumably to write to the outFile.
+    Returns the string that can be written to the outFile.
+    '''
+    outLine = '\t'.join(adLibFields(dayTime, eventKey, masterDict, adlibObserver))
     return str(outLine + '\n')
 
+def getNextInstanceObservers(masterDict, tableNames, allSeconds, allTableCodes, allKeys):
+    '''
+    Given masterDict, the big dictionary of dictionaries that stores all the data, and the event
+    timeline from getEventTimeline (tableNames, allSeconds, allTableCodes, allKeys).
+    
+    For every event in the timeline, finds the observer of the soonest behavior instance recorded
+    strictly AFTER the event's date/time.  This is done in a single pass backwards through the
+    timeline, so each event's observer can be found without searching the rest of the timeline.
+    
+    Returns a list of strings (observer initials), in the same order as the timeline. Events
+    with no later behavior instance get the emptyAbbrev from constants.
+    '''
+    from constants import p8behaviorinstances, emptyAbbrev
+    
+    instanceCode = tableNames.index(p8behaviorinstances)
+    nextObservers = [emptyAbbrev] * len(allSeconds)
+    nextObserver = emptyAbbrev ##Observer of the soonest instance after the events being checked
+    
+    n = len(allSeconds) - 1
+    while n >= 0:
+        ##Events at the same date/time all get the same observer, from an instance after that date/time
+        firstSameTime = n
+        while firstSameTime > 0 and allSeconds[firstSameTime - 1] == allSeconds[n]:
+            firstSameTime -= 1
+        sameTimeObserver = None
+        for i in range(n, firstSameTime - 1, -1):
+            nextObservers[i] = nextObserver
+            if allTableCodes[i] == instanceCode:
+                sameTimeObserver = getObserver(masterDict, allKeys[i]) ##Going backwards, so the last one found is the soonest
+        if sameTimeObserver is not None:
+            nextObserver = sameTimeObserver
+        n = firstSameTime - 1
+    
+    return nextObservers
+
 def getTabletLongName(tabletID):
     '''
     tabletID is a string used to indicate which tablet was used to collect data.
@@ -374,90 +540,121 @@ def getTabletLongName(tabletID):
     return collection_systems.get(tabletID,tabletID)
 
 
-def writeAll(outputFilePath, appName, appVersion, setupVersion, tabletID, masterDict):
+def makeHeaderLine(appName, appVersion, setupVersion, tabletID):
+    '''
+    Makes the line that starts every processed data file:
+        "Parsed data from: PROGRAMID, SETUPID, TABLETID"
+    See writeAll for a description of the parameters.
+    Returns the string, without a newline.
+    '''
+    return 'Parsed data from: ' + '_'.join([appName, appVersion]) + ', ' + '_'.join([appName, setupVersion]) + ', ' + getTabletLongName(tabletID)
+
+def iterEventFields(masterDict):
     '''
-    Does the following:
-        1) reads the sorted (date/time, event dictionary name, event key) tuples in eventList
-        2) converts them to readable text
-        3) opens a file for writing, specificed by outputFilePath
-        4) writes the text (from #2) to the file
-    outputFilePath is a string.
-    appName is a string that indicates the official name of the app used to record the data in masterDict.
-        (It will probably always be "AMBOPRIM8")
-    appVersion is a string that should indicate which version of the Prim8 app generated the data. 
-        For import to Babase, the (appName + appVersion) string must be a PROGRAMIDS.Pid_string in Babase.
-    setupVersion is a string that indicates which version of the Prim8 setup files (ethogram and valid modifiers) was used. 
-        For import to Babase, the (appName + setupVersion) string must be a SETUPIDS.Sid_string in Babase.
-    tabletID is a string that indicates which Samsung tablet was used to collect the data. It is presumed to be a "key" in the "collection_systems" dictionary from constants.
-        For import to Babase, the "Babase" value is fetched from the "collection_systems" dictionary. If the tabletID doesn't exist, it's retained (not replaced), but won't 
-            be ready for Babase.
     masterDict is the big dictionary of dictionaries that stores all the data.
     
+    Goes through all the behavior instances, focal follows, and "adlibs" (text notes) in masterDict in
+    chronological order, and converts each one to a list of strings: the fields of one line of processed data.
+    
     Checks if multiple observers are recorded in the data.  If only one, that same observer will be used throughout the data without looking it up in every line.
     If more than one observer:
         For behavior instances, looks up the noted observer in each line.
         For focal follows and "adlibs" (text notes), will use the same observer used in the last behavior instance.
         For focal follows and "adlibs" noted before any behavior instances, will use the observer noted in the first behavior AFTER the follow/adlib.
+        (These are all found at once beforehand, by getNextInstanceObservers.)
     
-    Returns a message, ideally to print to the console, that the process is complete.
+    This is a generator: it yields each list of strings, in order.
     '''
     from constants import p8adlib, p8observers, p8behaviorinstances, p8focalfollows
     
     ##Create an eventList with all the different behaviors and notes that we want recorded.
     ##Having them all in one list helps us sort different kinds of data chronologically.
-    eventList = getAllObservations(masterDict)
+    tableNames, allSeconds, allTableCodes, allKeys = getEventTimeline(masterDict)
+    eventList = [(secondsToDateTime(s), tableNames[c], k) for (s, c, k) in zip(allSeconds, allTableCodes, allKeys)]
     
-    ##Open file for writing at outputFilePath
-    outputFile = open(outputFilePath, 'w') 
+    ##Join together the data for every behavior instance, so writing each one is just formatting
+    addInstanceRecordsDict(masterDict)
     
-    outLine = 'Parsed data from: ' + '_'.join([appName, appVersion]) + ', ' + '_'.join([appName, setupVersion]) + ', ' + getTabletLongName(tabletID) + '\n' ##Start every file with this line 
-    outputFile.write(outLine)
     if multipleObservers(masterDict): ##then we'll need to manually check the observer for each line.
         lastObserver = '' ##Will be updated in the loop
-        for (eventDayTime, eventTable, tableKey) in eventList:
+        nextObservers = getNextInstanceObservers(masterDict, tableNames, allSeconds, allTableCodes, allKeys)
+        for (n, (eventDayTime, eventTable, tableKey)) in enumerate(eventList):
             if eventTable == p8behaviorinstances:
-                outLine, lastObserver = writeInstance(eventDayTime, tableKey, masterDict)
-                outputFile.write(outLine)
+                outList, lastObserver = instanceFields(eventDayTime, tableKey, masterDict)
+                yield outList
             elif eventTable == p8focalfollows:
                 if lastObserver == '': ##we haven't had a behavior yet with an observer. So look forward to the next behavior instance and get its observer.
                     print("Focal started with no previous observer. Getting observer.")
-                    soonestBehaviorKey = [key for (time, table, key) in eventList if table == p8behaviorinstances and time > eventDayTime].pop(0)
-                    lastObserver = getObserver(masterDict, soonestBehaviorKey)
+                    lastObserver = nextObservers[n]
                     print("Presumed observer is", lastObserver)
-                    outLine = writeFocalFollow(eventDayTime, tableKey, masterDict, lastObserver)
-                else:
-                    outLine = writeFocalFollow(eventDayTime, tableKey, masterDict, lastObserver)
-                outputFile.write(outLine)
+                yield focalFollowFields(eventDayTime, tableKey, masterDict, lastObserver)
             elif eventTable == p8adlib:
                 if lastObserver == '': ##we haven't had a behavior yet with an observer. So look forward to the next behavior instance and get its observer.
                     print("Adlib note recorded with no previous observer. Getting observer.")
-                    soonestBehaviorKey = [key for (time, table, key) in eventList if table == p8behaviorinstances and time > eventDayTime].pop(0)
-                    lastObserver = getObserver(masterDict, soonestBehaviorKey)
+                    lastObserver = nextObservers[n]
                     print("Presumed observer is", lastObserver)
-                    outLine = writeAdLib(eventDayTime, tableKey, masterDict, lastObserver)
-                else:
-                    outLine = writeAdLib(eventDayTime, tableKey, masterDict, lastObserver)
-                outputFile.write(outLine)
+                yield adLibFields(eventDayTime, tableKey, masterDict, lastObserver)
             else:
                 print("Unrecognized table from:", (eventDayTime, eventTable, tableKey))
-                outputFile.write('Unable to parse data'+'\n')
+                yield ['Unable to parse data']
     else: ##there is only one observer, so this can move much faster by not re-looking up observer in every instance.
         print("Only one observer found. Get the only observer and don't look it up in each line.")
         onlyObserver = [value[2] for (key, value) in iter(masterDict[p8observers].items()) if type(key) == int].pop()
         print(onlyObserver)
         for (eventDayTime, eventTable, tableKey) in eventList:
             if eventTable == p8behaviorinstances:
-                outLine, lastObserver = writeInstance(eventDayTime, tableKey, masterDict, onlyObserver)
-                outputFile.write(outLine)
+                yield instanceFields(eventDayTime, tableKey, masterDict, onlyObserver)[0]
             elif eventTable == p8focalfollows:
-                outLine = writeFocalFollow(eventDayTime, tableKey, masterDict, onlyObserver)
-                outputFile.write(outLine)
+                yield focalFollowFields(eventDayTime, tableKey, masterDict, onlyObserver)
             elif eventTable == p8adlib:
-                outLine = writeAdLib(eventDayTime, tableKey, masterDict, onlyObserver)
-                outputFile.write(outLine)
+                yield adLibFields(eventDayTime, tableKey, masterDict, onlyObserver)
             else:
                 print("Unrecognized table from:", (eventDayTime, eventTable, tableKey))
-                outputFile.write('Unable to parse data'+'\n')
+                yield ['Unable to parse data']
+
+def asReadFromFile(outList):
+    '''
+    outList is a list of strings: the fields of one line of processed data, from iterEventFields.
+    
+    Tools that read the processed data file read each line with line.strip().split('\t'), which
+    will differ from outList if the last field(s) end with whitespace or are empty (e.g. a blank
+    note), or if any field has a tab in it.  Those (rare) lines are converted the same way here,
+    so data used directly from iterEventFields exactly match data read from the file.
+    
+    Returns a list of strings.  Usually, that's outList itself.
+    '''
+    lastField = outList[-1]
+    if lastField == '' or lastField[-1].isspace() or any(['\t' in field for field in outList]):
+        return '\t'.join(outList).strip().split('\t')
+    return outList
+
+def writeAll(outputFilePath, appName, appVersion, setupVersion, tabletID, masterDict):
+    '''
+    Does the following:
+        1) converts all the events in masterDict to readable text, in chronological order (see iterEventFields)
+        2) opens a file for writing, specificed by outputFilePath
+        3) writes the text (from #1) to the file
+    outputFilePath is a string.
+    appName is a string that indicates the official name of the app used to record the data in masterDict.
+        (It will probably always be "AMBOPRIM8")
+    appVersion is a string that should indicate which version of the Prim8 app generated the data. 
+        For import to Babase, the (appName + appVersion) string must be a PROGRAMIDS.Pid_string in Babase.
+    setupVersion is a string that indicates which version of the Prim8 setup files (ethogram and valid modifiers) was used. 
+        For import to Babase, the (appName + setupVersion) string must be a SETUPIDS.Sid_string in Babase.
+    tabletID is a string that indicates which Samsung tablet was used to collect the data. It is presumed to be a "key" in the "collection_systems" dictionary from constants.
+        For import to Babase, the "Babase" value is fetched from the "collection_systems" dictionary. If the tabletID doesn't exist, it's retained (not replaced), but won't 
+            be ready for Babase.
+    masterDict is the big dictionary of dictionaries that stores all the data.
+    
+    Returns a message, ideally to print to the console, that the process is complete.
+    '''
+    ##Open file for writing at outputFilePath
+    outputFile = open(outputFilePath, 'w') 
+    
+    outLine = makeHeaderLine(appName, appVersion, setupVersion, tabletID) + '\n' ##Start every file with this line 
+    outputFile.write(outLine)
+    for outList in iterEventFields(masterDict):
+        outputFile.write('\t'.join(outList) + '\n')
     print("Closing export file at", outputFilePath)
     outputFile.close()
     return 'Finished writing all data!'
@@ -0,0 +1,137 @@
+'''
+Created on 17 Oct 2026
+
+Loads "shards" of SQL (see babaseWriter.writeShards) into Babase, several at
+the same time, each over its own database connection. Each shard is its own
+transaction, so if one fails (e.g. because of a bad row on one day), only
+that shard is rolled back. Fix it, then load just that one again.
+
+Needs the psycopg2 package, which the rest of this program doesn't, so it's
+only imported when shards are actually loaded.
+
+Shards written with COPY blocks (babaseWriter.writeCopySQL) can't be loaded
+this way; use psql for those. Shards have to be written with --commit: ones
+that end with ROLLBACK wouldn't save anything, so they aren't run, and are
+counted as failed.
+
+Syntax (run from the src directory, like the rest of the program):
+
+python3 shardLoader.py "dbname=babase host=localhost" out_2015-09-02.sql out_2015-09-03.sql
+OR
+python3 shardLoader.py "dbname=babase host=localhost" out_*.sql.gz -c 4
+'''
+from concurrent.futures import ThreadPoolExecutor
+from os import path
+import argparse
+
+def readShard(shardPath):
+    '''
+    Returns a string: all the SQL in the file at shardPath, which may be
+    gzip-compressed (if its name ends with ".gz").
+    '''
+    import gzip
+
+    if shardPath.endswith('.gz'):
+        shardFile = gzip.open(shardPath, 'rt')
+    else:
+        shardFile = open(shardPath, 'r')
+    sqlText = shardFile.read()
+    shardFile.close()
+    return sqlText
+
+def loadOneShard(connectionPool, shardPath):
+    '''
+    Runs all the SQL in the shard at shardPath, using a connection from
+    connectionPool (a psycopg2 ThreadedConnectionPool). The shard has its own
+    BEGIN and COMMIT (or ROLLBACK), so the connection is left in autocommit
+    mode. If anything goes wrong, the shard's transaction is rolled back.
+    Shards that end with ROLLBACK (written without --commit) aren't run,
+    because nothing in them would be saved.
+
+    Returns a list of strings: [shard path, seconds, status], where status is
+    'OK' or says what went wrong.
+    '''
+    from time import perf_counter
+
+    startTime = perf_counter()
+    status = 'OK'
+
+    try:
+        sqlText = readShard(shardPath)
+        if '\nCOPY ' in sqlText:
+            status = 'FAILED: shards with COPY blocks have to be loaded with psql'
+        elif sqlText.rstrip().upper().endswith('ROLLBACK;'):
+            status = 'FAILED: rolled back (written without --commit)'
+        else:
+            connection = connectionPool.getconn()
+            try:
+                connection.autocommit = True
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(sqlText)
+                except Exception as problem:
+                    status = 'FAILED: ' + str(problem).strip().replace('\n', ' ')
+                    cursor.execute('ROLLBACK;') # End the failed transaction, so the connection can be used again
+                cursor.close()
+            finally:
+                connectionPool.putconn(connection)
+    except Exception as problem:
+        status = 'FAILED: ' + repr(problem)
+
+    elapsed = '%.2f' % (perf_counter() - startTime)
+    return [shardPath, elapsed, status]
+
+def loadShards(shardPaths, connectionString, maxConnections = 4):
+    '''
+    Loads each of the shards in shardPaths (a list of file paths, see
+    babaseWriter.writeShards) into the database at connectionString (a
+    libpq connection string, e.g. "dbname=babase host=localhost"), up to
+    maxConnections of them at the same time.
+
+    Returns a list of lists of strings: [shard path, seconds, status] for
+    each shard (see loadOneShard), in the same order as shardPaths.
+    '''
+    from time import perf_counter
+
+    try:
+        from psycopg2.pool import ThreadedConnectionPool
+    except ImportError:
+        print("Unable to load shards: the psycopg2 package isn't installed")
+        return [[shardPath, '0.00', 'FAILED: psycopg2 not installed'] for shardPath in shardPaths]
+
+    startTime = perf_counter()
+    connectionPool = ThreadedConnectionPool(1, maxConnections, connectionString)
+    shardRows = []
+
+    try:
+        with ThreadPoolExecutor(max_workers = maxConnections) as executor:
+            pending = [executor.submit(loadOneShard, connectionPool, shardPath) for shardPath in shardPaths]
+            for job in pending:
+                row = job.result()
+                print(row[2], '\t', path.basename(row[0]), '(' + row[1], 'seconds)')
+                shardRows.append(row)
+    finally:
+        connectionPool.closeall()
+
+    failedShards = [row[0] for row in shardRows if row[2] != 'OK']
+    print("Finished", len(shardRows), "shard(s) in %.2f seconds." % (perf_counter() - startTime), len(failedShards), "failed.")
+    if len(failedShards) > 0:
+        print("To try the failed shard(s) again:", ' '.join(failedShards))
+
+    return shardRows
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load shards of Babase SQL, several at once."
+    )
+
+    parser.add_argument("database", help="Connection string for the database, e.g. \"dbname=babase host=localhost\"")
+    parser.add_argument("shards", help="The shard files to load", nargs='+')
+    parser.add_argument("-c", "--connections", help="Number of shards to load at the same time (default: 4)", type=int, default=4)
+
+    args = parser.parse_args()
+
+    loadShards(args.shards, args.database, args.connections)
+
+if __name__ == '__main__':
+    main()
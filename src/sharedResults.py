@@ -0,0 +1,172 @@
+'''
+Created on 17 Oct 2026
+
+Intermediate results that several checks need, worked out only once for
+each set of data and shared by errorChecking, observerFeedback, and
+compareFocalLogs.
+
+When the data are a ProcessedDataset, each result is saved with the dataset
+(see ProcessedDataset.cached), so the first check to need it works it out
+and every later check just uses it. Plain lists of lines are supported too,
+but then nothing is saved.
+
+Results about particular lines are kept as sets of "rows" (the index of
+each line in the data), so checking whether a line is one of them takes
+the same time no matter how many there are. None of the saved results
+should be changed by the functions that use them: they're frozensets and
+tuples.
+'''
+
+def sharedResult(dataLines, name, builder):
+    '''
+    dataLines is a list of lists of strings, or a ProcessedDataset. name is
+    a string, and builder is a function that takes dataLines as its only
+    parameter.
+
+    Returns builder(dataLines). If dataLines is a ProcessedDataset, builder
+    is only called the first time; after that, the saved result is returned.
+    '''
+    from processedDataset import ProcessedDataset
+
+    if isinstance(dataLines, ProcessedDataset):
+        return dataLines.cached(name, builder)
+    return builder(dataLines)
+
+def nonMatchingPointRows(dataLines):
+    '''
+    Returns a frozenset of integers: the rows of the "point" lines in
+    dataLines whose date or focal individual don't match the current focal
+    sample, or that have no current focal (see
+    errorCheckingHelpers.checkPointMatchesFocal).
+    '''
+    return sharedResult(dataLines, 'nonMatchingPointRows', findNonMatchingPointRows)
+
+def findNonMatchingPointRows(dataLines):
+    '''
+    Does the work for nonMatchingPointRows.
+    '''
+    from errorCheckingHelpers import sameActor, sameDate
+    from focalIndex import getFocalIndex
+
+    index = getFocalIndex(dataLines)
+    nonMatchingRows = []
+
+    for row in index.pointRows:
+        if index.focalOf[row] < 0: #PNT with no HDR yet
+            nonMatchingRows.append(row)
+            continue
+        lastFocal = dataLines[index.focalRows[index.focalOf[row]]]
+        if not sameActor(lastFocal, dataLines[row]) or not sameDate(lastFocal, dataLines[row]):
+            nonMatchingRows.append(row)
+
+    return frozenset(nonMatchingRows)
+
+def outOfSightRows(dataLines):
+    '''
+    Returns a frozenset of integers: the rows of the "out of sight" point
+    lines in dataLines.
+    '''
+    return sharedResult(dataLines, 'outOfSightRows', findOutOfSightRows)
+
+def findOutOfSightRows(dataLines):
+    '''
+    Does the work for outOfSightRows.
+    '''
+    from constants import pntAbbrev, outOfSightValue
+    from focalIndex import getFocalIndex
+
+    index = getFocalIndex(dataLines)
+
+    return frozenset([row for row in index.rowsByType.get(pntAbbrev, []) if dataLines[row][6] == outOfSightValue])
+
+def pointCountsPerFocal(dataLines, incOutOfSights = True):
+    '''
+    For each focal header in dataLines, counts the number of points that
+    were recorded, not counting points that don't match the focal (or any
+    that are exactly the same as one that doesn't). If incOutOfSights is
+    False, out-of-sight points aren't counted either.
+
+    Returns a tuple of (focal header as string, integer number of points)
+    tuples, sorted, with a 'NONE YET' entry for points before any focal
+    (see errorCheckingHelpers.countPointsPerFocal).
+    '''
+    if incOutOfSights:
+        return sharedResult(dataLines, 'pointCountsPerFocal', lambda data: countFocalPoints(data, True))
+    return sharedResult(dataLines, 'inSightPointCountsPerFocal', lambda data: countFocalPoints(data, False))
+
+def countFocalPoints(dataLines, incOutOfSights):
+    '''
+    Does the work for pointCountsPerFocal.
+    '''
+    from focalIndex import getFocalIndex
+
+    index = getFocalIndex(dataLines)
+
+    # Points that aren't counted. Like the older version of this, any point
+    # that's exactly the same as a non-matching one is left out, too.
+    nonMatchingPoints = set([tuple(dataLines[row]) for row in nonMatchingPointRows(dataLines)])
+    skipRows = set([row for row in index.pointRows if tuple(dataLines[row]) in nonMatchingPoints])
+    if not incOutOfSights:
+        skipRows.update(outOfSightRows(dataLines))
+
+    pointCounts = [0] * (len(index.focalRows) + 1) # Number of points in each focal, by focal number. Points before any focal are at [-1].
+    for row in index.pointRows:
+        if row not in skipRows:
+            pointCounts[index.focalOf[row]] += 1
+
+    focalCounts = {}
+    focalCounts['NONE YET'] = pointCounts[-1]
+    for (focalNum, row) in enumerate(index.focalRows):
+        focalCounts['\t'.join(dataLines[row])] = pointCounts[focalNum] # If the same header occurs twice, the later one's count is kept
+
+    return tuple(sorted(focalCounts.items()))
+
+def neighborCountsPerPoint(dataLines):
+    '''
+    Counts the number of neighbor lines for each "point" line in dataLines.
+
+    Returns a tuple of (point as string, integer number of neighbors)
+    tuples, sorted, with a 'NONE YET' entry for neighbors before any point
+    (see errorCheckingHelpers.checkNeighborsPerPoint).
+    '''
+    return sharedResult(dataLines, 'neighborCountsPerPoint', countPointNeighbors)
+
+def countPointNeighbors(dataLines):
+    '''
+    Does the work for neighborCountsPerPoint.
+    '''
+    from constants import neighborAbbrev
+    from focalIndex import getFocalIndex
+
+    index = getFocalIndex(dataLines)
+
+    pointCounts = [0] * (len(index.pointRows) + 1) # Number of neighbors for each point, by point number. Neighbors before any point are at [-1].
+    for row in index.rowsByType.get(neighborAbbrev, []):
+        pointCounts[index.pointOf[row]] += 1
+
+    pointsAndCounts = {}
+    pointsAndCounts['NONE YET'] = pointCounts[-1]
+    for (pointNum, row) in enumerate(index.pointRows):
+        pointsAndCounts['\t'.join(dataLines[row])] = pointCounts[pointNum] # If the same point occurs twice, the later one's count is kept
+
+    return tuple(sorted(pointsAndCounts.items(), key = lambda pair: pair[0]))
+
+def firstAndLastTimes(dataLines):
+    '''
+    Returns two strings, both formatted 'yyyy-mm-dd hh:mm:ss': the dates and
+    times of the first and last events in dataLines (see
+    errorCheckingHelpers.firstAndLastLines).
+    '''
+    return sharedResult(dataLines, 'firstAndLastTimes', findFirstAndLastTimes)
+
+def findFirstAndLastTimes(dataLines):
+    '''
+    Does the work for firstAndLastTimes. Only the earliest and latest lines
+    are needed, so the data aren't sorted.
+    '''
+    from timestampCodec import parseDateTime, formatDateTime
+
+    firstLine = min(dataLines, key = lambda line: (line[2], line[3]))
+    lastLine = max(dataLines, key = lambda line: (line[2], line[3]))
+
+    return (formatDateTime(parseDateTime(firstLine[2], firstLine[3])), formatDateTime(parseDateTime(lastLine[2], lastLine[3])))
@@ -0,0 +1,216 @@
+'''
+Created on 17 Oct 2026
+
+Fast conversion between the dates and times in processed Prim8 data and
+integers: the number of seconds since 1970-01-01 00:00:00 ("epoch seconds").
+
+Dates in the data are always 'yyyy-mm-dd' and times are always 'hh:mm:ss',
+so instead of using datetime.strptime (which is slow, and was being called
+on the same few strings over and over), the strings are simply sliced
+apart. Each different date (and time) is only converted once. Anything
+that isn't in exactly that format is handed to strptime, so it's accepted
+(or rejected, with a ValueError) just as before.
+
+Epoch seconds are plain integers, so they can be compared, subtracted, and
+sorted cheaply. Functions here also turn them back into strings, including
+the "ddMMMyy" dates our Kenyan observers are used to (see feedbackHelpers).
+'''
+from array import array
+from datetime import date, datetime, timedelta
+
+# Used for lines without a usable date and time
+unknownEpoch = -1
+
+epochStart = datetime(1970, 1, 1)
+epochOrdinal = epochStart.toordinal()
+oneSecond = timedelta(seconds = 1)
+secondsPerDay = 86400
+
+# Month abbreviations for Kenyan-style dates. Always in English, whatever
+# language the computer is set to use.
+kenyaMonths = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+
+dateSeconds = {} ##'yyyy-mm-dd': epoch seconds at the start of that day. Filled as dates are seen.
+timeSeconds = {} ##'hh:mm:ss': seconds since midnight. Filled as times are seen.
+dayDates = {} ##Days since 1970: date object for that day. Filled as days are formatted.
+
+def isFixedWidth(someString, length, separator, separatorIndexes):
+    '''
+    Checks if someString is exactly length characters long, with separator
+    at each of separatorIndexes and ASCII digits everywhere else.
+
+    Returns True or False.
+    '''
+    if len(someString) != length or not someString.isascii() or someString.count(separator) != len(separatorIndexes):
+        return False
+    for i in separatorIndexes:
+        if someString[i] != separator:
+            return False
+    return someString.replace(separator, '').isdigit()
+
+def parseDate(dateString):
+    '''
+    dateString is a string with a date, 'yyyy-mm-dd'.
+
+    Returns an integer: the epoch seconds at the very beginning of that day.
+    Raises a ValueError if dateString isn't a real date.
+    '''
+    daySeconds = dateSeconds.get(dateString)
+    if daySeconds is None:
+        if isFixedWidth(dateString, 10, '-', (4, 7)):
+            theDate = date(int(dateString[:4]), int(dateString[5:7]), int(dateString[8:]))
+        else: ##Not the usual format. Leave it to strptime.
+            theDate = datetime.strptime(dateString, '%Y-%m-%d')
+        daySeconds = (theDate.toordinal() - epochOrdinal) * secondsPerDay
+        dateSeconds[dateString] = daySeconds
+    return daySeconds
+
+def parseTime(timeString):
+    '''
+    timeString is a string with a time, 'hh:mm:ss'.
+
+    Returns an integer: the number of seconds since midnight. Raises a
+    ValueError if timeString isn't a real time.
+    '''
+    daySeconds = timeSeconds.get(timeString)
+    if daySeconds is None:
+        if isFixedWidth(timeString, 8, ':', (2, 5)):
+            hours = int(timeString[:2])
+            minutes = int(timeString[3:5])
+            seconds = int(timeString[6:])
+            if hours > 23 or minutes > 59 or seconds > 59:
+                raise ValueError("time data '" + timeString + "' is not a real time")
+        else: ##Not the usual format. Leave it to strptime.
+            theTime = datetime.strptime(timeString, '%H:%M:%S')
+            (hours, minutes, seconds) = (theTime.hour, theTime.minute, theTime.second)
+        daySeconds = hours * 3600 + minutes * 60 + seconds
+        timeSeconds[timeString] = daySeconds
+    return daySeconds
+
+def parseDateTime(dateString, timeString):
+    '''
+    dateString is a 'yyyy-mm-dd' date and timeString is a 'hh:mm:ss' time,
+    both strings.
+
+    Returns an integer: the epoch seconds at that date and time.
+    '''
+    try:
+        return parseDate(dateString) + parseTime(timeString)
+    except ValueError: ##strptime is a little more forgiving with both together (e.g. extra spaces between them)
+        return fromDatetime(datetime.strptime(dateString + ' ' + timeString, '%Y-%m-%d %H:%M:%S'))
+
+def parseDateTimeString(dateTimeString):
+    '''
+    dateTimeString is a string with a date and time, 'yyyy-mm-dd hh:mm:ss'.
+
+    Returns an integer: the epoch seconds at that date and time.
+    '''
+    if len(dateTimeString) == 19 and dateTimeString[10] == ' ':
+        return parseDateTime(dateTimeString[:10], dateTimeString[11:])
+    ##Not the usual format. Leave it to strptime.
+    return fromDatetime(datetime.strptime(dateTimeString, '%Y-%m-%d %H:%M:%S'))
+
+def toDatetime(epochSeconds):
+    '''
+    Returns a datetime object for the integer epochSeconds.
+    '''
+    return epochStart + timedelta(seconds = epochSeconds)
+
+def fromDatetime(dateTime):
+    '''
+    Returns an integer: the epoch seconds for the datetime object dateTime
+    (any fraction of a second is dropped).
+    '''
+    return (dateTime - epochStart) // oneSecond
+
+def epochToDate(epochSeconds):
+    '''
+    Returns a date object for the day that includes the integer
+    epochSeconds.
+    '''
+    dayNum = epochSeconds // secondsPerDay
+    theDate = dayDates.get(dayNum)
+    if theDate is None:
+        theDate = date.fromordinal(dayNum + epochOrdinal)
+        dayDates[dayNum] = theDate
+    return theDate
+
+def formatDate(epochSeconds):
+    '''
+    Returns a string: the date of the integer epochSeconds, 'yyyy-mm-dd'.
+    '''
+    return epochToDate(epochSeconds).isoformat()
+
+def formatTime(epochSeconds):
+    '''
+    Returns a string: the time of day of the integer epochSeconds,
+    'hh:mm:ss'.
+    '''
+    daySeconds = epochSeconds % secondsPerDay
+    return '%02d:%02d:%02d' % (daySeconds // 3600, daySeconds // 60 % 60, daySeconds % 60)
+
+def formatDateTime(epochSeconds):
+    '''
+    Returns a string: the date and time of the integer epochSeconds,
+    'yyyy-mm-dd hh:mm:ss'.
+    '''
+    return formatDate(epochSeconds) + ' ' + formatTime(epochSeconds)
+
+def formatKenyaDate(epochSeconds):
+    '''
+    Returns a string: the date of the integer epochSeconds in the format our
+    Kenyan observers are more familiar with, 'ddMMMyy' (e.g. '10AUG15').
+    '''
+    theDate = epochToDate(epochSeconds)
+    return '%02d%s%02d' % (theDate.day, kenyaMonths[theDate.month - 1], theDate.year % 100)
+
+def formatKenyaDateTime(epochSeconds):
+    '''
+    Returns a string: the date and time of the integer epochSeconds in the
+    format our Kenyan observers are more familiar with, 'ddMMMyy hh:mm:ss'.
+    '''
+    return formatKenyaDate(epochSeconds) + ' ' + formatTime(epochSeconds)
+
+def rowEpochs(dataLines, dateIndex = 2, timeIndex = 3):
+    '''
+    dataLines is a list of lists of strings, each (ideally) with a
+    'yyyy-mm-dd' date at [dateIndex] and a 'hh:mm:ss' time at [timeIndex].
+
+    Converts each line's date and time to epoch seconds. Lines without a
+    usable date and time get unknownEpoch.
+
+    Returns an array of integers, one for each line.
+    '''
+    epochs = array('q')
+    for line in dataLines:
+        try:
+            epochs.append(parseDate(line[dateIndex]) + parseTime(line[timeIndex]))
+        except (IndexError, ValueError):
+            epochs.append(unknownEpoch)
+    return epochs
+
+def getRowEpochs(dataLines, dateIndex = 2, timeIndex = 3):
+    '''
+    Returns the epoch seconds for every line in dataLines (see rowEpochs).
+    If dataLines is a ProcessedDataset, they are only worked out the first
+    time, and saved with the dataset.
+    '''
+    from processedDataset import ProcessedDataset
+
+    if not isinstance(dataLines, ProcessedDataset):
+        return rowEpochs(dataLines, dateIndex, timeIndex)
+    if (dateIndex, timeIndex) == (2, 3):
+        return dataLines.epochs
+    return dataLines.cached('epochs ' + str(dateIndex) + ' ' + str(timeIndex), lambda dataset: rowEpochs(dataset, dateIndex, timeIndex))
+
+def lineEpoch(epochs, dataLines, row, dateIndex = 2, timeIndex = 3):
+    '''
+    epochs is the array from getRowEpochs(dataLines, dateIndex, timeIndex).
+
+    Returns the epoch seconds for dataLines[row]. If the line has no usable
+    date and time, they're parsed again, so that the same error is raised as
+    if there were no saved epochs at all.
+    '''
+    if epochs[row] != unknownEpoch:
+        return epochs[row]
+    return parseDateTime(dataLines[row][dateIndex], dataLines[row][timeIndex])